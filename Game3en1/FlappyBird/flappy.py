@@ -7,17 +7,13 @@ import random
 
 from itertools import cycle
 from pygame.locals import *
-from datetime import datetime
 
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
-try:
-    from notificaciones.email_notifier import send_email_notification
-except ModuleNotFoundError as e:
-    print(f"Error importando notificaciones: {e}")
-    send_email_notification = None
+from puntajes.data_manager import DataManager, format_better_than, format_rank
+from puntajes.paging import LeaderboardPager
 
 
 print("DEBUG: __file__ =", __file__)
@@ -32,119 +28,9 @@ if len(sys.argv) > 1:
     player_email = sys.argv[1]
 
 
-# Sistema de datos
-class DataManager:
-    def __init__(self, scores_path=GLOBAL_SCORES_PATH, game_id=GAME_IDENTIFIER):
-        self.scores_path = scores_path
-        self.game_id = game_id
-
-    def _read_all_data(self):
-        if not os.path.exists(self.scores_path):
-            return {}
-
-        with open(self.scores_path, 'r', encoding='utf-8') as file:
-            try:
-                data = json.load(file)
-                if not isinstance(data, dict):
-                    return {}
-                return data
-            except json.JSONDecodeError:
-                return {}
-
-    def _save_all_data(self, all_data):
-        #Guarda todos los datos en el JSON
-        with open(self.scores_path, 'w', encoding='utf-8') as file:
-            json.dump(all_data, file, indent=4)
-
-    # Lectura de puntajes (score)
-    def load_game_scores(self):
-        #Carga y retorna los puntajes del juego actual ordenados
-        all_data = self._read_all_data()
-        game_scores = all_data.get(self.game_id, [])
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        return game_scores[:10]  # Solo los 10 primeros
-
-    # Actualiza el puntaje
-    def update_score(self, name, email, score):
-
-        if not email or "@" not in email:
-            print("INFO: Puntaje no guardado. Email no válido.")
-            return False, 0
-
-        all_data = self._read_all_data()
-        if self.game_id not in all_data:
-            all_data[self.game_id] = []
-
-        game_scores = all_data[self.game_id]
-
-        # Guardar Top 1 previo antes de actualizar
-        prev_top = game_scores[0].copy() if game_scores else None
-
-        # Buscar jugador
-        record_found = False
-        old_score = 0
-
-        for player in game_scores:
-            if player.get("email") == email:
-                record_found = True
-                old_score = player["score"]
-
-                if score > old_score:
-                    player["score"] = score
-                    player["name"] = name
-                    player["date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    return False, old_score
-                break
-
-        # Nuevo jugador si no existe
-        if not record_found:
-            game_scores.append({
-                "name": name,
-                "email": email,
-                "score": score,
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-
-        # Ordenar y limitar a top 10
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        all_data[self.game_id] = game_scores[:10]
-
-        # Guardar todo
-        self._save_all_data(all_data)
-
-        # Nuevo Top 1 tras guardar
-        new_top = game_scores[0] if game_scores else None
-
-        # Notificación: si hay nuevo top o mejora del mismo jugador
-        if new_top and new_top["score"] > 0:
-            prev_score = prev_top["score"] if prev_top else 0
-            prev_email = prev_top["email"] if prev_top else None
-
-            if new_top["score"] > prev_score or new_top["email"] != prev_email:
-                try:
-                    if send_email_notification:
-                        send_email_notification(
-                            recipient_email=new_top["email"],
-                            game_name=self.game_id,
-                            score=new_top["score"],
-                            player_name=new_top["name"]
-                        )
-                        print(f"Notificación enviada a {new_top['email']} (nuevo récord: {new_top['score']})")
-                    else:
-                        print("No se pudo enviar notificación (función no disponible).")
-                except Exception as e:
-                    print(f"Error al enviar notificación: {e}")
-
-        return True, old_score
-
-    # Obtener puntajes
-    def get_top_scores(self):
-        #Devuelve los puntajes del juego actual (máx. 10)
-        return self.load_game_scores()
-
-
-data_manager = DataManager()
+data_manager = DataManager(GAME_IDENTIFIER, GLOBAL_SCORES_PATH)
+# Tabla paginada (10 por página) con búsqueda por nombre
+leaderboard_pager = LeaderboardPager(data_manager)
 
 
 # Configuración del juego
@@ -232,12 +118,11 @@ def load_high_scores():
 def save_high_scores(scores):
     """Guarda las puntuaciones más altas usando DataManager"""
     try:
-        for entry in scores:
-            data_manager.update_score(
-                name=entry.get('name', 'Jugador'),
-                email=f"{entry.get('name', 'Jugador').lower()}@anonimo",
-                score=entry.get('score', 0)
-            )
+        # Todas las entradas en un solo lote (una escritura y como mucho un mail)
+        data_manager.update_scores([
+            (entry.get('name', 'Jugador'), f"{entry.get('name', 'Jugador').lower()}@anonimo", entry.get('score', 0))
+            for entry in scores
+        ])
         return True
 
         # Sistema antiguo:
@@ -253,10 +138,7 @@ def save_high_scores(scores):
 def clear_high_scores():
     """Borra todas las puntuaciones del juego actual en global_scores.json"""
     try:
-        all_data = data_manager._read_all_data()
-        # Filtramos los que NO son del juego actual
-        remaining = [x for x in all_data if x.get('game') != GAME_IDENTIFIER]
-        data_manager._save_all_data(remaining)
+        data_manager.clear_scores()
 
         # Sistema antiguo:
         """
@@ -275,11 +157,10 @@ def load_current_score():
     try:
         # Intentar obtener el email global si está disponible
         email = player_email if player_email else ""
-        scores = data_manager.get_top_scores()
-        if email:
-            for s in scores:
-                if s.get('email') == email:
-                    return s.get('score', 0), s.get('name', '')
+        # Búsqueda por email en todos los jugadores, no solo en el top 10
+        best = data_manager.get_player_best(email)
+        if best:
+            return best.get('score', 0), best.get('name', '')
         return 0, ''
 
         # Antiguo sistema:
@@ -856,6 +737,7 @@ def showScoresTable():
                            IMAGES['scores_bg'].get_width() + 20,
                            IMAGES['scores_bg'].get_height() + 20)
 
+    leaderboard_pager.first_page()
     while True:
         for event in pygame.event.get():
             if event.type == QUIT:
@@ -863,6 +745,20 @@ def showScoresTable():
                 sys.exit()
             if event.type == KEYDOWN and event.key == K_ESCAPE:
                 return  # Cerrar la tabla con ESC
+            if event.type == KEYDOWN:
+                # Flechas: cambiar de página; TAB: tu puesto; letras: buscar por nombre
+                if event.key == K_RIGHT:
+                    leaderboard_pager.next_page()
+                elif event.key == K_LEFT:
+                    leaderboard_pager.prev_page()
+                elif event.key == K_HOME:
+                    leaderboard_pager.first_page()
+                elif event.key == K_TAB:
+                    leaderboard_pager.find_me(player_email)
+                elif event.key == K_BACKSPACE:
+                    leaderboard_pager.backspace()
+                elif event.unicode.isalnum():
+                    leaderboard_pager.type_char(event.unicode)
 
             if event.type == MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
@@ -881,13 +777,22 @@ def showScoresTable():
         # Dibujar la tabla de puntuaciones
         scores_surface = IMAGES['scores_bg'].copy()
 
-        # Cargar puntuaciones
-        scores = data_manager.get_top_scores()
+        # Cargar solo la página visible
+        page = leaderboard_pager.page()
+        scores = page["rows"]
 
-        # Mostrar las 10 mejores puntuaciones con fuente más pequeña
+        # Mostrar las puntuaciones con fuente más pequeña
         font = pygame.font.SysFont('Arial', 14)  # Reducido de 18 a 14
         y_offset = 100
 
+        # Página actual y búsqueda
+        page_number, page_count = leaderboard_pager.page_number(page)
+        page_label = f"Página {page_number} de {page_count}"
+        if leaderboard_pager.query:
+            page_label += f"  -  Buscar: {leaderboard_pager.query}" + ("" if leaderboard_pager.highlight else " (sin resultados)")
+        page_text = font.render(page_label, True, COLORS['white'])
+        scores_surface.blit(page_text, page_text.get_rect(center=(200, 78)))
+
         if not scores:
             no_scores_text = font.render("No hay puntuaciones guardadas", True, COLORS['white'])
             no_scores_rect = no_scores_text.get_rect(center=(200, 250))
@@ -906,8 +811,7 @@ def showScoresTable():
 
             # Mostrar las puntuaciones
             cell_height = 31
-            for i, score_data in enumerate(scores[:10]):
-                rank = i + 1
+            for rank, score_data in scores:
                 name = score_data['name']
                 score = score_data['score']
 
@@ -932,6 +836,9 @@ def showScoresTable():
     # Fondo de celda para top 3
                 if rank <= 3:
                     pygame.draw.rect(scores_surface, bg_color, (30, y_offset - 10, 340, 30), border_radius=6)
+    # Fila encontrada (búsqueda o "tu puesto")
+                if score_data.get('email') and score_data.get('email') == leaderboard_pager.highlight:
+                    pygame.draw.rect(scores_surface, (255, 255, 0), (30, y_offset - 10, 340, 30), 2, border_radius=6)
 
                 center_y = y_offset + cell_height // 5
     # Posición
@@ -967,7 +874,7 @@ def showScoresTable():
 
         # Instrucción para cerrar
         close_font = pygame.font.SysFont('Arial', 14)
-        close_text = close_font.render("Haz clic fuera para cerrar", True, COLORS['white'])
+        close_text = close_font.render("<- -> página   TAB: tu puesto   Clic fuera: cerrar", True, COLORS['white'])
         close_rect = close_text.get_rect(center=(200, 460))
         scores_surface.blit(close_text, close_rect)
 
@@ -1244,6 +1151,22 @@ def showGameOverScreen(crashInfo, player_name):
         info_rect = info_text.get_rect(center=(SCREENWIDTH // 2, title_rect.bottom + 30))
         SCREEN.blit(info_text, info_rect)
 
+        # Mejor marca del jugador (búsqueda por email, no solo en el top 10)
+        best = data_manager.get_player_best(player_email)
+        rank = data_manager.get_player_rank(player_email)
+        if best:
+            best_label = f"Tu mejor marca: {best['score']}"
+            if rank:
+                best_label += f"  ·  {format_rank(*rank)}"
+            best_text = pygame.font.SysFont(None, 28).render(best_label, True, (255, 215, 0))
+            SCREEN.blit(best_text, best_text.get_rect(center=(SCREENWIDTH // 2, info_rect.bottom + 20)))
+
+        # Comparación con todas las partidas (debajo de los botones, dentro del panel)
+        if score > 0:
+            better_label = format_better_than(data_manager.get_better_than(score))
+            better_text = pygame.font.SysFont(None, 26).render(better_label, True, (200, 200, 200))
+            SCREEN.blit(better_text, better_text.get_rect(center=(SCREENWIDTH // 2, overlay_y + overlay_height - 20)))
+
         # 🎯 Score visual (sigue arriba)
         showScore(score)
 
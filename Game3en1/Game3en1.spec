@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('menu', 'menu'), ('FlappyBird', 'FlappyBird'), ('Snake', 'Snake'), ('SpaceInvaders', 'SpaceInvaders'), ('data', 'data'), ('notificaciones', 'notificaciones'), ('meme.jpg', '.')]
+datas = [('menu', 'menu'), ('FlappyBird', 'FlappyBird'), ('Snake', 'Snake'), ('SpaceInvaders', 'SpaceInvaders'), ('data', 'data'), ('notificaciones', 'notificaciones'), ('puntajes', 'puntajes'), ('meme.jpg', '.')]
 binaries = []
 hiddenimports = ['snake', 'flappy', 'SpaceInvaders', 'pytmx']
 tmp_ret = collect_all('pygame')
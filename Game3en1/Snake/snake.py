@@ -6,7 +6,6 @@ import pygame
 import random
 
 from pygame.math import Vector2
-from datetime import datetime
 from pytmx.util_pygame import load_pygame
 
 # CONFIGURACIÓN DE RUTA DE ARCHIVOS
@@ -14,11 +13,8 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-try:
-    from notificaciones.email_notifier import send_email_notification
-except ModuleNotFoundError:
-    print("Error importando notificaciones. La función de email no estará disponible.")
-    send_email_notification = None
+from puntajes.data_manager import DataManager, format_better_than, format_rank
+from puntajes.paging import LeaderboardPager
 
 pygame.init()
 try:
@@ -254,67 +250,6 @@ def stop_music():
         if pygame.mixer.music.get_busy(): pygame.mixer.music.stop()
     except Exception: pass
 
-class DataManager:
-    def __init__(self, scores_path=os.path.join(BASE_DIR, "data", "global_scores.json"), game_id="SNAKE"):
-        self.scores_path = scores_path
-        self.game_id = game_id
-
-    def _read_all_data(self):
-        if not os.path.exists(self.scores_path): return {}
-        with open(self.scores_path, 'r', encoding='utf-8') as file:
-            try:
-                data = json.load(file)
-                if not isinstance(data, dict): return {}
-                return data
-            except json.JSONDecodeError: return {}
-
-    def _save_all_data(self, all_data):
-        os.makedirs(os.path.dirname(self.scores_path), exist_ok=True)
-        with open(self.scores_path, 'w', encoding='utf-8') as file:
-            json.dump(all_data, file, indent=4)
-
-    def load_game_scores(self):
-        all_data = self._read_all_data()
-        game_scores = all_data.get(self.game_id, [])
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        return game_scores[:10]
-
-    def update_score(self, name, email, score):
-        if not email or "@" not in email: return False, 0
-        all_data = self._read_all_data()
-        if self.game_id not in all_data: all_data[self.game_id] = []
-        game_scores = all_data[self.game_id]
-
-        record_found = False
-        old_score = 0
-        for player in game_scores:
-            if player.get("email") == email:
-                record_found = True
-                old_score = player["score"]
-                if score > old_score:
-                    player["score"] = score
-                    player["name"] = name
-                    player["date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                else: return False, old_score
-                break
-
-        if not record_found:
-            game_scores.append({"name": name, "email": email, "score": score, "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        all_data[self.game_id] = game_scores[:10]
-        self._save_all_data(all_data)
-
-        new_top = game_scores[0] if game_scores else None
-        if new_top and new_top["score"] > 0 and send_email_notification:
-             if new_top["score"] == score:
-                try:
-                    send_email_notification(new_top["email"], self.game_id, new_top["score"], new_top["name"])
-                except: pass
-        return True, old_score
-
-    def get_top_scores(self): return self.load_game_scores()
-
 # ------------------ CLASES DE JUEGO
 
 class Wall:
@@ -771,6 +706,18 @@ def draw_game_over():
     screen.blit(score_num_surf, (x_start + prefix_surf.get_width(), y_score - score_num_surf.get_height() // 2))
     save_msg = score_font.render("Intenta conseguir un puntaje mayor a 0.", True, GRAY) if score_display <= 0 else score_font.render(f"Puntaje de {current_player_name} registrado.", True, GRAY)
     screen.blit(save_msg, save_msg.get_rect(center=(ANCHO // 2, ALTO // 3 + 120)))
+    best = data_manager.get_player_best(current_player_email)
+    rank = data_manager.get_player_rank(current_player_email)
+    if best:
+        best_label = f"Tu mejor puntaje: {best['score']}"
+        if rank:
+            best_label += f"  ·  {format_rank(*rank)}"
+        best_msg = score_font.render(best_label, True, GOLD)
+        screen.blit(best_msg, best_msg.get_rect(center=(ANCHO // 2, ALTO // 3 + 150)))
+    # Comparación con todas las partidas del juego (estadísticas del store, no solo el top 10)
+    if score_display > 0:
+        better_msg = score_font.render(format_better_than(data_manager.get_better_than(score_display)), True, GRAY)
+        screen.blit(better_msg, better_msg.get_rect(center=(ANCHO // 2, ALTO // 3 + 180)))
     button_y_start = ALTO // 2 + 100
     button_width = 250
     spacing = 70
@@ -836,47 +783,71 @@ def draw_leaderboard():
     global leaderboard_rects
     screen.fill(SKY_BLUE_LIGHT)
     mouse_pos = pygame.mouse.get_pos()
-    title_surf = leaderboard_title_font.render("CLASIFICACIONES TOP 10", True, DARK_GREEN)
+    title_surf = leaderboard_title_font.render("CLASIFICACIONES", True, DARK_GREEN)
     screen.blit(title_surf, title_surf.get_rect(center=(ANCHO // 2, 40)))
-    top_scores = data_manager.get_top_scores()
-    displayed_scores = top_scores[:10]
+    # Solo se pide la página visible (la tabla completa puede tener miles de jugadores)
+    page = leaderboard_pager.page()
+    page_number, page_count = leaderboard_pager.page_number(page)
+    page_surf = score_font.render(f"Página {page_number} de {page_count}", True, DARK_GREEN)
+    screen.blit(page_surf, page_surf.get_rect(center=(ANCHO // 2, 85)))
+    displayed_scores = page["rows"]
     if not displayed_scores:
         no_scores_surf = menu_font.render("¡Sé el primero en el ranking!", True, DARK_GREEN)
         screen.blit(no_scores_surf, no_scores_surf.get_rect(center=(ANCHO // 2, ALTO // 2)))
     MEDALS = [GOLD, SILVER, BRONZE]
     rank_y_start = 120
     rank_height = 80
-    for i in range(min(3, len(displayed_scores))):
-        player = displayed_scores[i]
+    # Las cajas con medalla son solo para los puestos 1 a 3 (primera página)
+    medals = [(rank, player) for rank, player in displayed_scores if rank <= 3]
+    for i, (rank, player) in enumerate(medals):
         rank_rect = pygame.Rect(OFFSET + 10, rank_y_start + i * rank_height, ANCHO - 2 * OFFSET - 20, rank_height - 10)
-        pygame.draw.rect(screen, MEDALS[i], rank_rect, 0, 8)
-        pygame.draw.rect(screen, DARK_GREEN, rank_rect, 3, 8)
-        rank_text = top3_font.render(f"{i + 1}°", True, DARK_GREEN)
+        pygame.draw.rect(screen, MEDALS[rank - 1], rank_rect, 0, 8)
+        highlighted = player.get('email') and player.get('email') == leaderboard_pager.highlight
+        pygame.draw.rect(screen, WHITE if highlighted else DARK_GREEN, rank_rect, 3, 8)
+        rank_text = top3_font.render(f"{rank}°", True, DARK_GREEN)
         screen.blit(rank_text, (OFFSET + 30, rank_rect.centery - rank_text.get_height() // 2))
         name_text = top3_score_font.render(player['name'][:5], True, DARK_GREEN)
         screen.blit(name_text, (OFFSET + 120, rank_rect.centery - name_text.get_height() // 2))
         score_text = standard_font_leaderboard.render(str(player['score']), True, DARK_GREEN)
         screen.blit(score_text, (ANCHO - OFFSET - score_text.get_width() - 30, rank_rect.centery - score_text.get_height() // 2))
-    table_y_start = rank_y_start + min(3, len(displayed_scores)) * rank_height + 10
-    if len(displayed_scores) > 3:
+    table_y_start = rank_y_start + len(medals) * rank_height + (10 if medals else 0)
+    others = displayed_scores[len(medals):]
+    if others:
         header_font = menu_font
         row_font = score_font
         col_x = [OFFSET + 20, OFFSET + 120, ANCHO - OFFSET - 150]
         screen.blit(header_font.render("Puesto", True, DARK_GREEN), (col_x[0], table_y_start))
         screen.blit(header_font.render("Nombre", True, DARK_GREEN), (col_x[1], table_y_start))
         screen.blit(header_font.render("Puntaje", True, DARK_GREEN), (col_x[2], table_y_start))
-        for i, player in enumerate(displayed_scores[3:]):
-            rank = i + 4
+        for i, (rank, player) in enumerate(others):
             y = table_y_start + 40 + i * 35
+            if player.get('email') and player.get('email') == leaderboard_pager.highlight:
+                pygame.draw.rect(screen, GREEN_LIGHT_HOVER, (OFFSET + 10, y - 4, ANCHO - 2 * OFFSET - 20, 33), 0, 6)
             screen.blit(row_font.render(f"{rank}°", True, DARK_GREEN), (col_x[0], y))
             screen.blit(row_font.render(player['name'][:5], True, DARK_GREEN), (col_x[1], y))
             screen.blit(standard_font_score.render(str(player['score']), True, DARK_GREEN), (col_x[2], y))
+    # Búsqueda por nombre o ayuda de los controles
+    if leaderboard_pager.query:
+        found = "" if leaderboard_pager.highlight else " (sin resultados)"
+        help_surf = score_font.render(f"Buscar: {leaderboard_pager.query}{found}", True, DARK_GREEN)
+    else:
+        help_surf = score_font.render("<- -> página   TAB mi puesto   letras: buscar", True, DARK_GREEN)
+    screen.blit(help_surf, help_surf.get_rect(center=(ANCHO // 2, ALTO - 85)))
     button_width = 200
     btn_y = ALTO - 60
     menu_btn = Button("Menú", pygame.Rect((ANCHO - button_width) // 2, btn_y, button_width, 50), DARK_GREEN, GREEN_LIGHT_HOVER, WHITE, menu_font)
     menu_btn.draw(screen, mouse_pos)
     leaderboard_rects = {"MENU": menu_btn.rect}
 
+def handle_leaderboard_key(event):
+    # Controles de la tabla paginada: flechas, TAB ("mi puesto"), letras para buscar por nombre
+    if event.key == pygame.K_RIGHT: leaderboard_pager.next_page()
+    elif event.key == pygame.K_LEFT: leaderboard_pager.prev_page()
+    elif event.key == pygame.K_HOME: leaderboard_pager.first_page()
+    elif event.key == pygame.K_TAB: leaderboard_pager.find_me(current_player_email)
+    elif event.key == pygame.K_BACKSPACE: leaderboard_pager.backspace()
+    elif event.unicode.isalnum(): leaderboard_pager.type_char(event.unicode)
+
 # LOOP PRINCIPAL
 SNAKE_UPDATE = pygame.USEREVENT
 input_box_rect = pygame.Rect(0, 0, 0, 0)
@@ -894,15 +865,17 @@ name_input_text = ""
 
 clock = pygame.time.Clock()
 data_manager = None
+leaderboard_pager = None
 game = None
 pause_rects = {}
 
 def start_game_loop(player_name_arg, player_email_arg):
-    global data_manager, game, current_player_name, current_player_email, game_state
+    global data_manager, leaderboard_pager, game, current_player_name, current_player_email, game_state
     global last_score, name_input_text, is_input_active, input_box_rect, continue_button_rect
     global is_paused, pause_rects
 
-    data_manager = DataManager()
+    data_manager = DataManager(GAME_IDENTIFIER, GLOBAL_SCORES_PATH)
+    leaderboard_pager = LeaderboardPager(data_manager)
     game = Game()
     current_player_name = player_name_arg
     current_player_email = player_email_arg
@@ -941,6 +914,9 @@ def start_game_loop(player_name_arg, player_email_arg):
                         if len(name_input_text) < 5 and (event.unicode.isalnum() or event.unicode.isspace()): name_input_text += event.unicode
                 continue
 
+            if game_state == "LEADERBOARD" and event.type == pygame.KEYDOWN:
+                handle_leaderboard_key(event)
+
             if game_state == "RUNNING":
                 if event.type == SNAKE_UPDATE and not is_paused:
                     game.update()
@@ -978,7 +954,9 @@ def start_game_loop(player_name_arg, player_email_arg):
                         if current_player_email and "@" in current_player_email: game_state = "NAME_INPUT_MENU"
                         else: game_state = "RUNNING"
                         stop_music()
-                    elif boton_rects.get("CLASIFICACIONES") and boton_rects["CLASIFICACIONES"].collidepoint(mouse_pos): game_state = "LEADERBOARD"
+                    elif boton_rects.get("CLASIFICACIONES") and boton_rects["CLASIFICACIONES"].collidepoint(mouse_pos):
+                        leaderboard_pager.first_page()
+                        game_state = "LEADERBOARD"
                     elif boton_rects.get("SALIR DEL JUEGO") and boton_rects["SALIR DEL JUEGO"].collidepoint(mouse_pos):
                         pygame.quit()
                         sys.exit()
@@ -1,11 +1,9 @@
 import os
 import sys
 import time
-import json
 import pygame
 import random
 
-from datetime import datetime
 
 player_email_global = ""
 player_email = ""
@@ -24,11 +22,8 @@ IMAGE_DIR = os.path.join(SCRIPT_DIR, "imagenes")
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-try:
-    from notificaciones.email_notifier import send_email_notification
-except ModuleNotFoundError as e:
-    print(f"Error importando notificaciones: {e}")
-    send_email_notification = None
+from puntajes.data_manager import DataManager, format_better_than, format_rank
+from puntajes.paging import LeaderboardPager
 
 print("DEBUG: __file__ =", __file__)
 print("DEBUG: SpaceInvaders BASE_DIR =", BASE_DIR)
@@ -47,98 +42,9 @@ if len(sys.argv) > 1:
     print(f"DEBUG: Email recibido -> {player_email}")
 
 
-# Sistema de datos
-class DataManager:
-    """Gestiona la carga y guardado de puntajes en el archivo JSON global."""
-    def __init__(self, scores_path=GLOBAL_SCORES_PATH, game_id=GAME_IDENTIFIER):
-        self.scores_path = scores_path
-        self.game_id = game_id
-
-    def _read_all_data(self):
-        if not os.path.exists(self.scores_path):
-            return {}
-        with open(self.scores_path, 'r', encoding='utf-8') as file:
-            try:
-                data = json.load(file)
-                if not isinstance(data, dict):
-                    return {}
-                return data
-            except json.JSONDecodeError:
-                return {}
-
-    def _save_all_data(self, all_data):
-        with open(self.scores_path, 'w', encoding='utf-8') as file:
-            json.dump(all_data, file, indent=4)
-
-    def load_game_scores(self):
-        all_data = self._read_all_data()
-        game_scores = all_data.get(self.game_id, [])
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        return game_scores[:10]
-
-    def update_score(self, name, email, score):
-        if not email or "@" not in email:
-            return False, 0
-
-        all_data = self._read_all_data()
-        if self.game_id not in all_data:
-            all_data[self.game_id] = []
-
-        game_scores = all_data[self.game_id]
-        prev_top = game_scores[0].copy() if game_scores else None
-        record_found = False
-        old_score = 0
-
-        for player in game_scores:
-            if player.get("email") == email:
-                record_found = True
-                old_score = player["score"]
-
-                if score > old_score:
-                    player["score"] = score
-                    player["name"] = name
-                    player["date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    return False, old_score
-                break
-
-        if not record_found:
-            game_scores.append({
-                "name": name,
-                "email": email,
-                "score": score,
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-
-        game_scores.sort(key=lambda x: x['score'], reverse=True)
-        all_data[self.game_id] = game_scores[:10]
-        self._save_all_data(all_data)
-
-        new_top = game_scores[0] if game_scores else None
-
-        if new_top and new_top["score"] > 0:
-            prev_score = prev_top["score"] if prev_top else 0
-            prev_email = prev_top["email"] if prev_top else None
-
-            if new_top["score"] > prev_score or new_top["email"] != prev_email:
-                try:
-                    if send_email_notification:
-                        send_email_notification(
-                            recipient_email=new_top["email"],
-                            game_name=self.game_id,
-                            score=new_top["score"],
-                            player_name=new_top["name"]
-                        )
-                except Exception as e:
-                    print(f"Error al enviar notificación: {e}")
-
-        return True, old_score
-
-    def get_top_scores(self):
-        return self.load_game_scores()
-
-
-data_manager = DataManager()
+data_manager = DataManager(GAME_IDENTIFIER, GLOBAL_SCORES_PATH)
+# Tabla de puntajes paginada (10 por página) con búsqueda por nombre
+leaderboard_pager = LeaderboardPager(data_manager)
 
 # Inicializacion de Pygame
 pygame.init()
@@ -480,7 +386,7 @@ def adjust_volumes():
 # - Tabla de puntajes
 def show_scores_screen():
     play_music_with_fade(menu_music_file, menu_volume, fade_ms=400)
-    scores = data_manager.load_game_scores()
+    leaderboard_pager.first_page()
     showing = True
 
     while showing:
@@ -488,18 +394,37 @@ def show_scores_screen():
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
-            if ev.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+            if ev.type == pygame.MOUSEBUTTONDOWN:
                 showing = False
+            elif ev.type == pygame.KEYDOWN:
+                if ev.key in (pygame.K_ESCAPE, pygame.K_RETURN): showing = False
+                elif ev.key == pygame.K_RIGHT: leaderboard_pager.next_page()
+                elif ev.key == pygame.K_LEFT: leaderboard_pager.prev_page()
+                elif ev.key == pygame.K_HOME: leaderboard_pager.first_page()
+                elif ev.key == pygame.K_TAB: leaderboard_pager.find_me(player_email)
+                elif ev.key == pygame.K_BACKSPACE: leaderboard_pager.backspace()
+                elif ev.unicode.isalnum(): leaderboard_pager.type_char(ev.unicode)
 
         update_stars()
         draw_background()
 
-        draw_text_center("TABLA DE PUNTAJES", font_big, YELLOW, WIDTH // 2, 60)
-        draw_text_center(" TOP 3 JUGADORES", font_med, YELLOW, WIDTH // 2, 120)
+        # Solo la página visible
+        page = leaderboard_pager.page()
+        scores = page["rows"]
+        page_number, page_count = leaderboard_pager.page_number(page)
+        page_label = f"Página {page_number} de {page_count}"
+        if leaderboard_pager.query:
+            page_label += f" | Buscar: {leaderboard_pager.query}" + ("" if leaderboard_pager.highlight else " (sin resultados)")
 
-        start_y = 160
-        for i, it in enumerate(scores[:3]):
-            rank = i + 1
+        draw_text_center("TABLA DE PUNTAJES", font_big, YELLOW, WIDTH // 2, 60)
+        draw_text_center(page_label, font_small, BLUE, WIDTH // 2, 95)
+
+        top = [(rank, it) for rank, it in scores if rank <= 3]
+        start_y = 120
+        if top:
+            draw_text_center(" TOP 3 JUGADORES", font_med, YELLOW, WIDTH // 2, 120)
+            start_y = 160
+        for i, (rank, it) in enumerate(top):
             line = f"{rank:02d}. {it['name']} — {it['score']}"
 
             if rank == 1: color = (255, 215, 0)
@@ -509,22 +434,24 @@ def show_scores_screen():
             rect_width = 400; rect_height = 45
             rect_x = WIDTH // 2 - rect_width // 2
             rect_y = start_y + i * (rect_height + 10)
-            pygame.draw.rect(screen, (30, 30, 30), (rect_x, rect_y, rect_width, rect_height), border_radius=8)
+            highlighted = it.get('email') and it.get('email') == leaderboard_pager.highlight
+            pygame.draw.rect(screen, (60, 60, 20) if highlighted else (30, 30, 30), (rect_x, rect_y, rect_width, rect_height), border_radius=8)
             pygame.draw.rect(screen, color, (rect_x, rect_y, rect_width, rect_height), 2, border_radius=8)
 
             font_top = pygame.font.SysFont("consolas", 32, bold=True)
             draw_text_center(line, font_top, color, WIDTH // 2, rect_y + rect_height // 2)
 
-        start_y += 3 * 55 + 20
-        draw_text_center("OTROS JUGADORES", font_med, WHITE, WIDTH // 2, start_y)
+        if top:
+            start_y += 3 * 55 + 20
+        draw_text_center("OTROS JUGADORES" if top else "JUGADORES", font_med, WHITE, WIDTH // 2, start_y)
 
-        for i, it in enumerate(scores[3:10]):
-            rank = i + 4
+        for i, (rank, it) in enumerate(scores[len(top):]):
             line = f"{rank:02d}. {it['name']} — {it['score']}"
-            color = WHITE
+            # La fila encontrada (búsqueda o "tu puesto") va en verde
+            color = GREEN if it.get('email') and it.get('email') == leaderboard_pager.highlight else WHITE
             draw_text_center(line, font_small, color, WIDTH // 2, start_y + 40 + i * 25)
 
-        draw_text_center("Clic o tecla para volver", font_small, BLUE, WIDTH // 2, HEIGHT - 40)
+        draw_text_center("← / → = página | TAB = tu puesto | letras = buscar | ESC o clic = volver", font_small, BLUE, WIDTH // 2, HEIGHT - 40)
 
         pygame.display.flip()
 
@@ -583,6 +510,12 @@ def game_over_screen_with_input(score):
         {"label": "Menú principal", "rect": pygame.Rect(WIDTH//2 - 160, HEIGHT//2 + 200, 320, 54), "color": RED, "action": "main_menu"}
     ]
 
+    # Mejor puntaje y puesto del jugador (aunque esté fuera del top 10)
+    best = data_manager.get_player_best(player_email)
+    rank = data_manager.get_player_rank(player_email)
+    # Comparación con todas las partidas del juego, no solo con el top 10
+    better = data_manager.get_better_than(score) if score > 0 else None
+
     showing = True
     while showing:
         clock.tick(FPS)
@@ -607,6 +540,12 @@ def game_over_screen_with_input(score):
         draw_background()
         draw_text_center("GAME OVER", font_big, RED, WIDTH//2, HEIGHT//2 - 120)
         draw_text_center(f"Puntos guardados: {score}", font_med, WHITE, WIDTH//2, HEIGHT//2 - 60)
+        if best:
+            draw_text_center(f"Tu mejor puntaje: {best['score']}", font_small, YELLOW, WIDTH//2, HEIGHT//2 - 20)
+        if rank:
+            draw_text_center(format_rank(*rank), font_small, YELLOW, WIDTH//2, HEIGHT//2 + 5)
+        if better is not None:
+            draw_text_center(format_better_than(better), font_small, WHITE, WIDTH//2, HEIGHT//2 + 30)
 
         for b in buttons:
             color = b["color"]
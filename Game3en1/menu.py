@@ -3,8 +3,10 @@ import sys
 import os
 import subprocess
 import random
-import json
 from pygame.locals import *
+from puntajes.cache import LeaderboardCache
+from puntajes.data_manager import format_rank
+from puntajes.score_store import get_store
 
 # Ruta base del script actual. Se usa para construir todas las demás rutas relativas
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
@@ -97,6 +99,7 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 #Verifica la existencia de la carpeta 'data' y el archivo 'global_scores.json' (si existen omite la creacion)
+#y precarga los puntajes en el ScoreStore compartido
 def initialize_data_storage():
     print("\n--- Verificando Almacenamiento de Datos ---")
     if not os.path.exists(DATA_PATH):
@@ -106,16 +109,20 @@ def initialize_data_storage():
         except OSError as e:
             print(f"ERROR: No se pudo crear la carpeta '{DATA_PATH}'. Verifica los permisos: {e}")
             sys.exit(1)
-    if not os.path.exists(GLOBAL_SCORES_PATH):
+    store = get_store(GLOBAL_SCORES_PATH)
+    # Los puntajes van en un archivo por juego (data/global_scores/); el JSON combinado viejo se sigue leyendo
+    scores_dir = os.path.splitext(GLOBAL_SCORES_PATH)[0]
+    if not os.path.exists(GLOBAL_SCORES_PATH) and not os.path.isdir(scores_dir):
         try:
-            with open(GLOBAL_SCORES_PATH, "w", encoding="utf-8") as f:
-                json.dump([], f, indent=4)
-            print(f"[DEBUG] Archivo JSON creado en: {GLOBAL_SCORES_PATH}")
+            store.ensure_file()
+            print(f"[DEBUG] Carpeta de puntajes creada en: {scores_dir}")
         except Exception as e:
             print(f"ERROR: No se pudo crear el archivo JSON. Verifica permisos: {e}")
             sys.exit(1)
     else:
         print("[DEBUG] El archivo 'global_scores.json' ya existe.")
+    # Se lee una sola vez; los juegos reutilizan los puntajes ya cargados en memoria
+    store.load()
     print("------------------------------------------\n")
 
 #Carga la fuente designada para el menú, botones y texto general
@@ -299,6 +306,26 @@ def input_box_logic_retro(screen, rect, text, active, cursor_pos, default_text="
 
     return clear_rect, is_hover
 
+# Juegos del perfil del jugador (id en los puntajes, nombre en pantalla)
+PROFILE_GAMES = [("SNAKE", "SNAKE"), ("SPACEINVADERS", "SPACE INVADERS"), ("FLAPPY", "FLAPPY BIRD")]
+
+#Dibuja el puesto, récord y partidas del jugador en los 3 juegos (debajo del menú)
+def draw_player_profile(screen, profile, y_start):
+    profile_font = get_font(18)
+    for i, (game_id, label) in enumerate(PROFILE_GAMES):
+        entry = profile.get(game_id)
+        if not entry:
+            line = f"{label}: sin partidas"
+        else:
+            plays = entry['plays']
+            line = f"{label}: {entry['best']} pts"
+            if entry['rank']:
+                line += f" - {format_rank(entry['rank'], entry['total'])}"
+            if plays:
+                line += f" - {plays} partida{'s' if plays != 1 else ''}"
+        surf = profile_font.render(line, True, COLORS['button_grey'])
+        screen.blit(surf, surf.get_rect(center=(SCREENWIDTH // 2, y_start + i * 22)))
+
 # Ejecuta los juegos como módulos en lugar de procesos separados
 def run_game(game_function, player_email):
     try:
@@ -567,6 +594,9 @@ def main():
             {"text": "SALIR", "action": lambda: sys.exit()}
         ]
 
+    # Perfil del jugador en los 3 juegos: se lee de su archivo de perfiles, sin cargar las tablas
+    profile_cache = LeaderboardCache(get_store(GLOBAL_SCORES_PATH))
+
     selected_index = 0
     blink_timer = 0
     blink_state = True # Esta variable controla el parpadeo del título y el menú
@@ -727,6 +757,10 @@ def main():
                 SCREEN.blit(cursor_open, (pos[1] - 30, pos[1]))
                 SCREEN.blit(cursor_close, (pos[0] + text_w + 15, pos[1]))
 
+        # Perfil del jugador (solo con un email válido)
+        if "@" in email_text and "." in email_text:
+            draw_player_profile(SCREEN, profile_cache.player_profile(email_text), SCREENHEIGHT - 120)
+
         # Controles inferiores (instrucciones e interruptores)
         note_font = get_font(16)
         SCREEN.blit(
@@ -0,0 +1,317 @@
+import os
+import time
+import atexit
+import threading
+
+from notificaciones.email_notifier import SPOOL_DIR, resend_spooled, send_record_digest, spool_record_digest
+
+# Máximo de destinatarios esperando envío
+QUEUE_SIZE = 100
+
+# Qué hacer con la cola llena: "drop_new" descarta el récord nuevo (por defecto),
+# "drop_oldest" descarta el destinatario más viejo de la cola y "block" espera
+# hasta BLOCK_TIMEOUT a que haya lugar (para el servicio de puntajes, no para los juegos)
+OVERFLOW_POLICY = os.environ.get("GAME3EN1_NOTIFY_POLICY", "drop_new").strip().lower()
+BLOCK_TIMEOUT = 1.0
+
+# Mails por segundo como máximo (token bucket) y cuántos seguidos se permiten de golpe (0: sin límite)
+SEND_RATE = float(os.environ.get("GAME3EN1_NOTIFY_RATE", "1"))
+SEND_BURST = 10
+
+# Si un envío falla, segundos sin intentar otro (se duplica con cada falla seguida, hasta el máximo)
+FAILURE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Intentos por resumen; después se le pasa a on_failed (el del proceso lo deja en el spool de .eml)
+MAX_ATTEMPTS = 5
+
+# Segundos que se espera al salir del juego para terminar de mandar lo pendiente
+SHUTDOWN_TIMEOUT = 5.0
+
+# Segundos que se juntan los récords de un mismo jugador antes de mandarle un solo mail (0: sin esperar)
+DIGEST_WINDOW = float(os.environ.get("GAME3EN1_NOTIFY_WINDOW", "60"))
+
+
+class TokenBucket:
+    """
+    Limita los envíos a rate por segundo, con ráfagas de hasta burst.
+
+    Solo lo usa el hilo de envío: esperar un token nunca frena al juego.
+    """
+
+    def __init__(self, rate=SEND_RATE, burst=SEND_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+
+    def wait_time(self):
+        """Segundos hasta que haya un token (0.0 si ya hay)."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        if self.rate > 0:
+            self._tokens -= 1
+
+
+class NotificationDispatcher:
+    """
+    Cola de notificaciones con un hilo que las manda de a una.
+
+    El juego encola y sigue: el handshake SMTP, el login y el envío pasan
+    en el hilo, nunca en el bucle de dibujo (sin conexión el game over ya
+    no se congela hasta el timeout). La cola tiene un tamaño máximo para
+    que un servidor de correo caído no acumule memoria, y al salir del
+    juego se espera hasta SHUTDOWN_TIMEOUT a que se vacíe.
+
+    El hilo respeta un límite de mails por segundo (TokenBucket) y, si un
+    envío falla, espera un rato creciente antes del siguiente: un servidor
+    caído o lento solo llena la cola, y con la cola llena se aplica policy
+    (descartar el nuevo, descartar el más viejo o esperar un poco). El
+    resumen que falló vuelve al frente de la cola; tras max_attempts
+    intentos (o si al salir no se llegó a mandar) pasa a on_failed.
+
+    Los récords de un mismo destinatario se juntan durante window segundos
+    desde el primero: un jugador en racha recibe un solo mail (resumen) con
+    el mejor puntaje de cada juego, en vez de uno por partida. Al salir se
+    manda todo lo pendiente sin esperar la ventana.
+    """
+
+    def __init__(self, send, max_size=QUEUE_SIZE, window=DIGEST_WINDOW, name="notifier",
+                 policy=OVERFLOW_POLICY, limiter=None, block_timeout=BLOCK_TIMEOUT, backoff=FAILURE_BACKOFF,
+                 max_attempts=MAX_ATTEMPTS):
+        self.send = send  # send(recipient_email, events); False si no se pudo mandar
+        self.max_size = max_size
+        self.window = window
+        self.name = name
+        self.policy = policy
+        self.limiter = limiter if limiter is not None else TokenBucket()
+        self.block_timeout = block_timeout
+        self.backoff = backoff
+        self.max_attempts = max(1, max_attempts)
+        self.on_evict = None  # on_evict(recipient_email, events) con lo que descarta "drop_oldest"
+        self.on_failed = None  # on_failed(recipient_email, events) con lo que no se pudo mandar
+        self.on_start = None  # on_start(dispatcher): corre una vez en el hilo, antes del primer envío
+        self.dropped = 0
+        self.coalesced = 0  # récords que se sumaron a un mail ya pendiente
+        self.sent = 0
+        self.failed = 0  # envíos fallidos (cada intento)
+        self.retried = 0  # resúmenes que volvieron a la cola tras fallar
+        self.gave_up = 0  # resúmenes que se pasaron a on_failed
+        self._failures = 0  # fallas seguidas
+        self._resume_at = 0.0  # hasta cuándo se espera tras una falla
+        self._cond = threading.Condition()
+        self._pending = {}  # destinatario -> (hora de envío, {juego: evento}), en orden de llegada
+        self._attempts = {}  # destinatario -> intentos fallidos del resumen pendiente
+        self._flushing = 0
+        self._busy = False
+        self._thread = None
+        atexit.register(self.close)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, recipient_email, game_name, score, player_name=None):
+        """Encola un récord. Retorna False si la cola estaba llena y se descartó."""
+        with self._cond:
+            entry = self._pending.get(recipient_email)
+            if entry is None:
+                if len(self._pending) >= self.max_size and not self._make_room():
+                    self.dropped += 1
+                    print(f"AVISO: cola de notificaciones llena, se descarta la de {recipient_email}.")
+                    return False
+                entry = self._pending.get(recipient_email)
+            if entry is None:
+                entry = self._pending[recipient_email] = (time.monotonic() + self.window, {})
+            else:
+                self.coalesced += 1
+            events = entry[1]
+            event = events.get(game_name)
+            if event is None:
+                events[game_name] = {"game_name": game_name, "score": score,
+                                     "player_name": player_name, "count": 1}
+            else:
+                # Misma racha: queda el mejor puntaje y se cuentan los récords
+                event["count"] += 1
+                if score >= event["score"]:
+                    event["score"] = score
+                    event["player_name"] = player_name
+            self._start()
+            self._cond.notify_all()
+        return True
+
+    def _make_room(self):
+        # Con el candado tomado y la cola llena; retorna True si se hizo lugar
+        if self.policy == "drop_oldest":
+            recipient = next(iter(self._pending))
+            _, events = self._pending.pop(recipient)
+            self._attempts.pop(recipient, None)
+            self.dropped += sum(event["count"] for event in events.values())
+            print(f"AVISO: cola de notificaciones llena, se descarta la de {recipient}.")
+            if self.on_evict:
+                self.on_evict(recipient, list(events.values()))
+            return True
+        if self.policy == "block":
+            self._start()
+            return self._cond.wait_for(lambda: len(self._pending) < self.max_size, self.block_timeout)
+        return False
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def flush(self, timeout=SHUTDOWN_TIMEOUT):
+        """Manda ya lo pendiente (sin esperar la ventana). Retorna False si se agotó el tiempo."""
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                done = self._cond.wait_for(lambda: not (self._pending or self._busy), timeout)
+            finally:
+                self._flushing -= 1
+        if not done:
+            print(f"AVISO: quedaron {self.pending()} notificación(es) sin enviar al salir.")
+        return done
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT):
+        """Al salir: manda lo que se pueda y lo que queda en la cola pasa a on_failed."""
+        if self.flush(timeout) or self.on_failed is None:
+            return
+        with self._cond:
+            leftover = list(self._pending.items())
+            self._pending.clear()
+            self._attempts.clear()
+        for recipient, (_, events) in leftover:
+            self._give_up(recipient, events)
+
+    def _requeue(self, recipient, events, attempts):
+        # Con el candado tomado: el resumen vuelve al frente (lo demora el backoff, no la ventana)
+        entry = self._pending.pop(recipient, None)
+        if entry is not None:
+            # Llegaron récords nuevos mientras se intentaba: se juntan con los que fallaron
+            for game_name, event in entry[1].items():
+                failed = events.get(game_name)
+                if failed is None:
+                    events[game_name] = event
+                    continue
+                failed["count"] += event["count"]
+                if event["score"] >= failed["score"]:
+                    failed["score"] = event["score"]
+                    failed["player_name"] = event["player_name"]
+        self._pending = {recipient: (time.monotonic(), events), **self._pending}
+        self._attempts[recipient] = attempts
+        self.retried += 1
+
+    def _give_up(self, recipient, events):
+        self.gave_up += 1
+        print(f"AVISO: no se pudo mandar la notificación de {recipient}.")
+        if self.on_failed is None:
+            return
+        try:
+            self.on_failed(recipient, list(events.values()))
+        except Exception as e:
+            print(f"Error al guardar la notificación de {recipient}: {e}")
+
+    def _next_due(self):
+        # Todos esperan la misma ventana: el primero que llegó es el primero que vence
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        if self._flushing:
+            due = now
+        else:
+            due, _ = next(iter(self._pending.values()))
+        # Ni la ventana ni el flush se saltean el límite de envíos ni la espera tras una falla
+        due = max(due, now + self.limiter.wait_time(), self._resume_at)
+        return max(0.0, due - now)
+
+    def _run(self):
+        on_start, self.on_start = self.on_start, None
+        if on_start is not None:
+            try:
+                on_start(self)
+            except Exception as e:
+                print(f"Error al iniciar el envío de notificaciones: {e}")
+        while True:
+            with self._cond:
+                while True:
+                    wait = self._next_due()
+                    if wait == 0.0:
+                        break
+                    self._cond.wait(wait)
+                recipient = next(iter(self._pending))
+                _, events = self._pending.pop(recipient)
+                attempts = self._attempts.pop(recipient, 0) + 1
+                self.limiter.take()
+                self._busy = True
+                # Se hizo lugar: destraba a quien espera con policy "block"
+                self._cond.notify_all()
+            ok = False
+            try:
+                ok = self.send(recipient, list(events.values())) is not False
+            except Exception as e:
+                print(f"Error al enviar notificación: {e}")
+            with self._cond:
+                if ok:
+                    self.sent += 1
+                    self._failures = 0
+                else:
+                    self.failed += 1
+                    self._failures += 1
+                    backoff = min(MAX_BACKOFF, self.backoff * 2 ** (self._failures - 1))
+                    self._resume_at = time.monotonic() + backoff
+                    if attempts < self.max_attempts:
+                        self._requeue(recipient, events, attempts)
+            if not ok and attempts >= self.max_attempts:
+                # Fuera del candado: on_failed escribe a disco
+                self._give_up(recipient, events)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+def resend_spool(dispatcher):
+    """on_start de los dispatchers: reenvía los .eml que quedaron de otras sesiones."""
+    def wait_token():
+        # Los reenvíos también respetan el límite de mails por segundo
+        time.sleep(dispatcher.limiter.wait_time())
+        dispatcher.limiter.take()
+
+    sent = resend_spooled(before_send=wait_token)
+    if sent:
+        print(f"Se reenviaron {sent} notificación(es) pendientes de {SPOOL_DIR}.")
+
+
+def new_dispatcher(name="notifier", policy=OVERFLOW_POLICY):
+    """Dispatcher por el transporte del proceso; lo que no se pudo mandar queda en el spool."""
+    dispatcher = NotificationDispatcher(send_record_digest, name=name, policy=policy)
+    # Lo que no se pudo mandar queda como .eml en data/notificaciones/ (no se pierde) y
+    # se reenvía cuando el dispatcher de otra sesión arranca
+    dispatcher.on_failed = spool_record_digest
+    dispatcher.on_start = resend_spool
+    return dispatcher
+
+
+# Un único dispatcher por proceso para los juegos (el servicio de puntajes arma el suyo)
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = new_dispatcher()
+        return _dispatcher
+
+
+def notify_record(recipient_email, game_name, score, player_name=None):
+    """Encola el mail de nuevo récord; vuelve enseguida. Retorna False si se descartó."""
+    return get_dispatcher().submit(recipient_email, game_name, score, player_name)
@@ -1,7 +1,14 @@
+import os
 import smtplib
+from email import message_from_binary_file
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import ssl # Necesario para crear un contexto de conexión segura
+import time
+import atexit
+import threading
+
+from notificaciones.transports import SMTPTransport, SpoolTransport, WebhookTransport
 
 # --- CONFIGURACIÓN DE CREDENCIALES Y SERVIDOR ---
 # IMPORTANTE: Cambia estas variables por tu configuración real.
@@ -14,17 +21,140 @@ SENDER_APP_PASSWORD = "cvzh gqfp lypp hlol" # Contraseña de aplicación generad
 SMTP_SERVER = "smtp.gmail.com"
 SMTP_PORT = 465 
 
+# Segundos máximos de espera al conectar o enviar (sin internet no se queda colgado)
+SMTP_TIMEOUT = 10
+# Una conexión sin usar por más de esto se da por cerrada del lado del servidor (no se prueba con NOOP)
+SMTP_MAX_IDLE = 240
+
+# Por dónde salen los mails: "smtp" (por defecto, Gmail), "spool" (archivos .eml en
+# data/notificaciones/, sin red) o "webhook" (POST con JSON a un servicio local)
+NOTIFY_TRANSPORT = os.environ.get("GAME3EN1_NOTIFY_TRANSPORT", "smtp").strip().lower()
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SPOOL_DIR = os.environ.get("GAME3EN1_NOTIFY_SPOOL", os.path.join(BASE_DIR, "data", "notificaciones"))
+WEBHOOK_URL = os.environ.get("GAME3EN1_NOTIFY_WEBHOOK", "http://127.0.0.1:8090/notify")
+# Segundos tras los que un .eml que se estaba reenviando se da por abandonado (el proceso se cerró a mitad)
+RESEND_CLAIM_TIMEOUT = 600
+
+
+class SMTPConnection:
+    """
+    Conexión SMTP autenticada que se reutiliza entre notificaciones.
+
+    Antes de cada envío se prueba con NOOP; si el servidor la cerró (o
+    pasó SMTP_MAX_IDLE sin usarla) se reconecta y se vuelve a hacer login
+    sin que se entere quien manda el mail. Una noche con muchos récords
+    cuesta un solo handshake TLS en vez de uno por mail.
+    """
+
+    def __init__(self, host=SMTP_SERVER, port=SMTP_PORT, user=SENDER_EMAIL, password=SENDER_APP_PASSWORD,
+                 timeout=SMTP_TIMEOUT, max_idle=SMTP_MAX_IDLE, use_ssl=True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.max_idle = max_idle
+        # Sin SSL solo para servidores locales de prueba
+        self.use_ssl = use_ssl
+        self.connects = 0  # handshakes hechos (para medir)
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(self.host, self.port, context=context, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    def _alive(self):
+        if self._server is None or time.monotonic() - self._last_used > self.max_idle:
+            return False
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _drop(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+
+    def send(self, msg):
+        with self._lock:
+            if not self._alive():
+                self._drop()
+                self._server = self._connect()
+            try:
+                self._server.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError) as e:
+                # La conexión se cortó entre el NOOP y el envío: un solo reintento con una nueva
+                if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code not in (421, 451):
+                    raise
+                self._drop()
+                self._server = self._connect()
+                self._server.send_message(msg)
+            self._last_used = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._server = None
+
+
+# Conexión compartida por todas las notificaciones del proceso
+_connection = SMTPConnection()
+
+
+def make_transport(kind=NOTIFY_TRANSPORT):
+    if kind == "spool":
+        return SpoolTransport(SPOOL_DIR)
+    elif kind == "webhook":
+        return WebhookTransport(WEBHOOK_URL)
+    return SMTPTransport(_connection)
+
+
+# Salida de los mails del proceso; se cierra al salir
+_transport = make_transport()
+atexit.register(lambda: _transport.close())
+
+
+def use_transport(transport):
+    """Cambia la salida de los mails (ej.: SMTP al servidor local de smtp_sink.py). Retorna la anterior."""
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
 
 # FUNCIÓN PRINCIPAL DE ENVÍO
-def send_email_notification(recipient_email, game_name, score, player_name=None):
+def send_email_notification(recipient_email, game_name, score, player_name=None, transport=None):
     """
     Envía una notificación de récord por correo electrónico en formato HTML y texto plano.
     
+    Retorna True si el servidor aceptó el correo.
+
     Parámetros:
     - recipient_email (str): El correo del destinatario.
     - game_name (str): Nombre del juego donde se batió el récord.
     - score (int): El puntaje alcanzado.
     - player_name (str, opcional): Nombre del jugador.
+    - transport (opcional): Salida del mail; por defecto la del proceso.
     """
     # Si no se pasa nombre, usar el del email (antes del @) como respaldo.
     if not player_name:
@@ -71,6 +201,131 @@ Sigue jugando y defiende tu posición.
     </html>
     """
 
+    return _deliver(recipient_email, subject, text_content, html_content, transport)
+
+
+def send_record_digest(recipient_email, events, transport=None):
+    """
+    Envía en un solo correo los récords de un jugador juntados por el dispatcher.
+
+    events es una lista de dicts con game_name, score (el mejor de la
+    racha), player_name y count (cuántos récords se juntaron). Con un
+    solo récord el mail es el mismo de send_email_notification.
+    """
+    if len(events) == 1 and events[0].get("count", 1) == 1:
+        event = events[0]
+        return send_email_notification(recipient_email, event["game_name"], event["score"],
+                                       event.get("player_name"), transport)
+
+    player_name = events[-1].get("player_name") or recipient_email.split('@')[0] or "Jugador"
+    games = [event["game_name"] for event in events]
+    games_text = games[0] if len(games) == 1 else ", ".join(games[:-1]) + " y " + games[-1]
+    subject = f"🏆 ¡Nuevos récords en {games_text}!"
+
+    lines = []
+    for event in events:
+        count = event.get("count", 1)
+        streak = f" ({count} récords seguidos)" if count > 1 else ""
+        lines.append((event["game_name"], f"{event['score']:,}", streak))
+
+    text_content = f"""
+¡Felicidades {player_name}! 🎉
+
+Estás en el primer puesto del ranking:
+""" + "".join(f"- {game}: {score} puntos{streak}\n" for game, score, streak in lines) + """
+Sigue jugando y defiende tu posición.
+"""
+
+    items_html = "".join(
+        f'<li><span style="color:#2b6cb0; font-weight:bold;">{game}</span>: <b>{score}</b> puntos{streak}</li>'
+        for game, score, streak in lines)
+    html_content = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; background-color:#f4f4f4; padding:20px;">
+        <div style="max-width:600px; margin:auto; background:#fff; border-radius:8px; padding:20px; border:1px solid #ddd;">
+            <h2 style="color:#2b6cb0; text-align:center;">🏆 ¡Nuevos Récords!</h2>
+            <p style="font-size:16px; color:#333;">
+                <b>¡Felicidades, {player_name}!</b><br>
+                Estás en el <b>primer puesto</b> del ranking:
+            </p>
+            <ul style="font-size:15px; color:#333;">{items_html}</ul>
+            <p style="font-size:15px; color:#333;">¡Sigue jugando y defiende tu posición!</p>
+            <hr style="margin:20px 0;">
+            <p style="font-size:13px; color:#888; text-align:center;">
+                Este mensaje fue enviado automáticamente por el sistema de puntuaciones del juego 3 en 1.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+
+    return _deliver(recipient_email, subject, text_content, html_content, transport)
+
+
+def spool_record_digest(recipient_email, events):
+    """Deja el resumen como .eml en SPOOL_DIR: lo usa el dispatcher con lo que no pudo mandar."""
+    return send_record_digest(recipient_email, events, SpoolTransport(SPOOL_DIR))
+
+
+def resend_spooled(transport=None, directory=SPOOL_DIR, before_send=None):
+    """
+    Reenvía los .eml que dejó spool_record_digest y borra cada uno cuando sale.
+
+    Cada archivo se reserva renombrándolo a .sending, así dos procesos no
+    mandan el mismo mail. Se corta en la primera falla (el archivo vuelve a
+    .eml para la próxima vez). before_send() se llama antes de cada mail
+    (el dispatcher lo usa para respetar su límite de envíos). Con el spool
+    como salida no se reenvía nada. Retorna cuántos se mandaron.
+    """
+    transport = transport or _transport
+    if isinstance(transport, SpoolTransport):
+        return 0
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return 0
+    sent = 0
+    for name in names:
+        path = os.path.join(directory, name)
+        if name.endswith(".eml"):
+            original = path
+        elif name.endswith(".eml.sending") and _claim_expired(path):
+            original = path[:-len(".sending")]
+        else:
+            continue
+        claimed = original + ".sending"
+        try:
+            os.replace(path, claimed)
+            os.utime(claimed)
+        except OSError:
+            continue  # Lo tomó otro proceso
+        if before_send:
+            before_send()
+        try:
+            with open(claimed, 'rb') as file:
+                msg = message_from_binary_file(file)
+            transport.send(msg)
+        except Exception as e:
+            print(f"⚠️ Error al reenviar {name}: {e}")
+            try:
+                os.replace(claimed, original)
+            except OSError:
+                pass
+            break
+        os.remove(claimed)
+        sent += 1
+        print(f"✅ Email pendiente reenviado a {msg['To']} ({transport.name})")
+    return sent
+
+
+def _claim_expired(path):
+    try:
+        return time.time() - os.stat(path).st_mtime > RESEND_CLAIM_TIMEOUT
+    except OSError:
+        return False
+
+
+def _deliver(recipient_email, subject, text_content, html_content, transport=None):
     # Crear mensaje MIME multipart (para enviar HTML y texto plano)
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
@@ -89,12 +344,14 @@ Sigue jugando y defiende tu posición.
         # --- MODIFICACIÓN ANTI-SPAM CLAVE 2 ---
         # Usamos smtplib.SMTP_SSL y el puerto 465. 
         # Esta conexión cifrada implícita es muy confiable con Gmail y reduce el riesgo de spam.
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, context=context) as server:
-            server.login(SENDER_EMAIL, SENDER_APP_PASSWORD)
-            server.send_message(msg)
+        # La conexión queda abierta para los próximos mails (ver SMTPConnection).
+        # Con GAME3EN1_NOTIFY_TRANSPORT el mail puede ir a un spool o a un webhook.
+        transport = transport or _transport
+        transport.send(msg)
 
-        print(f"✅ Email enviado correctamente a {recipient_email}")
+        print(f"✅ Email enviado correctamente a {recipient_email} ({transport.name})")
+        return True
 
     except Exception as e:
-        print(f"⚠️ Error al enviar correo a {recipient_email}: {e}")
\ No newline at end of file
+        print(f"⚠️ Error al enviar correo a {recipient_email}: {e}")
+        return False
\ No newline at end of file
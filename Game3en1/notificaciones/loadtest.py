@@ -0,0 +1,265 @@
+"""
+Prueba de carga de las notificaciones, sin internet: manda miles de récords
+sintéticos por el mismo camino que el juego (dispatcher -> resumen ->
+conexión SMTP) contra el servidor local de smtp_sink.py.
+
+Reporta cuánto tarda encolar (lo que paga el juego), la latencia de punta
+a punta de cada récord hasta que el servidor acepta el mail, mails/s y
+qué pasa cuando el servidor rechaza mails o corta la conexión. También
+prueba las otras salidas (spool en una carpeta temporal, webhook local)
+y el límite de mails por segundo y la política de cola llena.
+
+Desde la carpeta Game3en1:
+    python notificaciones/loadtest.py
+    python notificaciones/loadtest.py --events 5000 --recipients 50 --window 0.2
+    python notificaciones/loadtest.py --fail-rate 0.1 --drop-rate 0.05 --json resultados.json
+    python notificaciones/loadtest.py --transport webhook --mail-rate 200 --policy drop_oldest
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from notificaciones.dispatcher import NotificationDispatcher, TokenBucket, QUEUE_SIZE, SEND_BURST
+from notificaciones.email_notifier import SMTPConnection, send_record_digest, use_transport
+from notificaciones.smtp_sink import SMTPSink
+from notificaciones.transports import SMTPTransport, SpoolTransport, WebhookTransport
+
+DEFAULT_EVENTS = 2000
+DEFAULT_RECIPIENTS = 200
+GAMES = ("SNAKE", "FLAPPY", "SPACEINVADERS")
+TRANSPORTS = ("smtp", "spool", "webhook")
+POLICIES = ("drop_new", "drop_oldest", "block")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class WebhookSink:
+    """Servicio HTTP local que recibe los mails del WebhookTransport (rechaza fail_rate con 503)."""
+
+    def __init__(self, fail_rate=0.0, delay=0.0, seed=None):
+        sink = self
+        self.stats = {"accepted": 0, "rejected": 0}
+        rng = random.Random(seed)
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if delay:
+                    time.sleep(delay)
+                with lock:
+                    failed = rng.random() < fail_rate
+                    sink.stats["rejected" if failed else "accepted"] += 1
+                self.send_response(503 if failed else 200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/notify"
+        threading.Thread(target=self.server.serve_forever, name="webhook-sink", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run(events=DEFAULT_EVENTS, recipients=DEFAULT_RECIPIENTS, window=0.0, queue_size=QUEUE_SIZE,
+        rate=0.0, fail_rate=0.0, drop_rate=0.0, delay=0.0, seed=1, transport="smtp",
+        mail_rate=0.0, policy="drop_new", backoff=0.05):
+    """Una corrida completa; retorna el resumen como dict."""
+    connection = sink = folder = None
+    if transport == "spool":
+        folder = tempfile.mkdtemp(prefix="loadtest_spool_")
+        output = SpoolTransport(folder)
+    elif transport == "webhook":
+        sink = WebhookSink(fail_rate, delay, seed)
+        output = WebhookTransport(sink.url)
+    else:
+        sink = SMTPSink(port=0, fail_rate=fail_rate, drop_rate=drop_rate, delay=delay, seed=seed).start()
+        connection = SMTPConnection(sink.host, sink.port, user=None, use_ssl=False)
+        output = SMTPTransport(connection)
+    previous = use_transport(output)
+
+    lock = threading.Lock()
+    submitted_at = defaultdict(deque)  # destinatario -> horas de encolado, en orden
+    end_to_end = []
+    results = {"delivered": 0, "failed": 0, "emails": 0}
+
+    def send(recipient, batch):
+        ok = send_record_digest(recipient, batch)
+        now = time.perf_counter_ns()
+        with lock:
+            results["emails"] += 1
+            if ok:
+                # El dispatcher manda en orden de llegada: los primeros count encolados son los de este mail
+                count = sum(event["count"] for event in batch)
+                times = submitted_at[recipient]
+                end_to_end.extend(now - times.popleft() for _ in range(min(count, len(times))))
+                results["delivered"] += count
+        return ok
+
+    def failed(recipient, batch):
+        # Se agotaron los intentos: esos récords no llegan
+        count = sum(event["count"] for event in batch)
+        with lock:
+            times = submitted_at[recipient]
+            for _ in range(min(count, len(times))):
+                times.popleft()
+            results["failed"] += count
+
+    dispatcher = NotificationDispatcher(send, max_size=queue_size, window=window, name="notifier-loadtest",
+                                        policy=policy, limiter=TokenBucket(mail_rate, SEND_BURST),
+                                        backoff=backoff)
+
+    def evicted(recipient, batch):
+        # Lo descartado era lo último encolado para ese destinatario (submit corre con lock tomado)
+        times = submitted_at[recipient]
+        for _ in range(min(len(times), sum(event["count"] for event in batch))):
+            times.pop()
+
+    dispatcher.on_evict = evicted
+    dispatcher.on_failed = failed
+    rng = random.Random(seed)
+    emails = [f"jugador{i}@example.com" for i in range(recipients)]
+    submit_latencies = []
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            for i in range(events):
+                if rate:
+                    # Ritmo fijo de récords por segundo (sin --rate: lo más rápido posible)
+                    pause = started + i / rate - time.perf_counter()
+                    if pause > 0:
+                        time.sleep(pause)
+                email = rng.choice(emails)
+                game = rng.choice(GAMES)
+                score = rng.randint(1, 100000)
+                # Con "block" submit puede esperar al hilo de envío, que también toma lock
+                if policy == "block":
+                    with lock:
+                        t0 = time.perf_counter_ns()
+                        submitted_at[email].append(t0)
+                    accepted = dispatcher.submit(email, game, score, email.split('@')[0])
+                else:
+                    with lock:
+                        t0 = time.perf_counter_ns()
+                        submitted_at[email].append(t0)
+                        accepted = dispatcher.submit(email, game, score, email.split('@')[0])
+                submit_latencies.append(time.perf_counter_ns() - t0)
+                if not accepted:
+                    with lock:
+                        submitted_at[email].pop()
+            submit_seconds = time.perf_counter() - started
+            drained = dispatcher.flush(timeout=max(60.0, events * 0.05))
+            elapsed = time.perf_counter() - started
+    finally:
+        output.close()
+        use_transport(previous)
+        if sink is not None:
+            sink.stop()
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    submit_latencies.sort()
+    end_to_end.sort()
+    return {
+        "transport": transport,
+        "events": events,
+        "recipients": recipients,
+        "mail_rate": mail_rate,
+        "policy": policy,
+        "window_s": window,
+        "fail_rate": fail_rate,
+        "drop_rate": drop_rate,
+        "submit_p50_us": percentile(submit_latencies, 0.50) / 1000,
+        "submit_p99_us": percentile(submit_latencies, 0.99) / 1000,
+        "submit_max_us": (submit_latencies[-1] if submit_latencies else 0) / 1000,
+        "e2e_p50_ms": percentile(end_to_end, 0.50) / 1e6,
+        "e2e_p95_ms": percentile(end_to_end, 0.95) / 1e6,
+        "e2e_p99_ms": percentile(end_to_end, 0.99) / 1e6,
+        "submit_s": submit_seconds,
+        "total_s": elapsed,
+        "events_per_s": results["delivered"] / elapsed if elapsed > 0 else 0.0,
+        "emails_per_s": results["emails"] / elapsed if elapsed > 0 else 0.0,
+        "emails": results["emails"],
+        "delivered": results["delivered"],
+        "failed": results["failed"],
+        "dropped": dispatcher.dropped,
+        "coalesced": dispatcher.coalesced,
+        "retried": dispatcher.retried,
+        "drained": drained,
+        "reconnects": max(0, connection.connects - 1) if connection else 0,
+        "sink": dict(sink.stats) if sink else {},
+    }
+
+
+def print_result(r):
+    print(f"\n== {r['transport']}: {r['events']:,} récords, {r['recipients']} destinatarios, "
+          f"ventana={r['window_s']}s, límite={r['mail_rate'] or 'sin'} mails/s, cola llena={r['policy']}, "
+          f"rechazos={r['fail_rate']:.0%}, cortes={r['drop_rate']:.0%}")
+    print(f"encolar (juego)     p50={r['submit_p50_us']:.1f}µs  p99={r['submit_p99_us']:.1f}µs  "
+          f"máx={r['submit_max_us']:.1f}µs")
+    print(f"punta a punta       p50={r['e2e_p50_ms']:.1f}ms  p95={r['e2e_p95_ms']:.1f}ms  "
+          f"p99={r['e2e_p99_ms']:.1f}ms")
+    print(f"rendimiento         {r['emails_per_s']:,.0f} mails/s  {r['events_per_s']:,.0f} récords/s  "
+          f"(total {r['total_s']:.2f}s)")
+    print(f"mails               {r['emails']:,} enviados: {r['delivered']:,} récords entregados, "
+          f"{r['failed']:,} fallidos ({r['retried']:,} reintentos)")
+    print(f"cola                {r['dropped']:,} descartados (cola llena), {r['coalesced']:,} juntados en resumen"
+          + ("" if r["drained"] else ", NO SE VACIÓ"))
+    print(f"conexión            {r['reconnects']} reconexiones; servidor: {r['sink']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de las notificaciones contra un SMTP local.")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="récords sintéticos a encolar")
+    parser.add_argument("--recipients", type=int, default=DEFAULT_RECIPIENTS, help="jugadores distintos")
+    parser.add_argument("--window", type=float, default=0.0, help="ventana de resumen en segundos")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="máximo de destinatarios en cola")
+    parser.add_argument("--rate", type=float, default=0.0, help="récords por segundo (0: lo más rápido posible)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fracción de mails que el servidor rechaza")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fracción de mails en que corta la conexión")
+    parser.add_argument("--delay", type=float, default=0.0, help="segundos que tarda el servidor por mail")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="smtp", help="salida de los mails")
+    parser.add_argument("--mail-rate", type=float, default=0.0, help="límite de mails por segundo (0: sin límite)")
+    parser.add_argument("--policy", choices=POLICIES, default="drop_new", help="qué hacer con la cola llena")
+    parser.add_argument("--backoff", type=float, default=0.05, help="segundos de espera tras un envío fallido")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="guarda el resultado en este archivo para comparar corridas")
+    args = parser.parse_args(argv)
+
+    result = run(args.events, args.recipients, args.window, args.queue_size, args.rate,
+                 args.fail_rate, args.drop_rate, args.delay, args.seed, args.transport,
+                 args.mail_rate, args.policy, args.backoff)
+    print_result(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Servidor SMTP local de prueba: acepta los mails y no los manda a ningún lado.
+
+Sirve para probar y medir las notificaciones sin una cuenta de Gmail
+(ver loadtest.py). Puede simular un servidor lento o que falla: rechazar
+una parte de los mails (451) o cortar la conexión a mitad del envío.
+
+Desde la carpeta Game3en1:
+    python notificaciones/smtp_sink.py --port 8025
+    python notificaciones/smtp_sink.py --port 8025 --fail-rate 0.1 --save-dir mails
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+SINK_HOST = "127.0.0.1"
+SINK_PORT = 8025
+
+# Tamaño máximo de un mail (DATA); lo que pase de esto se rechaza
+MAX_MESSAGE = 1024 * 1024
+
+
+class SMTPSink:
+    """
+    Servidor SMTP mínimo sobre asyncio (EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT).
+
+    fail_rate: fracción de mails rechazados con 451 (error temporal).
+    drop_rate: fracción de mails tras los que se corta la conexión sin responder.
+    delay: segundos que tarda en aceptar cada mail.
+    on_message(destinatarios, datos) se llama por cada mail aceptado.
+    """
+
+    def __init__(self, host=SINK_HOST, port=SINK_PORT, fail_rate=0.0, drop_rate=0.0, delay=0.0,
+                 save_dir=None, on_message=None, seed=None):
+        self.host = host
+        self.port = port
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.delay = delay
+        self.save_dir = save_dir
+        self.on_message = on_message
+        self.stats = {"connections": 0, "accepted": 0, "rejected": 0, "dropped": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    async def _handle(self, reader, writer):
+        self._count("connections")
+
+        async def reply(line):
+            writer.write((line + "\r\n").encode('ascii'))
+            await writer.drain()
+
+        recipients = []
+        try:
+            await reply("220 smtp_sink listo")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                command = line.decode('utf-8', errors='replace').strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    await reply("250-smtp_sink" if verb == "EHLO" else "250 smtp_sink")
+                    if verb == "EHLO":
+                        await reply("250-8BITMIME")
+                        await reply(f"250 SIZE {MAX_MESSAGE}")
+                elif verb == "MAIL":
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.partition(":")[2].strip().strip("<>"))
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 terminar con <CRLF>.<CRLF>")
+                    data = await self._read_data(reader)
+                    if not await self._finish_message(recipients, data, reply, writer):
+                        return
+                    recipients = []
+                elif verb == "RSET":
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 chau")
+                    return
+                else:
+                    await reply("502 comando no soportado")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_data(self, reader):
+        lines = []
+        size = 0
+        while True:
+            line = await reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # Se deshace el "dot-stuffing" del cliente
+            if line.startswith(b".."):
+                line = line[1:]
+            size += len(line)
+            if size <= MAX_MESSAGE:
+                lines.append(line)
+        return b"".join(lines) if size <= MAX_MESSAGE else None
+
+    async def _finish_message(self, recipients, data, reply, writer):
+        """Responde al fin de DATA. Retorna False si se cortó la conexión."""
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if data is None:
+            self._count("rejected")
+            await reply("552 mail demasiado grande")
+            return True
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.drop_rate:
+            self._count("dropped")
+            writer.close()
+            return False
+        if roll < self.drop_rate + self.fail_rate:
+            self._count("rejected")
+            await reply("451 error temporal (simulado)")
+            return True
+        self._count("accepted")
+        if self.save_dir:
+            os.makedirs(self.save_dir, exist_ok=True)
+            name = f"{time.time_ns()}.eml"
+            with open(os.path.join(self.save_dir, name), 'wb') as file:
+                file.write(data)
+        if self.on_message:
+            self.on_message(recipients, data)
+        await reply("250 OK recibido")
+        return True
+
+    # --- Ejecución ---
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start(self):
+        """Arranca en un hilo propio (para pruebas). Con port=0 se elige un puerto libre: ver self.port."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        loop = self._loop
+
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop)
+        self._thread.join(timeout=5)
+        loop.close()
+        self._loop = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor SMTP local de prueba (no envía nada).")
+    parser.add_argument("--host", default=SINK_HOST)
+    parser.add_argument("--port", type=int, default=SINK_PORT)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fracción de mails rechazados (451)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fracción de mails con corte de conexión")
+    parser.add_argument("--delay", type=float, default=0.0, help="segundos por mail")
+    parser.add_argument("--save-dir", help="guarda cada mail como .eml en esta carpeta")
+    args = parser.parse_args(argv)
+
+    def show(recipients, data):
+        print(f"mail para {', '.join(recipients)} ({len(data):,} bytes)")
+
+    sink = SMTPSink(args.host, args.port, args.fail_rate, args.drop_rate, args.delay, args.save_dir, show)
+
+    async def run():
+        server = await sink.serve()
+        print(f"smtp_sink escuchando en {args.host}:{sink.port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"\n{sink.stats}")
+
+
+if __name__ == "__main__":
+    main()
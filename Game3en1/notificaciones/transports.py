@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import itertools
+import threading
+import http.client
+
+from urllib.parse import urlsplit
+
+
+# Errores de una conexión reutilizada que el servicio ya había cerrado (el pedido no llegó a procesarse)
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class TransportError(Exception):
+    pass
+
+
+class SMTPTransport:
+    """Manda el mail por una SMTPConnection (ver email_notifier.py)."""
+
+    name = "smtp"
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, msg):
+        self.connection.send(msg)
+
+    def close(self):
+        self.connection.close()
+
+
+class SpoolTransport:
+    """
+    Deja cada mail como .eml en una carpeta en vez de mandarlo (sin red).
+
+    Sirve sin internet o para que otro programa los mande después; cada
+    archivo aparece entero de una vez (tmp + rename).
+    """
+
+    name = "spool"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._counter = itertools.count()
+
+    def send(self, msg):
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.time_ns()}-{os.getpid()}-{next(self._counter)}.eml"
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", 'wb') as file:
+            file.write(msg.as_bytes())
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        pass
+
+
+class WebhookTransport:
+    """
+    Manda el mail como JSON ({to, subject, text, html}) por POST a un
+    servicio local (un bot de Discord, un servidor de correo propio...).
+
+    La conexión HTTP se reutiliza entre mails. El POST no es idempotente:
+    solo se reintenta (una vez, con una conexión nueva) si la conexión
+    reutilizada ya estaba cerrada por el servicio, nunca tras un timeout
+    esperando la respuesta, porque el servicio pudo haber aceptado el mail.
+    Cada mail lleva un Idempotency-Key (hash del contenido, igual en todos
+    los intentos) para que el servicio descarte los repetidos. Cualquier
+    respuesta que no sea 2xx es un error.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _payload(msg):
+        payload = {"to": msg["To"], "subject": str(msg["Subject"]), "text": "", "html": ""}
+        for part in msg.walk():
+            kind = part.get_content_type()
+            if kind in ("text/plain", "text/html"):
+                charset = part.get_content_charset() or "utf-8"
+                payload["text" if kind == "text/plain" else "html"] = \
+                    part.get_payload(decode=True).decode(charset, errors='replace')
+        return json.dumps(payload).encode('utf-8')
+
+    def send(self, msg):
+        body = self._payload(msg)
+        headers = {"Connection": "keep-alive", "Content-Type": "application/json",
+                   "Idempotency-Key": hashlib.sha256(body).hexdigest()}
+        with self._lock:
+            for attempt in range(2):
+                reused = self._conn is not None
+                if self._conn is None:
+                    self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    self._conn.request("POST", self.path, body, headers)
+                    response = self._conn.getresponse()
+                    response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    self._conn.close()
+                    self._conn = None
+                    # Keep-alive vencido: el servicio cerró la conexión sin leer el pedido
+                    stale = reused and isinstance(e, STALE_CONNECTION_ERRORS)
+                    if attempt or not stale:
+                        raise
+                    continue
+                if response.will_close:
+                    self._conn.close()
+                    self._conn = None
+                if not 200 <= response.status < 300:
+                    raise TransportError(f"el webhook respondió {response.status}")
+                return
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,150 @@
+"""
+Benchmark del sistema de puntajes: cuánto cuestan get_top_scores y update_score
+a medida que crece la cantidad de jugadores, en cada backend.
+
+Desde la carpeta Game3en1:
+    python puntajes/benchmark.py
+    python puntajes/benchmark.py --sizes 10,10000 --backend json --ops 5000
+    python puntajes/benchmark.py --json resultados.json
+
+Cada corrida usa una carpeta temporal: no toca data/global_scores.json.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from puntajes import data_manager
+from puntajes.data_manager import DataManager
+from puntajes.ndjson import synthetic_rows
+from puntajes.score_store import get_store, release_store
+
+# Tamaños por defecto (jugadores por juego)
+DEFAULT_SIZES = (10, 10000, 1000000)
+BACKENDS = ("json", "sqlite")
+DEFAULT_OPS = 2000
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name, operation, arguments):
+    """Ejecuta operation(*args) para cada elemento de arguments y resume las latencias."""
+    latencies = []
+    # Los avisos de "nuevo récord" ensuciarían la tabla de resultados
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for args in arguments:
+            t0 = time.perf_counter_ns()
+            operation(*args)
+            latencies.append(time.perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "op": name,
+        "count": len(latencies),
+        "p50_us": percentile(latencies, 0.50) / 1000,
+        "p99_us": percentile(latencies, 0.99) / 1000,
+        "ops_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_case(backend, size, games, ops, seed):
+    """Carga size jugadores por juego y mide lecturas y escrituras sobre el primer juego."""
+    folder = tempfile.mkdtemp(prefix="bench_puntajes_")
+    scores_path = os.path.join(folder, "global_scores.json")
+    game_id = games[0]
+    try:
+        store = get_store(scores_path, backend)
+        t0 = time.perf_counter()
+        for game in games:
+            store.bulk_load(synthetic_rows(game, size, seed))
+        store.flush()
+        load_seconds = time.perf_counter() - t0
+
+        # Puntajes conocidos del juego medido, para armar escrituras que mejoran o no
+        best = {row["email"]: row["score"] for _, row in synthetic_rows(game_id, size, seed)}
+        emails = list(best)
+        rng = random.Random(seed)
+        manager = DataManager(game_id, scores_path, backend)
+
+        results = [
+            measure("get_top_scores", manager.get_top_scores, [()] * ops),
+            measure("store.top_scores", manager.store.top_scores, [(game_id, 10)] * ops),
+            measure("get_player_rank", manager.get_player_rank,
+                    [(rng.choice(emails),) for _ in range(ops)]),
+        ]
+
+        # Puntaje 0 nunca supera al guardado: solo se compara en memoria/índice
+        results.append(measure("update_score (no mejora)", manager.update_score,
+                               [("BENCH", rng.choice(emails), 0) for _ in range(ops)]))
+
+        improving = []
+        for _ in range(ops):
+            email = rng.choice(emails)
+            best[email] += 1
+            improving.append(("BENCH", email, best[email]))
+        results.append(measure("update_score (mejora)", manager.update_score, improving))
+
+        t0 = time.perf_counter()
+        store.flush(timeout=120)
+        flush_seconds = time.perf_counter() - t0
+        for result in results:
+            result.update(backend=backend, size=size)
+        return {"backend": backend, "size": size, "load_s": load_seconds,
+                "flush_s": flush_seconds, "results": results}
+    finally:
+        release_store(scores_path, backend)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def print_case(case):
+    print(f"\n== backend={case['backend']}  jugadores/juego={case['size']:,}  "
+          f"carga={case['load_s']:.2f}s  flush final={case['flush_s']:.3f}s")
+    print(f"{'operación':<28}{'p50 (µs)':>12}{'p99 (µs)':>12}{'ops/s':>14}")
+    for r in case["results"]:
+        print(f"{r['op']:<28}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}{r['ops_per_s']:>14,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de lectura/escritura de puntajes.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="jugadores por juego, separados por coma")
+    parser.add_argument("--backend", action="append", choices=BACKENDS,
+                        help="backend a medir (se puede repetir; por defecto todos)")
+    parser.add_argument("--game", action="append",
+                        help="juegos a cargar; se mide el primero (por defecto SNAKE)")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="operaciones por medición")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="guarda los resultados en este archivo para comparar corridas")
+    args = parser.parse_args(argv)
+
+    # En el benchmark no se mandan mails aunque cambie el primer puesto
+    data_manager.notify_record = lambda **kwargs: True
+
+    cases = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        for backend in args.backend or BACKENDS:
+            case = run_case(backend, size, args.game or ["SNAKE"], args.ops, args.seed)
+            print_case(case)
+            cases.append(case)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(cases, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Snapshot binario de los puntajes (uno por juego, <JUEGO>.bin junto a su
+JSON), para leer sin parsear.
+
+Formato (little-endian):
+    cabecera   magic "G3SB", versión, cantidad de juegos, tamaño y mtime del
+               JSON del que salió (para saber si sigue vigente) y dónde
+               empieza la tabla de strings
+    directorio por juego: nombre, cantidad de filas y de emails, dónde
+               están las filas y el índice de emails
+    filas      de ancho fijo, de mayor a menor puntaje: puntaje + offsets
+               de nombre, email y fecha en la tabla de strings
+    índice     números de fila ordenados por email (búsqueda binaria)
+    strings    cada texto una sola vez: largo (u16) + utf-8
+
+Se abre con mmap: abrirlo no lee las filas y cada consulta toca solo las
+que necesita.
+"""
+import os
+import mmap
+import struct
+
+MAGIC = b"G3SB"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHHqqQ")   # magic, versión, juegos, tamaño json, mtime json, offset strings
+GAME = struct.Struct("<IIIQQ")       # nombre, filas, emails, offset filas, offset índice
+RECORD = struct.Struct("<qIII")      # puntaje, nombre, email, fecha
+SCORE = struct.Struct("<q")
+INDEX = struct.Struct("<I")
+LENGTH = struct.Struct("<H")
+
+
+def _encode(text):
+    # Los textos se cortan para que el largo entre en u16
+    return str(text or "").encode('utf-8')[:0xFFFF]
+
+
+def write_binary_snapshot(path, all_data, source_stat=None):
+    """
+    Escribe el snapshot binario de forma atómica (tmp + os.replace).
+
+    all_data es {game_id: filas} (uno o más juegos); source_stat es
+    el os.stat del JSON escrito con los mismos datos. Las filas se ordenan
+    por puntaje con un sort estable: los empates quedan en el orden en que
+    vienen (el de RankedScores, si vienen del índice en memoria). Un
+    puntaje que no es entero (o no entra en 64 bits) da ValueError: no se
+    escribe un snapshot que lo redondee.
+    """
+    strings = bytearray()
+    offsets = {}
+
+    def intern(text):
+        offset = offsets.get(text)
+        if offset is None:
+            data = _encode(text)
+            offset = offsets[text] = len(strings)
+            strings.extend(LENGTH.pack(len(data)))
+            strings.extend(data)
+        return offset
+
+    games = []
+    for game_id, rows in all_data.items():
+        if not isinstance(rows, list):
+            continue
+        rows = [row for row in rows if isinstance(row, dict) and "score" in row]
+        rows.sort(key=lambda x: x['score'], reverse=True)
+        fields = []
+        emails = []
+        for i, row in enumerate(rows):
+            score = row["score"]
+            if not isinstance(score, int) or isinstance(score, bool) or not -2 ** 63 <= score < 2 ** 63:
+                raise ValueError(f"{game_id}: el puntaje {score!r} no es un entero de 64 bits")
+            email = row.get("email") or ""
+            fields.extend((score, intern(row.get("name", "")), intern(email), intern(row.get("date", ""))))
+            if email:
+                # El orden de los str coincide con el de sus bytes utf-8 (lo que compara _find)
+                emails.append((email, i))
+        # Todas las filas en un solo pack: mucho más rápido que una llamada por fila
+        records = struct.pack("<" + RECORD.format[1:] * len(rows), *fields)
+        # Índice de emails: solo la primera (mejor) fila de cada jugador
+        emails.sort()
+        index = bytearray()
+        previous = None
+        for email, i in emails:
+            if email != previous:
+                index.extend(INDEX.pack(i))
+                previous = email
+        games.append((intern(game_id), len(rows), len(index) // INDEX.size, records, index))
+
+    position = HEADER.size + GAME.size * len(games)
+    directory = bytearray()
+    body = bytearray()
+    for name_offset, count, n_emails, records, index in games:
+        records_offset = position + len(body)
+        directory.extend(GAME.pack(name_offset, count, n_emails, records_offset,
+                                   records_offset + len(records)))
+        body.extend(records)
+        body.extend(index)
+    strings_offset = position + len(body)
+
+    size, mtime = (source_stat.st_size, source_stat.st_mtime_ns) if source_stat else (-1, -1)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(games), size, mtime, strings_offset))
+        file.write(directory)
+        file.write(body)
+        file.write(strings)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class BinarySnapshot:
+    """
+    Lector del snapshot binario sobre mmap.
+
+    Mismas consultas que ScoreStore (top, puesto, mejor del jugador...) con
+    búsqueda binaria sobre las filas ordenadas; nada se carga de antemano.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        with open(path, 'rb') as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, n_games, self.source_size, self.source_mtime, self._strings = \
+                HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("formato desconocido")
+            self._games = {}
+            for i in range(n_games):
+                name, count, n_emails, records, index = GAME.unpack_from(self._mm, HEADER.size + i * GAME.size)
+                self._games[self._string(name)] = (count, n_emails, records, index)
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            self.close()
+            raise ValueError(f"{path} no es un snapshot de puntajes válido ({e})")
+
+    @classmethod
+    def open_if_current(cls, path, source_path):
+        """Abre el snapshot solo si corresponde al JSON actual; si no, None."""
+        try:
+            stat = os.stat(source_path)
+            snapshot = cls(path)
+        except (OSError, ValueError):
+            return None
+        if (snapshot.source_size, snapshot.source_mtime) != (stat.st_size, stat.st_mtime_ns):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    # --- Lectura de bajo nivel ---
+    def _string_bytes(self, offset):
+        start = self._strings + offset
+        (length,) = LENGTH.unpack_from(self._mm, start)
+        return self._mm[start + LENGTH.size:start + LENGTH.size + length]
+
+    def _string(self, offset):
+        return self._string_bytes(offset).decode('utf-8', errors='replace')
+
+    def _row(self, records, i):
+        score, name, email, date = RECORD.unpack_from(self._mm, records + i * RECORD.size)
+        return {"name": self._string(name), "email": self._string(email) or None,
+                "score": score, "date": self._string(date)}
+
+    def _find(self, game_id, email):
+        """Número de fila del mejor puntaje del jugador (búsqueda binaria por email) o None."""
+        entry = self._games.get(game_id)
+        if entry is None or not email:
+            return None
+        _, n_emails, records, index = entry
+        target = _encode(email)
+        lo, hi = 0, n_emails
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (i,) = INDEX.unpack_from(self._mm, index + mid * INDEX.size)
+            email_offset = RECORD.unpack_from(self._mm, records + i * RECORD.size)[2]
+            current = self._string_bytes(email_offset)
+            if current == target:
+                return i
+            if current < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    # --- Consultas (mismos nombres que ScoreStore) ---
+    def game_ids(self):
+        return list(self._games)
+
+    def count(self, game_id):
+        entry = self._games.get(game_id)
+        return entry[0] if entry else 0
+
+    def rows(self, game_id, start=0, end=None):
+        entry = self._games.get(game_id)
+        if entry is None:
+            return []
+        count, _, records, _ = entry
+        end = count if end is None else min(end, count)
+        return [self._row(records, i) for i in range(max(0, start), end)]
+
+    def top_scores(self, game_id, limit):
+        return self.rows(game_id, 0, limit)
+
+    def player_best(self, game_id, email):
+        i = self._find(game_id, email)
+        return None if i is None else self._row(self._games[game_id][2], i)
+
+    def rank_of_score(self, game_id, score):
+        """(puesto, total) que tendría un puntaje: 1 + cantidad de filas con puntaje mayor."""
+        entry = self._games.get(game_id)
+        if entry is None:
+            return 1, 0
+        count, _, records, _ = entry
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if SCORE.unpack_from(self._mm, records + mid * RECORD.size)[0] > score:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo + 1, count
+
+    def player_rank(self, game_id, email):
+        i = self._find(game_id, email)
+        return None if i is None else (i + 1, self.count(game_id))
+
+    def players_around(self, game_id, email, radius=2):
+        i = self._find(game_id, email)
+        if i is None:
+            return []
+        start = max(0, i - radius)
+        return [(start + k + 1, row) for k, row in enumerate(self.rows(game_id, start, i + radius + 1))]
+
+    def all_data(self):
+        return {game_id: self.rows(game_id) for game_id in self._games}
+
+
+class ShardedSnapshot:
+    """Los snapshots de cada juego consultados como si fueran uno solo."""
+
+    def __init__(self, snapshots):
+        self._snapshots = snapshots
+        self._by_game = {game_id: snapshot for snapshot in snapshots for game_id in snapshot.game_ids()}
+
+    def close(self):
+        for snapshot in self._snapshots:
+            snapshot.close()
+        self._snapshots = []
+        self._by_game = {}
+
+    def game_ids(self):
+        return list(self._by_game)
+
+    def count(self, game_id):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.count(game_id) if snapshot else 0
+
+    def rows(self, game_id, start=0, end=None):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.rows(game_id, start, end) if snapshot else []
+
+    def top_scores(self, game_id, limit):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.top_scores(game_id, limit) if snapshot else []
+
+    def player_best(self, game_id, email):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.player_best(game_id, email) if snapshot else None
+
+    def rank_of_score(self, game_id, score):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.rank_of_score(game_id, score) if snapshot else (1, 0)
+
+    def player_rank(self, game_id, email):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.player_rank(game_id, email) if snapshot else None
+
+    def players_around(self, game_id, email, radius=2):
+        snapshot = self._by_game.get(game_id)
+        return snapshot.players_around(game_id, email, radius) if snapshot else []
@@ -0,0 +1,84 @@
+import time
+
+from collections import OrderedDict
+
+from puntajes.windows import ALL_TIME, period_key
+
+# Cada cuántos segundos se revisa si otro proceso cambió los puntajes (mtime/tamaño)
+CHECK_INTERVAL = 1.0
+
+# Consultas distintas que se guardan a la vez (búsquedas, páginas...); las menos usadas se descartan
+CACHE_SIZE = 256
+
+
+class LeaderboardCache:
+    """
+    Cache de lectura para las tablas de puntajes que se dibujan en cada frame.
+
+    Se vacía cuando cambia store.version (escritura propia) y, como mucho
+    una vez por CHECK_INTERVAL, se revisa si otro proceso modificó el archivo.
+    Entre esas revisiones leer la tabla no toca el disco. Las tablas diaria y
+    semanal llevan el período en la clave: al cambiar el día o la semana se
+    vuelven a pedir aunque no haya cambiado nada más.
+    La lista devuelta es compartida: no hay que modificarla.
+    """
+
+    def __init__(self, store, check_interval=CHECK_INTERVAL):
+        self.store = store
+        self.check_interval = check_interval
+        self._entries = OrderedDict()  # clave de la consulta -> resultado, de la versión self._version
+        self._version = None
+        self._last_check = time.monotonic()
+
+    def _check_external_changes(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            self.store.reload_if_changed()
+        except Exception as e:
+            print(f"ERROR al revisar cambios en los puntajes: {e}")
+
+    def _get(self, key, loader, *args):
+        self._check_external_changes()
+        version = self.store.version
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = loader(*args)
+        self._entries[key] = value
+        if len(self._entries) > CACHE_SIZE:
+            self._entries.popitem(last=False)
+        return value
+
+    def top_scores(self, game_id, limit, window=ALL_TIME):
+        period = period_key(window) if window != ALL_TIME else None
+        return self._get(("top", game_id, limit, window, period), self.store.top_scores, game_id, limit, window)
+
+    def player_best(self, game_id, email):
+        return self._get(("player", game_id, email), self.store.player_best, game_id, email)
+
+    def player_rank(self, game_id, email):
+        return self._get(("rank", game_id, email), self.store.player_rank, game_id, email)
+
+    def page(self, game_id, cursor, limit):
+        return self._get(("page", game_id, cursor, limit), self.store.page, game_id, cursor, limit)
+
+    def find_players(self, game_id, prefix, limit):
+        return self._get(("find", game_id, prefix.lower(), limit), self.store.find_players, game_id, prefix, limit)
+
+    def player_profile(self, email):
+        return self._get(("profile", email), self.store.player_profile, email)
+
+    def score_stats(self, game_id):
+        return self._get(("stats", game_id), self.store.score_stats, game_id)
+
+    def fraction_below(self, game_id, score):
+        return self._get(("below", game_id, score), self.store.fraction_below, game_id, score)
+
+    def invalidate(self):
+        self._entries.clear()
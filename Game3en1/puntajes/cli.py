@@ -0,0 +1,129 @@
+"""
+Herramienta de línea de comandos para los puntajes (NDJSON, un puntaje por línea).
+
+Desde la carpeta Game3en1:
+    python puntajes/cli.py export > respaldo.ndjson
+    python puntajes/cli.py export --game SNAKE -o snake.ndjson
+    python puntajes/cli.py import respaldo.ndjson
+    python puntajes/cli.py generate --game SNAKE --count 1000000 | python puntajes/cli.py import -
+    python puntajes/cli.py stats --game SNAKE
+"""
+import os
+import sys
+import json
+import argparse
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from puntajes.ndjson import read_ndjson, row_to_line, synthetic_rows, write_ndjson
+from puntajes.score_store import GLOBAL_SCORES_PATH, SCORE_BACKEND, get_store
+
+
+def _open_output(path):
+    if not path or path == "-":
+        return sys.stdout, False
+    return open(path, 'w', encoding='utf-8'), True
+
+
+def _open_input(path):
+    if path == "-":
+        return sys.stdin, False
+    return open(path, 'r', encoding='utf-8'), True
+
+
+def cmd_export(args):
+    store = get_store(args.scores, args.backend)
+    output, must_close = _open_output(args.output)
+    try:
+        count = write_ndjson(store, output, args.game)
+    finally:
+        if must_close:
+            output.close()
+    print(f"Exportados {count} puntajes.", file=sys.stderr)
+
+
+def cmd_import(args):
+    store = get_store(args.scores, args.backend)
+    source, must_close = _open_input(args.input)
+    errors = []
+    try:
+        count = store.bulk_load(read_ndjson(source, errors))
+    finally:
+        if must_close:
+            source.close()
+    store.flush()
+    print(f"Importados {count} puntajes ({len(errors)} líneas inválidas).", file=sys.stderr)
+
+
+def cmd_generate(args):
+    output, must_close = _open_output(args.output)
+    try:
+        for game_id in args.game:
+            for game, row in synthetic_rows(game_id, args.count, args.seed):
+                output.write(row_to_line(game, row))
+    finally:
+        if must_close:
+            output.close()
+
+
+def cmd_stats(args):
+    store = get_store(args.scores, args.backend)
+    summaries = {game_id: store.score_stats(game_id) for game_id in args.game or store.game_ids()}
+    if args.json:
+        print(json.dumps(summaries, ensure_ascii=False, indent=2))
+        return
+    for game_id, summary in summaries.items():
+        print(f"== {game_id}: {summary['count']:,} partidas".replace(",", "."))
+        if not summary["count"]:
+            continue
+        quantiles = "  ".join(f"{name}={value}" for name, value in summary["quantiles"].items())
+        print(f"   media={summary['mean']}  desvío={summary['stdev']}  mín={summary['min']}  máx={summary['max']}")
+        print(f"   {quantiles}")
+        largest = max(count for _, _, count in summary["histogram"])
+        for low, high, count in summary["histogram"]:
+            bar = "#" * max(1, round(40 * count / largest))
+            print(f"   {low:>9}-{high:<9} {count:>9}  {bar}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Importa/exporta puntajes en NDJSON y muestra estadísticas.")
+    parser.add_argument("--scores", default=GLOBAL_SCORES_PATH, help="ruta de global_scores.json")
+    parser.add_argument("--backend", choices=["json", "sqlite"],
+                        default=SCORE_BACKEND if SCORE_BACKEND != "remote" else "json")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="escribe los puntajes como NDJSON")
+    export.add_argument("--game", action="append", help="juego a exportar (se puede repetir)")
+    export.add_argument("-o", "--output", help="archivo de salida (por defecto stdout)")
+    export.set_defaults(func=cmd_export)
+
+    imp = sub.add_parser("import", help="carga puntajes desde NDJSON (se conserva el mejor por jugador)")
+    imp.add_argument("input", help="archivo NDJSON o - para stdin")
+    imp.set_defaults(func=cmd_import)
+
+    gen = sub.add_parser("generate", help="genera puntajes de prueba en NDJSON")
+    gen.add_argument("--game", action="append", required=True)
+    gen.add_argument("--count", type=int, default=10000)
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("-o", "--output")
+    gen.set_defaults(func=cmd_generate)
+
+    stats = sub.add_parser("stats", help="muestra cantidad, media, percentiles e histograma de las partidas")
+    stats.add_argument("--game", action="append", help="juego (se puede repetir; por defecto todos)")
+    stats.add_argument("--json", action="store_true", help="salida en JSON")
+    stats.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # La salida se cortó antes (por ejemplo "| head"): no es un error
+        sys.stdout = open(os.devnull, 'w')
+
+
+if __name__ == "__main__":
+    main()
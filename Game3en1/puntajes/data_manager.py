@@ -0,0 +1,197 @@
+import os
+
+from puntajes.cache import LeaderboardCache
+from puntajes.score_store import GLOBAL_SCORES_PATH, TOP_LIMIT, get_store, now_str
+from puntajes.spool import get_spool
+from puntajes.windows import ALL_TIME
+
+try:
+    from notificaciones.dispatcher import notify_record
+except ModuleNotFoundError as e:
+    print(f"Error importando notificaciones: {e}")
+    notify_record = None
+
+
+def format_rank(rank, total):
+    """Texto para las pantallas de game over, ej.: 'Puesto #1.234 de 50.000'."""
+    return f"Puesto #{rank:,} de {total:,}".replace(",", ".")
+
+
+def format_better_than(fraction):
+    """Texto para las pantallas de game over, ej.: 'Mejor que el 87% de las partidas'."""
+    return f"Mejor que el {int(fraction * 100)}% de las partidas"
+
+
+# Sistema de datos
+class DataManager:
+    """Gestiona la carga y guardado de puntajes de un juego usando el ScoreStore compartido."""
+
+    def __init__(self, game_id, scores_path=GLOBAL_SCORES_PATH, backend=None, notify=None):
+        self.game_id = game_id
+        # Cómo se encola el mail de récord; por defecto el dispatcher de los juegos (notify_record)
+        self.notify = notify
+        self.store = get_store(scores_path, backend)
+        # Las tablas de Snake y Flappy piden el top en cada frame: se sirve desde el cache
+        self.cache = LeaderboardCache(self.store)
+        # Puntajes que el backend no pudo guardar: quedan en disco y se reintentan
+        self.spool = get_spool(scores_path)
+        if os.path.exists(self.spool.path):
+            self.spool.start_retry(self._submit_spooled)
+
+    # Lectura de puntajes (score)
+    def load_game_scores(self, window=ALL_TIME):
+        #Retorna los puntajes del juego actual ordenados (máx. 10); window: "all", "daily" o "weekly"
+        return self.cache.top_scores(self.game_id, TOP_LIMIT, window)
+
+    # Actualiza el puntaje
+    def update_score(self, name, email, score):
+        if not email or "@" not in email:
+            print("INFO: Puntaje no guardado. Email no válido.")
+            return False, 0
+
+        try:
+            updated, old_score, prev_top, new_top = self.store.submit(self.game_id, name, email, score)
+        except Exception as e:
+            # El game over no espera ni pierde el puntaje: queda en el spool para reintentar
+            print(f"ERROR al guardar el puntaje ({e}). Queda pendiente para reintentar.")
+            try:
+                self.spool.add({"g": self.game_id, "n": name, "e": email, "s": score, "d": now_str()})
+            except OSError as spool_error:
+                print(f"ERROR: tampoco se pudo guardar el puntaje pendiente ({spool_error}).")
+                return False, 0
+            self.spool.start_retry(self._submit_spooled)
+            return False, 0
+        if updated:
+            self.notify_new_top(prev_top, new_top)
+        return updated, old_score
+
+    def update_scores(self, entries):
+        """
+        Guarda varios puntajes del juego de una vez: lista de (nombre, email, puntaje).
+
+        Se aplican todos juntos (una sola tanda en el diario) y se manda a lo
+        sumo un mail, al que quede primero después del lote.
+        Retorna [(actualizado, puntaje_anterior), ...] en el mismo orden.
+        """
+        results = [(False, 0)] * len(entries)
+        valid = [(i, (name, email, score, None)) for i, (name, email, score) in enumerate(entries)
+                 if email and "@" in email]
+        if len(valid) < len(entries):
+            print(f"INFO: {len(entries) - len(valid)} puntaje(s) no guardado(s). Email no válido.")
+        if not valid:
+            return results
+
+        try:
+            batch_results, prev_top, new_top = self.store.submit_many(self.game_id, [entry for _, entry in valid])
+        except Exception as e:
+            print(f"ERROR al guardar los puntajes ({e}). Quedan pendientes para reintentar.")
+            try:
+                date = now_str()
+                self.spool.add_many([{"g": self.game_id, "n": name, "e": email, "s": score, "d": date}
+                                     for _, (name, email, score, _) in valid])
+            except OSError as spool_error:
+                print(f"ERROR: tampoco se pudieron guardar los puntajes pendientes ({spool_error}).")
+                return results
+            self.spool.start_retry(self._submit_spooled)
+            return results
+        for (i, _), result in zip(valid, batch_results):
+            results[i] = result
+        if any(updated for updated, _ in batch_results):
+            self.notify_new_top(prev_top, new_top)
+        return results
+
+    def _submit_spooled(self, records):
+        """
+        Reintento de un lote del spool (puede traer varios juegos): un submit_many por juego.
+
+        Retorna los registros que no se pudieron guardar; después del primer
+        juego que falla no se prueba con los demás.
+        """
+        by_game = {}
+        for record in records:
+            by_game.setdefault(record["g"], []).append(record)
+        failed = []
+        for game_id, batch in by_game.items():
+            if failed:
+                failed.extend(batch)
+                continue
+            try:
+                results, prev_top, new_top = self.store.submit_many(
+                    game_id, [(r["n"], r["e"], r["s"], r.get("d")) for r in batch])
+            except Exception as e:
+                print(f"ERROR al reenviar puntajes de {game_id} ({e}). Se reintenta más tarde.")
+                failed.extend(batch)
+                continue
+            if any(updated for updated, _ in results):
+                self.notify_new_top(prev_top, new_top, game_id)
+        return failed
+
+    def notify_new_top(self, prev_top, new_top, game_id=None):
+        # Notificación: si hay nuevo top o mejora del mismo jugador
+        if not new_top or new_top["score"] <= 0:
+            return
+        prev_score = prev_top["score"] if prev_top else 0
+        prev_email = prev_top["email"] if prev_top else None
+        if new_top["score"] <= prev_score and new_top["email"] == prev_email:
+            return
+
+        notify = self.notify or notify_record
+        try:
+            if notify:
+                # Se encola y el envío lo hace el hilo del dispatcher: el game over no espera al SMTP
+                if notify(
+                    recipient_email=new_top["email"],
+                    game_name=game_id or self.game_id,
+                    score=new_top["score"],
+                    player_name=new_top["name"]
+                ):
+                    print(f"Notificación encolada para {new_top['email']} (nuevo récord: {new_top['score']})")
+            else:
+                print("No se pudo enviar notificación (función no disponible).")
+        except Exception as e:
+            print(f"Error al enviar notificación: {e}")
+
+    def get_player_best(self, email):
+        #Mejor puntaje guardado del jugador (aunque no esté en el top 10) o None
+        if not email:
+            return None
+        return self.cache.player_best(self.game_id, email)
+
+    def get_player_rank(self, email):
+        #Retorna (puesto, total de jugadores) del jugador o None
+        if not email:
+            return None
+        return self.cache.player_rank(self.game_id, email)
+
+    def get_players_around(self, email, radius=2):
+        #Jugadores cercanos al puesto del jugador: lista de (puesto, fila)
+        if not email:
+            return []
+        return self.store.players_around(self.game_id, email, radius)
+
+    def get_page(self, cursor=None, limit=TOP_LIMIT):
+        #Una página de la tabla completa: {"rows": [(puesto, fila)], "total", "next", "prev"}
+        return self.cache.page(self.game_id, cursor, limit)
+
+    def find_players(self, prefix, limit=TOP_LIMIT):
+        #Jugadores cuyo nombre empieza con prefix: lista de (puesto, fila), de mejor a peor
+        if not prefix:
+            return []
+        return self.cache.find_players(self.game_id, prefix, limit)
+
+    def get_score_stats(self):
+        #Resumen de todas las partidas del juego (cantidad, media, percentiles, histograma) o None
+        return self.cache.score_stats(self.game_id)
+
+    def get_better_than(self, score):
+        #Fracción (0 a 1) de las partidas del juego con menos puntaje que score
+        return self.cache.fraction_below(self.game_id, score)
+
+    # Obtener puntajes
+    def get_top_scores(self, window=ALL_TIME):
+        #Devuelve los puntajes del juego actual (máx. 10), histórico o de hoy/esta semana
+        return self.load_game_scores(window)
+
+    def clear_scores(self):
+        #Borra todos los puntajes del juego actual
+        self.store.clear_game(self.game_id)
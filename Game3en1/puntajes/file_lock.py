@@ -0,0 +1,72 @@
+import os
+import time
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Candado entre procesos sobre un archivo .lock (advisory).
+
+    Cada juego puede abrirse solo (por su __main__) o desde menu.py, así que
+    dos procesos pueden tocar los mismos puntajes. Los hilos del mismo proceso
+    se ordenan con un threading.Lock y los procesos con flock/msvcrt.
+    """
+
+    def __init__(self, path, poll_interval=0.01):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def _try_os_lock(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a+b')
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _os_unlock(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, blocking=True, timeout=10.0):
+        """Retorna True si se obtuvo el candado. Con blocking=False no espera nada."""
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(blocking, timeout if blocking else -1):
+            return False
+        while not self._try_os_lock():
+            if not blocking or time.monotonic() >= deadline:
+                self._thread_lock.release()
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def release(self):
+        try:
+            self._os_unlock()
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"No se pudo bloquear {self.path}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,116 @@
+import os
+import json
+import shutil
+
+
+class ScoreJournal:
+    """
+    Diario (journal) de puntajes: un registro JSON por línea, solo se agrega al final.
+
+    Cada envío de puntaje escribe una línea corta en vez de reescribir todo el
+    archivo de puntajes. La compactación "rota" el diario (lo renombra a .1),
+    guarda el snapshot y recién ahí retira la parte rotada a .prev, que
+    acompaña a la copia .bak del snapshot por si hay que recuperarla.
+
+    Varios procesos pueden escribir el mismo diario: cada tanda se agrega
+    con el archivo abierto solo durante la escritura y bajo el FileLock.
+    """
+
+    def __init__(self, journal_path, lock=None):
+        self.journal_path = journal_path
+        self.rotated_path = journal_path + ".1"
+        self.previous_path = journal_path + ".prev"
+        self.lock = lock
+        self.count = 0  # registros escritos desde la última compactación
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Escribe varios registros de una vez y los baja a disco (fsync)."""
+        data = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n" for record in records)
+        locked = self.lock.acquire() if self.lock else False
+        if self.lock and not locked:
+            print("ADVERTENCIA: no se pudo bloquear el diario de puntajes, se escribe igual.")
+        try:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            with open(self.journal_path, 'a+b') as file:
+                # Si otro proceso se cortó a mitad de línea, se empieza en una línea nueva
+                if file.seek(0, os.SEEK_END) > 0:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        data = "\n" + data
+                file.write(data.encode('utf-8'))
+                file.flush()
+                os.fsync(file.fileno())
+        finally:
+            if locked:
+                self.lock.release()
+        self.count += len(records)
+
+    def _read_records(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea a medio escribir (cierre inesperado): se ignora
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def replay(self, include_previous=False):
+        """
+        Devuelve los registros pendientes: primero la parte rotada y luego el diario actual.
+
+        Con include_previous=True también se devuelve el segmento anterior
+        (necesario cuando el snapshot se recupera desde la copia .bak).
+        """
+        self.count = 0
+        paths = (self.previous_path, self.rotated_path, self.journal_path) if include_previous \
+            else (self.rotated_path, self.journal_path)
+        for path in paths:
+            for record in self._read_records(path):
+                if path != self.previous_path:
+                    self.count += 1
+                yield record
+
+    def is_empty(self):
+        """True si no hay registros pendientes de compactar (ni en el diario ni en la parte rotada)."""
+        if os.path.exists(self.rotated_path):
+            return False
+        try:
+            return os.path.getsize(self.journal_path) == 0
+        except OSError:
+            return True
+
+    def read_previous(self):
+        """Registros del segmento anterior (ya incluidos en el snapshot, no en su copia .bak)."""
+        return self._read_records(self.previous_path)
+
+    def read_rotated(self):
+        """Registros de la parte rotada (incluye los de todos los procesos)."""
+        return self._read_records(self.rotated_path)
+
+    def rotate(self):
+        """Aparta el diario actual para compactarlo; los nuevos registros van a un diario vacío."""
+        if os.path.exists(self.journal_path):
+            if os.path.exists(self.rotated_path):
+                # Quedó una compactación sin terminar: se juntan ambas partes
+                with open(self.rotated_path, 'a', encoding='utf-8') as dst, \
+                        open(self.journal_path, 'r', encoding='utf-8') as src:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.rotated_path)
+        self.count = 0
+
+    def retire_rotated(self):
+        """Una vez que el snapshot incluye la parte rotada, pasa a ser el segmento anterior."""
+        if os.path.exists(self.rotated_path):
+            os.replace(self.rotated_path, self.previous_path)
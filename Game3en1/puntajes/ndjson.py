@@ -0,0 +1,63 @@
+import json
+import random
+
+from datetime import datetime, timedelta
+
+
+def row_to_line(game_id, row):
+    return json.dumps({"game": game_id, "name": row.get("name", ""), "email": row.get("email"),
+                       "score": row["score"], "date": row.get("date")},
+                      ensure_ascii=False, separators=(',', ':')) + "\n"
+
+
+def read_ndjson(file, errors=None):
+    """
+    Lee puntajes en NDJSON (un objeto por línea) y los devuelve de a uno como (game_id, fila).
+
+    Las líneas inválidas se saltean; si se pasa una lista en errors se
+    agrega ahí el número de cada línea descartada.
+    """
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            game_id = data["game"]
+            row = {"name": str(data.get("name", "")), "email": data["email"],
+                   "score": int(data["score"]), "date": data.get("date")}
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            if errors is not None:
+                errors.append(line_number)
+            continue
+        # Un juego que no es texto rompería los nombres de archivo al compactar
+        if not isinstance(game_id, str) or not game_id or not isinstance(row["email"], str) \
+                or "@" not in row["email"]:
+            if errors is not None:
+                errors.append(line_number)
+            continue
+        yield game_id, row
+
+
+def write_ndjson(store, file, game_ids=None):
+    """Exporta los puntajes del store a NDJSON sin armar la lista completa. Retorna la cantidad de filas."""
+    count = 0
+    for game_id in game_ids or store.game_ids():
+        for row in store.iter_rows(game_id):
+            file.write(row_to_line(game_id, row))
+            count += 1
+    return count
+
+
+def synthetic_rows(game_id, count, seed=None, max_score=100000):
+    """Genera filas de prueba (para carga masiva y benchmarks) sin guardarlas en memoria."""
+    rng = random.Random(seed)
+    base_date = datetime(2025, 1, 1)
+    for i in range(count):
+        date = base_date + timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        yield game_id, {
+            "name": f"P{i % 100000:05d}"[:5],
+            "email": f"jugador{i}@prueba.local",
+            "score": rng.randint(0, max_score),
+            "date": date.strftime("%Y-%m-%d %H:%M:%S"),
+        }
@@ -0,0 +1,185 @@
+"""
+Tablas de puntajes paginadas (cursores) y búsqueda por comienzo de nombre.
+
+Un cursor es un texto "puesto" o "puesto:puntaje:email": el puesto donde
+empieza la página y, si se conoce, la primera fila de esa página. Con la
+fila (ancla) la página se mantiene en su lugar aunque entren puntajes más
+arriba mientras se mira la tabla; sin ancla se usa el puesto tal cual.
+"""
+from bisect import bisect_left, insort
+
+# Filas por página de las tablas en pantalla
+PAGE_SIZE = 10
+
+
+def make_cursor(rank, row=None):
+    if row is None or not row.get("email"):
+        return str(rank)
+    return f"{rank}:{row['score']}:{row['email']}"
+
+
+def parse_cursor(cursor):
+    """(puesto, puntaje, email) del cursor; puntaje y email son None si no tiene ancla."""
+    rank, _, rest = str(cursor).partition(":")
+    if not rest:
+        return int(rank), None, None
+    score, _, email = rest.partition(":")
+    return int(rank), int(score), email
+
+
+def cursor_for_rank(rank, limit=PAGE_SIZE):
+    """Cursor de la página que contiene ese puesto (páginas de limit filas desde el 1)."""
+    return make_cursor((max(1, rank) - 1) // limit * limit + 1)
+
+
+def resolve_start(cursor, total, anchor_rank):
+    """
+    Fila inicial (desde 0) de la página del cursor.
+
+    anchor_rank(puntaje, email) devuelve el puesto actual del ancla: el
+    de esa fila si sigue igual o, si el jugador mejoró, el primero con ese
+    puntaje (la continuación natural de la página anterior).
+    """
+    if not cursor:
+        return 0
+    rank, score, email = parse_cursor(cursor)
+    if email is not None:
+        rank = anchor_rank(score, email)
+    return min(max(0, rank - 1), max(0, total - 1))
+
+
+def build_page(start, total, limit, rows_between):
+    """
+    Arma la página que empieza en la fila start.
+
+    rows_between(inicio, fin) devuelve las filas de ese tramo ya ordenadas;
+    se pide una sola vez, con la página anterior y la primera fila de la
+    siguiente para armar los cursores.
+    """
+    low = max(0, start - limit)
+    rows = rows_between(low, start + limit + 1)
+    page = rows[start - low:start - low + limit]
+    after = rows[start - low + limit:]
+    return {
+        "rows": [(start + i + 1, dict(row)) for i, row in enumerate(page)],
+        "total": total,
+        "next": make_cursor(start + limit + 1, after[0]) if after else None,
+        "prev": make_cursor(low + 1, rows[0]) if start > 0 and rows else None,
+    }
+
+
+class NameIndex:
+    """
+    Índice de un juego por nombre (sin distinguir mayúsculas): lista ordenada
+    de (nombre, email). Un comienzo de nombre es un tramo contiguo de la
+    lista, que se encuentra con dos búsquedas binarias.
+    """
+
+    def __init__(self, rows=()):
+        # rows de mayor a menor: de cada jugador vale su primera (mejor) fila
+        self._name_of = {}
+        for row in rows:
+            email = row.get("email")
+            if email and email not in self._name_of:
+                self._name_of[email] = (row.get("name") or "").lower()
+        self._entries = sorted((name, email) for email, name in self._name_of.items())
+
+    def update(self, row):
+        """Agrega la fila o, si el jugador cambió de nombre, la mueve."""
+        email = row.get("email")
+        if not email:
+            return
+        name = (row.get("name") or "").lower()
+        old = self._name_of.get(email)
+        if old == name:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (old, email))]
+        insort(self._entries, (name, email))
+        self._name_of[email] = name
+
+    def _range(self, prefix):
+        prefix = prefix.lower()
+        low = bisect_left(self._entries, (prefix,))
+        high = bisect_left(self._entries, (prefix + "\uffff",))
+        return low, high
+
+    def count(self, prefix):
+        low, high = self._range(prefix)
+        return high - low
+
+    def emails(self, prefix):
+        low, high = self._range(prefix)
+        return [email for _, email in self._entries[low:high]]
+
+
+class LeaderboardPager:
+    """
+    Estado de una tabla paginada en pantalla (sin pygame, lo usan los 3 juegos).
+
+    Cada frame se pide solo la página visible (pasa por el cache del
+    DataManager). Escribir letras busca jugadores por comienzo de nombre y
+    salta a la página del primero; find_me salta a la página del jugador.
+    """
+
+    def __init__(self, data_manager, page_size=PAGE_SIZE, max_query=5):
+        self.data_manager = data_manager
+        self.page_size = page_size
+        self.max_query = max_query
+        self.cursor = None
+        self.query = ""
+        self.highlight = None  # email de la fila resaltada (búsqueda o "mi puesto")
+
+    def page(self):
+        return self.data_manager.get_page(self.cursor, self.page_size)
+
+    def page_number(self, page=None):
+        """(página actual, cantidad de páginas), desde 1."""
+        page = page or self.page()
+        pages = max(1, -(-page["total"] // self.page_size))
+        first = page["rows"][0][0] if page["rows"] else 1
+        return min(pages, (first - 1) // self.page_size + 1), pages
+
+    def next_page(self):
+        cursor = self.page()["next"]
+        if cursor:
+            self.cursor = cursor
+
+    def prev_page(self):
+        cursor = self.page()["prev"]
+        if cursor:
+            self.cursor = cursor
+
+    def first_page(self):
+        self.cursor = None
+        self.query = ""
+        self.highlight = None
+
+    def find_me(self, email):
+        rank = self.data_manager.get_player_rank(email)
+        if rank:
+            self.cursor = cursor_for_rank(rank[0], self.page_size)
+            self.highlight = email
+            self.query = ""
+        return rank is not None
+
+    def type_char(self, char):
+        if len(self.query) < self.max_query and char.isprintable() and char.strip():
+            self.query += char
+            self._search()
+
+    def backspace(self):
+        self.query = self.query[:-1]
+        if self.query:
+            self._search()
+        else:
+            self.highlight = None
+
+    def _search(self):
+        matches = self.data_manager.find_players(self.query, 1)
+        if matches:
+            rank, row = matches[0]
+            self.cursor = cursor_for_rank(rank, self.page_size)
+            self.highlight = row.get("email")
+        else:
+            self.highlight = None
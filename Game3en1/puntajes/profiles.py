@@ -0,0 +1,231 @@
+import os
+import zlib
+import shutil
+import threading
+
+from puntajes.file_lock import FileLock
+from puntajes.writer import atomic_write_json, read_json_with_backup
+
+# Cantidad de archivos en que se reparten los perfiles (por hash del email):
+# leer el perfil de un jugador solo lee su archivo
+PROFILE_BUCKETS = 64
+
+
+def _bucket(email):
+    return f"{zlib.crc32(email.encode('utf-8')) % PROFILE_BUCKETS:02x}"
+
+
+def _merge_entry(target, extra):
+    # Suma partidas y se queda con el mejor puntaje y la última fecha
+    target["plays"] = target.get("plays", 0) + extra.get("plays", 0)
+    target["best"] = max(target.get("best", extra["best"]), extra["best"])
+    target["date"] = max(target.get("date") or "", extra.get("date") or "")
+
+
+def _merge_players(target, extra):
+    """Suma {email: {game_id: entrada}} de extra en target."""
+    for email, games in extra.items():
+        player = target.setdefault(email, {})
+        for game_id, entry in games.items():
+            if game_id in player:
+                _merge_entry(player[game_id], entry)
+            else:
+                player[game_id] = dict(entry)
+
+
+def _merge_players_by_bucket(target, extra):
+    for bucket, players in extra.items():
+        _merge_players(target.setdefault(bucket, {}), players)
+
+
+class PlayerProfiles:
+    """
+    Perfil de cada jugador en todos los juegos: mejor puntaje, partidas
+    jugadas y fecha de la última, por juego.
+
+    Se guarda en data/global_scores.profiles/, repartido en PROFILE_BUCKETS
+    archivos según el email. Cada partida solo suma en un "delta" en
+    memoria (O(1)); el BackgroundWriter lo agrega al archivo del jugador
+    mezclando con lo que haya guardado otro proceso, igual que las
+    estadísticas. El puesto no se guarda: cambia con los puntajes de los
+    demás y se consulta al store al armar el perfil.
+    """
+
+    def __init__(self, directory, writer):
+        self.directory = directory
+        self.writer = writer
+        self.file_lock = FileLock(directory + ".lock")
+        self._lock = threading.Lock()
+        self._delta = {}       # archivo -> {email: {game_id: entrada}} todavía no guardado
+        self._saving = {}      # delta que se está escribiendo (sigue contando en las consultas)
+        self._bootstrap = None  # perfiles armados con el historial, hasta que se cree la carpeta
+        self._cleared = set()  # juegos borrados que todavía no se guardaron
+        self._files = {}       # archivo -> ((mtime, tamaño), datos) leídos
+
+    def exists(self):
+        return os.path.isdir(self.directory) or self._bootstrap is not None
+
+    def _path(self, bucket):
+        return os.path.join(self.directory, bucket + ".json")
+
+    def _read(self, bucket):
+        """Contenido del archivo (cacheado mientras no cambie en disco). No copiar: es compartido."""
+        path = self._path(bucket)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        cached = self._files.get(bucket)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        data = {}
+        if signature is not None:
+            data, _ = read_json_with_backup(path)
+            if not isinstance(data, dict):
+                data = {}
+        self._files[bucket] = (signature, data)
+        return data
+
+    def load(self, bootstrap=None):
+        """
+        Si la carpeta no existe arma los perfiles una sola vez con bootstrap(),
+        pares (game_id, fila) del historial (cuenta una partida por fila).
+        """
+        with self._lock:
+            if os.path.isdir(self.directory) or self._bootstrap is not None:
+                return
+            players = {}
+            for game_id, row in (bootstrap() if bootstrap is not None else ()):
+                email = row.get("email")
+                if email:
+                    entry = {"best": row["score"], "plays": 1, "date": row.get("date") or ""}
+                    _merge_players(players.setdefault(_bucket(email), {}), {email: {game_id: entry}})
+            self._bootstrap = players
+        self.writer.submit_job(("profiles", self.directory), self._save)
+
+    def record(self, game_id, email, score, date):
+        """Anota una partida del jugador. O(1): solo se actualiza el delta en memoria."""
+        if not email:
+            return
+        with self._lock:
+            player = self._delta.setdefault(_bucket(email), {}).setdefault(email, {})
+            entry = player.get(game_id)
+            if entry is None:
+                player[game_id] = {"best": score, "plays": 1, "date": date}
+            else:
+                _merge_entry(entry, {"best": score, "plays": 1, "date": date})
+        self.writer.submit_job(("profiles", self.directory), self._save)
+
+    def get(self, email):
+        """{game_id: {"best", "plays", "date"}} del jugador (guardado + nuevo); una copia."""
+        if not email:
+            return {}
+        bucket = _bucket(email)
+        with self._lock:
+            result = {}
+            sources = [self._read(bucket)]
+            if self._bootstrap is not None:
+                sources.append(self._bootstrap.get(bucket, {}))
+            sources += [self._saving.get(bucket, {}), self._delta.get(bucket, {})]
+            for source in sources:
+                if email in source:
+                    _merge_players(result, {email: source[email]})
+            player = result.get(email, {})
+            for game_id in self._cleared:
+                player.pop(game_id, None)
+            return player
+
+    def clear_game(self, game_id):
+        with self._lock:
+            for source in [self._delta, self._saving] + ([self._bootstrap] if self._bootstrap else []):
+                for players in source.values():
+                    for games in players.values():
+                        games.pop(game_id, None)
+            self._cleared.add(game_id)
+        self.writer.submit_job(("profiles", self.directory), self._save)
+
+    # --- Escritura (hilo del BackgroundWriter) ---
+    def _create_directory(self, bootstrap):
+        # La carpeta aparece entera de una vez (tmp + rename); si otro proceso la creó antes, manda la suya
+        tmp_dir = self.directory + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for bucket, players in bootstrap.items():
+            atomic_write_json(os.path.join(tmp_dir, bucket + ".json"), players, indent=None)
+        try:
+            os.rename(tmp_dir, self.directory)
+        except OSError:
+            if not os.path.isdir(self.directory):
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _save(self):
+        with self.file_lock:
+            with self._lock:
+                # Con el candado tomado: get() no ve nunca el historial dos veces (archivo + memoria)
+                if self._bootstrap is not None:
+                    if not os.path.isdir(self.directory):
+                        self._create_directory(self._bootstrap)
+                    self._bootstrap = None
+            with self._lock:
+                delta = self._saving = self._delta
+                self._delta = {}
+                cleared = set(self._cleared)
+            done = set()
+            try:
+                buckets = set(delta)
+                if cleared and os.path.isdir(self.directory):
+                    buckets.update(name[:-len(".json")] for name in os.listdir(self.directory)
+                                   if name.endswith(".json"))
+                if buckets:
+                    os.makedirs(self.directory, exist_ok=True)
+                for bucket in buckets:
+                    with self._lock:
+                        players = {email: {game_id: dict(entry) for game_id, entry in games.items()}
+                                   for email, games in self._read(bucket).items()}
+                    _merge_players(players, delta.get(bucket, {}))
+                    for games in players.values():
+                        for game_id in cleared:
+                            games.pop(game_id, None)
+                    players = {email: games for email, games in players.items() if games}
+                    atomic_write_json(self._path(bucket), players, indent=None)
+                    done.add(bucket)
+                    stat = os.stat(self._path(bucket))
+                    with self._lock:
+                        self._files[bucket] = ((stat.st_mtime_ns, stat.st_size), players)
+            except Exception:
+                # Las partidas de los archivos que no se llegaron a escribir vuelven al delta
+                with self._lock:
+                    _merge_players_by_bucket(self._delta, {bucket: players for bucket, players
+                                                           in self._saving.items() if bucket not in done})
+                    self._saving = {}
+                raise
+            with self._lock:
+                self._saving = {}
+                self._cleared -= cleared
+
+
+def build_profile(store, email, entries):
+    """
+    Perfil completo para mostrar: {game_id: {"best", "rank", "total", "plays", "date"}}.
+
+    entries son las del índice (PlayerProfiles.get); el mejor puntaje y el
+    puesto se toman del store (búsqueda por email, sin recorrer las tablas),
+    así también aparecen los juegos importados sin partidas anotadas.
+    """
+    profile = {}
+    for game_id in sorted(set(store.game_ids()) | set(entries)):
+        entry = entries.get(game_id, {})
+        best = store.player_best(game_id, email)
+        rank = store.player_rank(game_id, email) if best else None
+        if best is None and not entry:
+            continue
+        profile[game_id] = {
+            "best": best["score"] if best else entry.get("best", 0),
+            "rank": rank[0] if rank else None,
+            "total": rank[1] if rank else None,
+            "plays": entry.get("plays", 0),
+            "date": entry.get("date") or (best.get("date") if best else None),
+        }
+    return profile
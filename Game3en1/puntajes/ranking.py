@@ -0,0 +1,267 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+
+# Filas por bloque: al llegar al doble el bloque se parte en dos
+BLOCK_SIZE = 512
+
+
+class RankedScores:
+    """
+    Filas de un juego ordenadas de mayor a menor puntaje, siempre listas para consultar.
+
+    Las filas se guardan en bloques ordenados de hasta 2 * BLOCK_SIZE, cada
+    uno con su lista de claves (-score, orden) y la clave máxima del bloque.
+    Insertar o mover una fila solo toca su bloque (búsqueda binaria entre
+    bloques + dentro del bloque), así el costo no crece con el historial;
+    un árbol de Fenwick con el tamaño de cada bloque da el puesto de
+    cualquier fila en O(log n). El top-k se lee recorriendo k filas.
+    A igual puntaje queda primero quien lo consiguió antes.
+    """
+
+    def __init__(self, rows=()):
+        self._keys = []    # bloques de claves, de menor a mayor
+        self._rows = []    # bloques de filas, en paralelo con _keys
+        self._maxes = []   # última (mayor) clave de cada bloque
+        self._tree = [0]   # Fenwick con la cantidad de filas de cada bloque
+        self._len = 0
+        self._key_of = {}  # id(fila) -> clave
+        self._seq = 0
+        # Carga inicial: un solo sort, respetando el orden previo en los empates
+        keys, ordered = [], []
+        for row in sorted(rows, key=lambda x: x['score'], reverse=True):
+            key = self._next_key(row["score"])
+            keys.append(key)
+            ordered.append(row)
+            self._key_of[id(row)] = key
+        for start in range(0, len(ordered), BLOCK_SIZE):
+            self._keys.append(keys[start:start + BLOCK_SIZE])
+            self._rows.append(ordered[start:start + BLOCK_SIZE])
+            self._maxes.append(keys[min(start + BLOCK_SIZE, len(keys)) - 1])
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def _next_key(self, score):
+        self._seq += 1
+        return (-score, self._seq)
+
+    # --- Fenwick sobre los tamaños de bloque ---
+    def _rebuild_tree(self):
+        tree = [0] * (len(self._rows) + 1)
+        for i, block in enumerate(self._rows, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, block, delta):
+        i = block + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, block):
+        """Cantidad de filas en los bloques anteriores a block."""
+        total = 0
+        i = block
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _block_at(self, index):
+        """(bloque, posición dentro del bloque) de la fila número index (desde 0)."""
+        block = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = block + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                block = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return block, index
+
+    # --- Ubicación de claves ---
+    def _locate(self, key):
+        """(bloque, posición) donde está o iría la clave."""
+        block = bisect_left(self._maxes, key)
+        if block == len(self._maxes):
+            block -= 1
+        return block, bisect_left(self._keys[block], key)
+
+    def _position(self, key):
+        block, i = self._locate(key)
+        return self._before(block) + i
+
+    # --- Interfaz ---
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._rows)
+
+    def insert(self, row):
+        key = self._next_key(row["score"])
+        self._key_of[id(row)] = key
+        self._len += 1
+        if not self._rows:
+            self._keys.append([key])
+            self._rows.append([row])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+        block, i = self._locate(key)
+        keys = self._keys[block]
+        keys.insert(i, key)
+        self._rows[block].insert(i, row)
+        self._maxes[block] = keys[-1]
+        if len(keys) <= 2 * BLOCK_SIZE:
+            self._add(block, 1)
+            return
+        # Bloque lleno: se parte en dos y se rearma el Fenwick (pasa cada BLOCK_SIZE inserciones)
+        rows = self._rows[block]
+        self._keys[block:block + 1] = [keys[:BLOCK_SIZE], keys[BLOCK_SIZE:]]
+        self._rows[block:block + 1] = [rows[:BLOCK_SIZE], rows[BLOCK_SIZE:]]
+        self._maxes[block:block + 1] = [keys[BLOCK_SIZE - 1], keys[-1]]
+        self._rebuild_tree()
+
+    def remove(self, row):
+        key = self._key_of.pop(id(row))
+        block, i = self._locate(key)
+        keys = self._keys[block]
+        del keys[i]
+        del self._rows[block][i]
+        self._len -= 1
+        if keys:
+            self._maxes[block] = keys[-1]
+            self._add(block, -1)
+            return
+        del self._keys[block]
+        del self._rows[block]
+        del self._maxes[block]
+        self._rebuild_tree()
+
+    def reposition(self, row):
+        """Vuelve a ubicar una fila después de cambiarle el puntaje."""
+        self.remove(row)
+        self.insert(row)
+
+    def top(self, limit):
+        return list(islice(iter(self), max(0, limit)))
+
+    def slice(self, start, end):
+        start = max(0, start)
+        end = min(self._len, end)
+        if start >= end:
+            return []
+        block, i = self._block_at(start)
+        result = []
+        while len(result) < end - start:
+            result.extend(self._rows[block][i:i + end - start - len(result)])
+            block, i = block + 1, 0
+        return result
+
+    def rank_of_score(self, score):
+        """Puesto que tendría un puntaje: 1 + cantidad de filas con puntaje mayor."""
+        if not self._rows:
+            return 1
+        return self._position((-score, 0)) + 1
+
+    def rank_of(self, row):
+        """Puesto exacto de una fila que ya está en la tabla."""
+        return self._position(self._key_of[id(row)]) + 1
+
+    def window(self, rank, radius):
+        """Filas alrededor de un puesto: lista de (puesto, fila)."""
+        start = max(0, rank - 1 - radius)
+        return [(start + i + 1, row) for i, row in enumerate(self.slice(start, rank + radius))]
+
+
+class SortedScores:
+    """
+    Solo los puntajes de un juego (sin filas), para contar cuántos superan a uno en O(log n).
+
+    Mismo esquema que RankedScores (bloques ordenados + Fenwick con el
+    tamaño de cada bloque) pero cada bloque es un array de enteros: lo usa
+    el backend SQLite, que tiene las filas en la base y solo necesita el
+    puesto (COUNT(*) en SQLite recorre todo el rango del índice).
+    """
+
+    def __init__(self, scores=()):
+        ordered = sorted(scores)  # de menor a mayor
+        self._blocks = [array('q', ordered[start:start + BLOCK_SIZE])
+                        for start in range(0, len(ordered), BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        tree = [0] * (len(self._blocks) + 1)
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, block, delta):
+        i = block + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, block):
+        total = 0
+        i = block
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def __len__(self):
+        return self._len
+
+    def insert(self, score):
+        self._len += 1
+        if not self._blocks:
+            self._blocks.append(array('q', [score]))
+            self._maxes.append(score)
+            self._rebuild_tree()
+            return
+        block = min(bisect_left(self._maxes, score), len(self._blocks) - 1)
+        values = self._blocks[block]
+        values.insert(bisect_right(values, score), score)
+        self._maxes[block] = values[-1]
+        if len(values) <= 2 * BLOCK_SIZE:
+            self._add(block, 1)
+            return
+        self._blocks[block:block + 1] = [values[:BLOCK_SIZE], values[BLOCK_SIZE:]]
+        self._maxes[block:block + 1] = [values[BLOCK_SIZE - 1], values[-1]]
+        self._rebuild_tree()
+
+    def remove(self, score):
+        block = bisect_left(self._maxes, score)
+        if block == len(self._blocks):
+            raise ValueError(f"puntaje {score} no está en la tabla")
+        values = self._blocks[block]
+        i = bisect_left(values, score)
+        if i == len(values) or values[i] != score:
+            raise ValueError(f"puntaje {score} no está en la tabla")
+        del values[i]
+        self._len -= 1
+        if values:
+            self._maxes[block] = values[-1]
+            self._add(block, -1)
+            return
+        del self._blocks[block]
+        del self._maxes[block]
+        self._rebuild_tree()
+
+    def count_above(self, score):
+        """Cantidad de puntajes mayores que score."""
+        block = bisect_right(self._maxes, score)
+        if block == len(self._blocks):
+            return 0
+        at_or_below = self._before(block) + bisect_right(self._blocks[block], score)
+        return self._len - at_or_below
@@ -0,0 +1,469 @@
+import os
+import json
+import time
+import atexit
+import threading
+import http.client
+
+from collections import OrderedDict, deque
+from urllib.parse import quote, urlencode, urlsplit
+
+from puntajes.score_store import TOP_LIMIT, now_str
+from puntajes.windows import ALL_TIME
+
+# Dirección del servicio de puntajes (puntajes/server.py) para el backend "remote"
+SCORE_SERVER_URL = os.environ.get("GAME3EN1_SCORE_SERVER", "http://127.0.0.1:8765")
+
+# Segundos máximos por pedido: el juego no puede quedar trabado esperando la red
+REQUEST_TIMEOUT = 2.0
+# Si el servicio no responde, segundos sin volver a intentar (se usan valores vacíos)
+RETRY_INTERVAL = 5.0
+# Máximo de puntajes por lote enviado desde el hilo de envío
+BATCH_SIZE = 100
+# Cada cuántos segundos el hilo de lectura pregunta al servicio si cambió algo (GET /health)
+REFRESH_INTERVAL = 1.0
+# Consultas distintas que se guardan en la copia local (las menos usadas se descartan)
+SNAPSHOT_SIZE = 256
+
+
+class ServiceError(Exception):
+    def __init__(self, message, status=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload  # cuerpo JSON de la respuesta de error, si lo había
+
+
+class RemoteScoreStore:
+    """
+    Cliente del servicio de puntajes con la misma interfaz que ScoreStore.
+
+    Las conexiones HTTP se reutilizan (keep-alive) y ninguna consulta del
+    juego espera a la red: las lecturas salen de una copia local que arma
+    un hilo de lectura. Una consulta que no está en la copia devuelve un
+    valor vacío y el hilo la pide; cuando llega (o cuando el servicio
+    avisa en GET /health que algo cambió, o se confirma un envío propio)
+    cambia version y LeaderboardCache vuelve a leer.
+
+    Los puntajes nuevos tampoco esperan: se encolan y un hilo los manda en
+    lotes, en orden. Mientras un puntaje está en camino se mezcla en las
+    lecturas de este cliente, así la pantalla de game over ya muestra el
+    nuevo récord.
+
+    Si el servicio no responde, lo que estaba en cola pasa al spool en disco
+    (y también lo que quede sin enviar al cerrar el juego); desde ahí se
+    reintenta en lotes hasta que el servicio vuelva.
+
+    Los mails de récord los manda el servicio, que es quien conoce el top.
+    """
+
+    def __init__(self, base_url=SCORE_SERVER_URL, timeout=REQUEST_TIMEOUT, spool=None):
+        url = urlsplit(base_url)
+        self.base_url = base_url
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.spool = spool
+        self._pool = []  # conexiones libres
+        self._pool_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._queue = deque()   # puntajes por enviar
+        self._pending = {}      # (game_id, email) -> fila todavía no confirmada
+        self._busy = False
+        self._thread = None
+        self._offline_until = 0.0
+        self._server_state = None
+        # Copia local de las lecturas (ruta del pedido -> respuesta), la arma el hilo de lectura
+        self._reads = threading.Condition()
+        self._snapshot = OrderedDict()
+        self._wanted = set()     # rutas pedidas por el juego que todavía no están en la copia
+        self._acked = {}         # (game_id, email) -> puntaje confirmado que la copia todavía no tiene
+        self._stale = False      # hay que volver a pedir toda la copia
+        self._reading = False
+        self._reader = None
+        self._closed = False
+        # Cambia con cada puntaje propio o cambio visto en el servicio (LeaderboardCache)
+        self.version = 0
+        atexit.register(self._shutdown)
+
+    # --- HTTP ---
+    def _connection(self):
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop()
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        with self._pool_lock:
+            self._pool.append(conn)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Connection": "keep-alive", "Content-Type": "application/json"}
+        # Una conexión guardada puede haber sido cerrada por el servicio: se reintenta una vez con una nueva
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status == 404:
+                return None
+            if response.status != 200:
+                try:
+                    payload = json.loads(data)
+                except ValueError:
+                    payload = None
+                raise ServiceError(f"{response.status}: {data[:200]!r}", response.status, payload)
+            return json.loads(data)
+
+    def _call(self, default, method, path, payload=None):
+        """Pedido directo (hilo de lectura o acciones del menú): si el servicio no está se devuelve default."""
+        if time.monotonic() < self._offline_until:
+            return default
+        try:
+            return self._request(method, path, payload)
+        except (OSError, http.client.HTTPException, ServiceError, ValueError) as e:
+            print(f"ERROR: servicio de puntajes no disponible ({e}).")
+            self._offline_until = time.monotonic() + RETRY_INTERVAL
+            return default
+
+    def _read(self, default, path):
+        """Lectura desde el hilo del juego: nunca abre un socket, responde con la copia local o default."""
+        with self._reads:
+            if path in self._snapshot:
+                self._snapshot.move_to_end(path)
+                return self._snapshot[path]
+            self._wanted.add(path)
+            self._start_reader()
+            self._reads.notify_all()
+        return default
+
+    @staticmethod
+    def _game_path(game_id, action, **query):
+        return f"/games/{quote(game_id, safe='')}/{action}" + (f"?{urlencode(query)}" if query else "")
+
+    # --- Interfaz del store ---
+    def load(self):
+        with self._reads:
+            self._start_reader()
+
+    def ensure_file(self):
+        pass
+
+    def compact(self):
+        pass
+
+    def reload_if_changed(self):
+        """Los cambios del servicio los revisa el hilo de lectura (cambia version): acá no hay nada que hacer."""
+        return False
+
+    def _pending_rows(self, game_id):
+        with self._cond:
+            return [dict(row) for (game, _), row in self._pending.items() if game == game_id]
+
+    def top_scores(self, game_id, limit=TOP_LIMIT, window=ALL_TIME):
+        rows = self._read([], self._game_path(game_id, "top", limit=limit, window=window))
+        pending = self._pending_rows(game_id)
+        if not pending:
+            return rows
+        by_email = {row.get("email"): row for row in rows}
+        for row in pending:
+            current = by_email.get(row["email"])
+            if current is None or current["score"] < row["score"]:
+                by_email[row["email"]] = row
+        return sorted(by_email.values(), key=lambda x: x['score'], reverse=True)[:limit]
+
+    def player_best(self, game_id, email):
+        best = self._read(None, self._game_path(game_id, "player", email=email))
+        with self._cond:
+            pending = self._pending.get((game_id, email))
+        if pending and (best is None or pending["score"] > best["score"]):
+            return dict(pending)
+        return best
+
+    def rank_of_score(self, game_id, score):
+        result = self._read(None, self._game_path(game_id, "rank_of_score", score=score))
+        return tuple(result) if result else (1, 0)
+
+    def player_rank(self, game_id, email):
+        with self._cond:
+            pending = self._pending.get((game_id, email))
+        if pending is not None:
+            best = self._read(None, self._game_path(game_id, "player", email=email))
+            if best is None or pending["score"] > best["score"]:
+                rank, total = self.rank_of_score(game_id, pending["score"])
+                return rank, total + (1 if best is None else 0)
+        result = self._read(None, self._game_path(game_id, "rank", email=email))
+        return tuple(result) if result else None
+
+    def players_around(self, game_id, email, radius=2):
+        result = self._read([], self._game_path(game_id, "around", email=email, radius=radius))
+        return [(rank, row) for rank, row in result]
+
+    def page(self, game_id, cursor=None, limit=TOP_LIMIT):
+        # Los puntajes que todavía no llegaron al servicio no aparecen en las páginas
+        query = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = self._read(None, self._game_path(game_id, "page", **query))
+        if page is None:
+            return {"rows": [], "total": 0, "next": None, "prev": None}
+        return dict(page, rows=[(rank, row) for rank, row in page["rows"]])
+
+    def find_players(self, game_id, prefix, limit=TOP_LIMIT):
+        result = self._read([], self._game_path(game_id, "find", prefix=prefix, limit=limit))
+        return [(rank, row) for rank, row in result]
+
+    def player_profile(self, email):
+        # Los puntajes que todavía no llegaron al servicio se ven en la próxima consulta
+        return self._read({}, f"/players/{quote(email, safe='')}/profile")
+
+    def score_stats(self, game_id):
+        return self._read(None, self._game_path(game_id, "stats"))
+
+    def fraction_below(self, game_id, score):
+        return self._read(0.0, self._game_path(game_id, "fraction_below", score=score))
+
+    def game_ids(self):
+        return self._read([], "/games")
+
+    def submit(self, game_id, name, email, score, date=None):
+        """
+        Encola el puntaje y vuelve enseguida.
+
+        El resultado es provisorio (solo se compara con lo que este cliente
+        tiene en camino); top_previo/top_nuevo van en None porque el mail de
+        récord lo decide el servicio.
+        """
+        key = (game_id, email)
+        with self._cond:
+            pending = self._pending.get(key)
+            if pending is not None and pending["score"] >= score:
+                return False, pending["score"], None, None
+            date = date or now_str()
+            self._pending[key] = {"name": name, "email": email, "score": score, "date": date}
+            self._queue.append({"game": game_id, "name": name, "email": email, "score": score, "date": date})
+            self.version += 1
+            self._start()
+            self._cond.notify()
+        return True, pending["score"] if pending else 0, None, None
+
+    def submit_many(self, game_id, entries):
+        """Encola varios puntajes; el hilo de envío los manda juntos en el mismo lote."""
+        # Con la cola tomada (Condition usa RLock) el hilo no arranca a mitad del lote
+        with self._cond:
+            results = [self.submit(game_id, name, email, score, date)[:2] for name, email, score, date in entries]
+        return results, None, None
+
+    def clear_game(self, game_id):
+        self.flush()
+        self._call(None, "POST", self._game_path(game_id, "clear"))
+        self._refresh_all()
+
+    # --- Hilo de lectura ---
+    def _start_reader(self):
+        # Se llama con self._reads tomado
+        if not self._closed and (self._reader is None or not self._reader.is_alive()):
+            self._reader = threading.Thread(target=self._read_loop, name="score-reader", daemon=True)
+            self._reader.start()
+
+    def _refresh_all(self):
+        # Algo cambió en el servicio (o se confirmó un envío propio): se vuelve a pedir toda la copia
+        with self._reads:
+            self._stale = True
+            self._start_reader()
+            self._reads.notify_all()
+
+    def _read_loop(self):
+        next_check = 0.0
+        while True:
+            with self._reads:
+                self._reads.wait_for(lambda: self._closed or self._wanted or self._stale,
+                                     max(0.0, next_check - time.monotonic()))
+                if self._closed:
+                    return
+                self._reading = True
+            try:
+                if time.monotonic() >= next_check:
+                    next_check = time.monotonic() + REFRESH_INTERVAL
+                    self._check_service()
+                self._fetch()
+            finally:
+                with self._reads:
+                    self._reading = False
+                    self._reads.notify_all()
+            if time.monotonic() < self._offline_until:
+                # Servicio caído: la copia queda como está hasta que vuelva
+                time.sleep(RETRY_INTERVAL)
+
+    def _check_service(self):
+        state = self._call(None, "GET", "/health")
+        if state is None:
+            return
+        state = (state.get("instance"), state.get("version"))
+        if state != self._server_state:
+            self._server_state = state
+            with self._reads:
+                self._stale = True
+
+    def _fetch(self):
+        with self._reads:
+            paths = set(self._wanted) | (set(self._snapshot) if self._stale else set())
+            self._stale = False
+            acked, self._acked = self._acked, {}
+        changed = False
+        for path in paths:
+            value = self._call(self, "GET", path)
+            if value is self:
+                # No respondió: se vuelve a pedir cuando el servicio vuelva
+                with self._reads:
+                    self._stale = self._stale or path in self._snapshot
+                continue
+            with self._reads:
+                self._wanted.discard(path)
+                if path not in self._snapshot or self._snapshot[path] != value:
+                    changed = True
+                self._snapshot[path] = value
+                self._snapshot.move_to_end(path)
+                while len(self._snapshot) > SNAPSHOT_SIZE:
+                    self._snapshot.popitem(last=False)
+        with self._cond:
+            for key, score in acked.items():
+                pending = self._pending.get(key)
+                if pending is not None and pending["score"] <= score:
+                    del self._pending[key]
+            if changed or acked:
+                self.version += 1
+
+    def refresh(self, timeout=5.0):
+        """Espera a que el hilo de lectura traiga lo pedido (pruebas y herramientas, no el bucle del juego)."""
+        with self._reads:
+            self._start_reader()
+            return self._reads.wait_for(lambda: not (self._wanted or self._stale or self._reading), timeout)
+
+    # --- Hilo de envío ---
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="score-sender", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                batch = [self._queue.popleft() for _ in range(min(BATCH_SIZE, len(self._queue)))]
+                self._busy = True
+            try:
+                self._post_scores(batch)
+            except (OSError, http.client.HTTPException, ServiceError, ValueError) as e:
+                print(f"ERROR al enviar puntajes al servicio ({e}).")
+                with self._cond:
+                    self._queue.extendleft(reversed(batch))
+                    items = self._take_queue() if self.spool is not None else None
+                if items is None:
+                    time.sleep(RETRY_INTERVAL)
+                else:
+                    # Toda la cola pasa a disco: no se pierde aunque se cierre el juego
+                    self._spool_items(items)
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+                continue
+            with self._reads:
+                # Siguen mezclándose en las lecturas hasta que la copia local los traiga del servicio
+                for item in batch:
+                    key = (item["game"], item["email"])
+                    self._acked[key] = max(self._acked.get(key, item["score"]), item["score"])
+                self._stale = True
+                self._start_reader()
+                self._reads.notify_all()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _post_scores(self, items):
+        """
+        POST /scores. Si el servicio rechaza filas inválidas (400 con "invalid"),
+        se descartan y se manda el resto. Retorna las filas que se aceptaron.
+        """
+        try:
+            self._request("POST", "/scores", {"submissions": items})
+            return items
+        except ServiceError as e:
+            invalid = set((e.payload or {}).get("invalid") or ()) if e.status == 400 else set()
+            if not invalid:
+                raise
+        # Reintentarlas no sirve: el servicio las va a rechazar siempre
+        print(f"ERROR: el servicio rechazó {len(invalid)} puntaje(s) inválido(s); se descartan.")
+        items = [item for i, item in enumerate(items) if i not in invalid]
+        if items:
+            self._request("POST", "/scores", {"submissions": items})
+        return items
+
+    def _take_queue(self):
+        # Se llama con self._cond tomado. Lo que pasa al spool deja de mostrarse como pendiente
+        items = list(self._queue)
+        self._queue.clear()
+        for item in items:
+            key = (item["game"], item["email"])
+            pending = self._pending.get(key)
+            if pending is not None and pending["score"] <= item["score"]:
+                del self._pending[key]
+        return items
+
+    def _spool_items(self, items):
+        # Sin self._cond tomado: el spool llama a submit() con su candado tomado
+        try:
+            self.spool.add_many([{"g": i["game"], "n": i["name"], "e": i["email"], "s": i["score"],
+                                  "d": i["date"]} for i in items])
+        except OSError as e:
+            print(f"ERROR al guardar puntajes pendientes en disco ({e}). Quedan en memoria.")
+            with self._cond:
+                self._queue.extendleft(reversed(items))
+            time.sleep(RETRY_INTERVAL)
+            return
+        self.spool.start_retry(self._resubmit)
+
+    def _resubmit(self, records):
+        # Desde el hilo del spool: se manda directo y los registros salen del archivo recién
+        # cuando el servicio los confirmó (si no, quedan en disco, no vuelven a la cola en memoria)
+        items = [{"game": r["g"], "name": r["n"], "email": r["e"], "score": r["s"], "date": r.get("d")}
+                 for r in records]
+        try:
+            self._post_scores(items)
+        except (OSError, http.client.HTTPException, ServiceError, ValueError) as e:
+            print(f"ERROR: el servicio de puntajes sigue sin responder ({e}).")
+            return records
+        self._refresh_all()
+        return []
+
+    def _shutdown(self):
+        # Al salir: lo que el servicio no confirmó a tiempo queda en el spool
+        if self.flush() or self.spool is None:
+            return
+        with self._cond:
+            items = self._take_queue()
+        if items:
+            self._spool_items(items)
+
+    def flush(self, timeout=5.0):
+        """Espera a que el servicio confirme los puntajes encolados."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not (self._queue or self._busy), timeout)
+
+    def close(self):
+        self.flush()
+        with self._reads:
+            self._closed = True
+            self._reads.notify_all()
+        with self._pool_lock:
+            for conn in self._pool:
+                conn.close()
+            self._pool = []
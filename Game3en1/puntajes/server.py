@@ -0,0 +1,297 @@
+"""
+Servicio de puntajes compartido (HTTP/1.1 con keep-alive, sobre asyncio).
+
+Sirve para que varias máquinas del local compartan un mismo ranking: una
+corre el servicio y los juegos usan el backend "remote" (ver remote_store.py).
+
+Desde la carpeta Game3en1:
+    python puntajes/server.py --host 0.0.0.0 --port 8765
+"""
+import os
+import sys
+import json
+import uuid
+import asyncio
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from puntajes.data_manager import DataManager
+from puntajes.score_store import GLOBAL_SCORES_PATH, SCORE_BACKEND, TOP_LIMIT, get_store, valid_date
+from puntajes.windows import ALL_TIME, WINDOWS
+
+try:
+    from notificaciones.dispatcher import new_dispatcher
+except ModuleNotFoundError as e:
+    print(f"Error importando notificaciones: {e}")
+    new_dispatcher = None
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+# Segundos sin pedidos antes de cerrar una conexión keep-alive
+IDLE_TIMEOUT = 60.0
+# Tamaño máximo del cuerpo de un pedido (un lote de puntajes)
+MAX_BODY = 1024 * 1024
+# Máximo de puntajes por lote en POST /scores
+MAX_BATCH = 500
+# Hilos para las consultas: esperan el candado del store sin frenar el event loop
+READ_WORKERS = 4
+# Con la cola de mails llena el servicio espera un poco en vez de descartar (los juegos usan GAME3EN1_NOTIFY_POLICY)
+NOTIFY_POLICY = "block"
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details  # se agregan a la respuesta JSON
+
+
+class LeaderboardServer:
+    """
+    Atiende las consultas de puntajes sobre el store local (json o sqlite).
+
+    El event loop solo lee y escribe los sockets. Las consultas corren en
+    un pool de hilos (toman el candado del store, que también usa el
+    registro de puntajes y la compactación) y los puntajes se registran en
+    un único hilo aparte, en orden de llegada: un lote lento no frena a las
+    demás conexiones. Los mails de récord los manda un dispatcher propio
+    del servicio (con NOTIFY_POLICY), no el de los juegos; notify lo
+    reemplaza (mismos argumentos que notify_record).
+    """
+
+    def __init__(self, scores_path=GLOBAL_SCORES_PATH, backend=None, notify=None):
+        self.scores_path = scores_path
+        self.backend = backend
+        self.notifier = None
+        if notify is None and new_dispatcher is not None:
+            self.notifier = new_dispatcher("score-notifier", NOTIFY_POLICY)
+            notify = self.notifier.submit
+        self.notify = notify
+        self.store = get_store(scores_path, backend)
+        self.store.load()
+        # Cambia si se reinicia el servicio: los clientes invalidan su cache
+        self.instance = uuid.uuid4().hex
+        self._managers = {}
+        self._submitter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-submit")
+        self._readers = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="score-read")
+        self.port = None
+
+    def _manager(self, game_id):
+        manager = self._managers.get(game_id)
+        if manager is None:
+            manager = self._managers[game_id] = DataManager(game_id, self.scores_path, self.backend,
+                                                                   self.notify)
+        return manager
+
+    # --- HTTP ---
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    payload = await self.dispatch(method, target, body)
+                    status = 200
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e), **e.details}
+                except Exception as e:
+                    print(f"ERROR en el servicio de puntajes: {e}")
+                    status, payload = 500, {"error": "error interno"}
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(" ", 2)
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise ConnectionError("pedido demasiado grande")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+    # --- Rutas ---
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        loop = asyncio.get_running_loop()
+        if parts == ["health"]:
+            return {"instance": self.instance, "version": self.store.version}
+        if parts == ["games"]:
+            return await loop.run_in_executor(self._readers, self.store.game_ids)
+        if parts == ["scores"]:
+            if method != "POST":
+                raise HTTPError(405, "usar POST")
+            return await self._submit_batch(body)
+        if len(parts) == 3 and parts[0] == "players" and parts[2] == "profile":
+            return await loop.run_in_executor(self._readers, self.store.player_profile, parts[1])
+        if len(parts) == 3 and parts[0] == "games":
+            # Borrar es una escritura: va en orden con los puntajes
+            executor = self._submitter if parts[2] == "clear" else self._readers
+            return await loop.run_in_executor(executor, self._game_route, method, parts[1], parts[2], query)
+        raise HTTPError(404, "ruta desconocida")
+
+    def _game_route(self, method, game_id, action, query):
+        store = self.store
+        if action == "clear":
+            if method != "POST":
+                raise HTTPError(405, "usar POST")
+            store.clear_game(game_id)
+            return {"version": store.version}
+        if method != "GET":
+            raise HTTPError(405, "usar GET")
+        try:
+            if action == "top":
+                window = query.get("window", ALL_TIME)
+                if window != ALL_TIME and window not in WINDOWS:
+                    raise HTTPError(400, f"tabla desconocida: {window}")
+                return store.top_scores(game_id, int(query.get("limit", TOP_LIMIT)), window)
+            if action == "player":
+                return store.player_best(game_id, query["email"])
+            if action == "rank":
+                return store.player_rank(game_id, query["email"])
+            if action == "rank_of_score":
+                return store.rank_of_score(game_id, int(query["score"]))
+            if action == "around":
+                return store.players_around(game_id, query["email"], int(query.get("radius", 2)))
+            if action == "page":
+                return store.page(game_id, query.get("cursor") or None, int(query.get("limit", TOP_LIMIT)))
+            if action == "find":
+                return store.find_players(game_id, query["prefix"], int(query.get("limit", TOP_LIMIT)))
+            if action == "stats":
+                return store.score_stats(game_id)
+            if action == "fraction_below":
+                return store.fraction_below(game_id, int(query["score"]))
+        except (KeyError, ValueError) as e:
+            raise HTTPError(400, f"parámetro inválido: {e}")
+        raise HTTPError(404, "ruta desconocida")
+
+    @staticmethod
+    def _parse_submission(s):
+        # Todo se valida antes de registrar nada: una fila mala a mitad del lote no deja cambios a medias
+        game_id, email, date = s["game"], s["email"], s.get("date")
+        if not isinstance(game_id, str) or not game_id or not isinstance(email, str):
+            raise ValueError("juego o email inválido")
+        if date is not None and not valid_date(date):
+            raise ValueError(f"fecha inválida: {date!r}")
+        return game_id, str(s.get("name", "")), email, int(s["score"]), date
+
+    async def _submit_batch(self, body):
+        try:
+            submissions = json.loads(body)["submissions"]
+            if not isinstance(submissions, list):
+                raise TypeError("submissions no es una lista")
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise HTTPError(400, f"lote inválido: {e}")
+        if len(submissions) > MAX_BATCH:
+            raise HTTPError(413, f"máximo {MAX_BATCH} puntajes por lote")
+        batch = []
+        invalid = []
+        for i, submission in enumerate(submissions):
+            try:
+                batch.append(self._parse_submission(submission))
+            except (KeyError, TypeError, ValueError):
+                invalid.append(i)
+        if invalid:
+            # El cliente descarta esas filas y reenvía el resto
+            raise HTTPError(400, f"{len(invalid)} puntaje(s) inválido(s), no se registró ninguno", invalid=invalid)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._submitter, self._submit_all, batch)
+        return {"results": results, "version": self.store.version}
+
+    def _submit_all(self, batch):
+        # Un submit_many por juego (una tanda en el diario) y a lo sumo un mail por juego
+        results = [{"updated": False, "old_score": 0} for _ in batch]
+        by_game = {}
+        for i, (game_id, name, email, score, date) in enumerate(batch):
+            if email and "@" in email:
+                by_game.setdefault(game_id, []).append((i, (name, email, score, date)))
+        for game_id, items in by_game.items():
+            game_results, prev_top, new_top = self.store.submit_many(game_id, [entry for _, entry in items])
+            for (i, _), (updated, old_score) in zip(items, game_results):
+                results[i] = {"updated": updated, "old_score": old_score}
+            if any(updated for updated, _ in game_results):
+                # Solo se encola: el mail lo manda el hilo de notificaciones, no demora el lote
+                self._manager(game_id).notify_new_top(prev_top, new_top)
+        return results
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT):
+        """Abre el puerto (con port=0 se elige uno libre: ver self.port) y retorna el asyncio.Server."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT):
+        server = await self.start(host, port)
+        print(f"Servicio de puntajes escuchando en http://{host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._readers.shutdown(wait=True)
+        self._submitter.shutdown(wait=True)
+        self.store.flush()
+        if self.notifier is not None:
+            self.notifier.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio de puntajes compartido.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--scores", default=GLOBAL_SCORES_PATH, help="ruta de global_scores.json")
+    parser.add_argument("--backend", choices=["json", "sqlite"],
+                        default=SCORE_BACKEND if SCORE_BACKEND != "remote" else "json")
+    args = parser.parse_args(argv)
+
+    server = LeaderboardServer(args.scores, args.backend)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
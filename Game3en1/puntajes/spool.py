@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+from puntajes.file_lock import FileLock
+
+# Segundos entre reintentos de los puntajes que quedaron pendientes
+SPOOL_RETRY_INTERVAL = 10.0
+# Puntajes reenviados por lote
+SPOOL_BATCH = 50
+
+
+class SubmissionSpool:
+    """
+    Cola en disco de puntajes que no se pudieron guardar (global_scores.spool).
+
+    Un puntaje por línea, con el mismo formato que el diario. Si el backend
+    falla (servicio caído, base bloqueada, disco lleno) el puntaje queda acá
+    y un hilo lo reintenta en lotes cada SPOOL_RETRY_INTERVAL; recién se
+    borra del archivo cuando el backend lo aceptó.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file_lock = FileLock(path + ".lock")
+        self._lock = threading.Lock()
+        self._submit = None
+        self._thread = None
+
+    def add(self, record):
+        self.add_many([record])
+
+    def add_many(self, records):
+        with self.file_lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Línea cortada por un corte de luz: se descarta
+                continue
+        return records
+
+    def _rewrite(self, records):
+        if not records:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def pending(self):
+        """Cantidad de puntajes esperando reintento."""
+        with self.file_lock:
+            return len(self._read())
+
+    def drain(self, submit_batch, batch_size=SPOOL_BATCH):
+        """
+        Pasa los puntajes pendientes a submit_batch(registros), de a lotes.
+
+        submit_batch retorna los registros del lote que no pudo guardar (que
+        quedan en el archivo); si lanza una excepción queda el lote entero.
+        Se corta en el primer lote con errores. Retorna cuántos se enviaron.
+        """
+        sent = 0
+        while True:
+            with self.file_lock:
+                records = self._read()
+                batch = records[:batch_size]
+                if not batch:
+                    return sent
+                failed = batch
+                try:
+                    failed = list(submit_batch(batch) or ())
+                except Exception as e:
+                    print(f"ERROR al reenviar puntajes pendientes ({e}). Se reintenta más tarde.")
+                finally:
+                    self._rewrite(failed + records[len(batch):])
+            sent += len(batch) - len(failed)
+            if failed:
+                return sent
+
+    def start_retry(self, submit_batch):
+        """Arranca (si no estaba) el hilo que reintenta; se queda con el primer submit_batch registrado."""
+        with self._lock:
+            if self._submit is None:
+                self._submit = submit_batch
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._retry_loop, name="score-spool", daemon=True)
+                self._thread.start()
+
+    def _retry_loop(self):
+        while True:
+            time.sleep(SPOOL_RETRY_INTERVAL)
+            try:
+                self.drain(self._submit)
+            except Exception as e:
+                print(f"ERROR al leer los puntajes pendientes: {e}")
+            with self._lock:
+                if not os.path.exists(self.path):
+                    self._thread = None
+                    return
+
+
+# Un spool por archivo de puntajes y por proceso
+_spools = {}
+_spools_lock = threading.Lock()
+
+
+def get_spool(scores_path):
+    path = os.path.splitext(os.path.abspath(scores_path))[0] + ".spool"
+    with _spools_lock:
+        spool = _spools.get(path)
+        if spool is None:
+            spool = _spools[path] = SubmissionSpool(path)
+        return spool
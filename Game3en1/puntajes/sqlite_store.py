@@ -0,0 +1,470 @@
+import os
+import sys
+import sqlite3
+import threading
+
+from datetime import datetime, timedelta
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from puntajes.paging import build_page, resolve_start
+from puntajes.profiles import PlayerProfiles, build_profile
+from puntajes.ranking import SortedScores
+from puntajes.score_store import GLOBAL_SCORES_PATH, TOP_LIMIT, get_store, now_str
+from puntajes.stats import ScoreStatistics
+from puntajes.windows import ALL_TIME, WindowedBoards
+from puntajes.writer import BackgroundWriter
+
+# Base de datos SQLite junto al JSON: Game3en1/data/global_scores.db
+GLOBAL_SCORES_DB_PATH = os.path.splitext(GLOBAL_SCORES_PATH)[0] + ".db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    game  TEXT    NOT NULL,
+    email TEXT    NOT NULL,
+    name  TEXT    NOT NULL,
+    score INTEGER NOT NULL,
+    date  TEXT    NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_scores_game_email ON scores (game, email);
+CREATE INDEX IF NOT EXISTS idx_scores_game_score ON scores (game, score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_game_page ON scores (game, score DESC, email);
+CREATE INDEX IF NOT EXISTS idx_scores_game_name ON scores (game, name COLLATE NOCASE);
+"""
+
+# Se conserva el mejor puntaje de cada jugador (mismo criterio que update_score)
+UPSERT = """
+INSERT INTO scores (game, email, name, score, date) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (game, email) DO UPDATE SET
+    name = excluded.name, score = excluded.score, date = excluded.date
+WHERE excluded.score > scores.score
+"""
+
+
+def _row_to_dict(row):
+    return {"name": row[0], "email": row[1], "score": row[2], "date": row[3]}
+
+
+class SQLiteScoreStore:
+    """
+    Backend de puntajes sobre sqlite3 con la misma interfaz que ScoreStore.
+
+    Guarda el historial completo (sin recortar al top 10) e indexa por
+    (game, score) para el top y por (game, email) para buscar al jugador.
+
+    El puesto no se pide a SQLite: COUNT(*) recorre todo el rango del
+    índice (O(n), ~1 ms con 10.000 jugadores). Cada juego consultado tiene
+    en memoria sus puntajes en un SortedScores (8 bytes por jugador; se
+    arma una vez por proceso con un recorrido del índice) que da el puesto
+    y el total en O(log n). Los puntajes propios lo actualizan y un commit
+    de otro proceso (PRAGMA data_version) lo descarta.
+    """
+
+    def __init__(self, db_path=GLOBAL_SCORES_DB_PATH, json_path=None):
+        self.db_path = db_path
+        self.json_path = json_path
+        self._lock = threading.RLock()
+        self._conn = None
+        # Cambia con cada modificación: lo usa LeaderboardCache para invalidar
+        self.version = 0
+        self._data_version = None
+        self._ranks = {}  # game_id -> SortedScores
+        self._ranks_data_version = None
+        # Tablas diaria/semanal: mismo archivo y formato que con el backend JSON
+        self.windows = WindowedBoards(os.path.splitext(db_path)[0] + ".windows.json",
+                                      BackgroundWriter("score-windows"))
+        # Estadísticas de las partidas: mismo archivo que con el backend JSON, mismo hilo escritor
+        self.stats = ScoreStatistics(os.path.splitext(db_path)[0] + ".stats.json", self.windows.writer)
+        # Perfiles de los jugadores: misma carpeta que con el backend JSON
+        self.profiles = PlayerProfiles(os.path.splitext(db_path)[0] + ".profiles", self.windows.writer)
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        if not os.path.exists(self.db_path) and self.json_path and os.path.exists(self.json_path):
+            # La base nace ya migrada: si la migración se corta, la próxima vez se vuelve a intentar
+            migrate_json_to_sqlite(self.json_path, self.db_path)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL + synchronous=NORMAL: el commit no espera un fsync, no se traba el frame
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        self.windows.load(self._window_bootstrap)
+        # Sin archivo de estadísticas los puntajes se leen ahora (el hilo escritor los suma): las partidas
+        # que se guarden después van al delta y no se cuentan dos veces
+        history = [] if self.stats.exists() else conn.execute("SELECT game, score FROM scores").fetchall()
+        self.stats.load(lambda: history)
+        self.profiles.load(self._profiles_bootstrap)
+        return conn
+
+    def _window_bootstrap(self):
+        # Solo hace falta lo de esta semana (incluye el día de hoy)
+        today = datetime.now()
+        monday = (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d 00:00:00")
+        cursor = self._conn.execute("SELECT game, name, email, score, date FROM scores WHERE date >= ?", (monday,))
+        return [(row[0], _row_to_dict(row[1:])) for row in cursor]
+
+    def _profiles_bootstrap(self):
+        cursor = self._conn.execute("SELECT game, name, email, score, date FROM scores")
+        return [(row[0], _row_to_dict(row[1:])) for row in cursor]
+
+    def reload_if_changed(self):
+        """Detecta commits de otras conexiones (otro proceso) con PRAGMA data_version."""
+        with self._lock:
+            data_version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+            # Tablas diaria/semanal y estadísticas: archivos aparte, se revisan los dos
+            files_changed = self.windows.reload_if_changed()
+            files_changed = self.stats.reload_if_changed() or files_changed
+            if data_version == self._data_version and not files_changed:
+                return False
+            self._data_version = data_version
+            self.version += 1
+            return True
+
+    # --- Interfaz común con ScoreStore ---
+    def load(self):
+        with self._lock:
+            self._connect()
+
+    def ensure_file(self):
+        self.load()
+
+    def flush(self, timeout=5.0):
+        return self.windows.writer.flush(timeout)
+
+    def compact(self):
+        pass
+
+    def top_scores(self, game_id, limit=TOP_LIMIT, window=ALL_TIME):
+        with self._lock:
+            if window != ALL_TIME:
+                self._connect()
+                return self.windows.top(game_id, window, limit)
+            cursor = self._connect().execute(
+                "SELECT name, email, score, date FROM scores WHERE game = ? ORDER BY score DESC, email LIMIT ?",
+                (game_id, limit))
+            return [_row_to_dict(row) for row in cursor]
+
+    def player_best(self, game_id, email):
+        with self._lock:
+            return self._get_player(self._connect(), game_id, email)
+
+    # --- Puestos (SortedScores en memoria) ---
+    def _ranked(self, conn, game_id):
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._ranks_data_version:
+            # Otro proceso escribió la base: se vuelven a leer los juegos que se consulten
+            self._ranks = {}
+            self._ranks_data_version = data_version
+        ranked = self._ranks.get(game_id)
+        if ranked is None:
+            cursor = conn.execute("SELECT score FROM scores WHERE game = ?", (game_id,))
+            ranked = self._ranks[game_id] = SortedScores(score for score, in cursor)
+        return ranked
+
+    def _rank_changed(self, game_id, old_score, new_score):
+        # Después del commit de un puntaje propio (data_version no cambia con la conexión propia)
+        ranked = self._ranks.get(game_id)
+        if ranked is not None:
+            if old_score is not None:
+                ranked.remove(old_score)
+            ranked.insert(new_score)
+
+    def rank_of_score(self, game_id, score):
+        with self._lock:
+            ranked = self._ranked(self._connect(), game_id)
+            return ranked.count_above(score) + 1, len(ranked)
+
+    def player_rank(self, game_id, email):
+        with self._lock:
+            conn = self._connect()
+            player = self._get_player(conn, game_id, email)
+            if player is None:
+                return None
+            # Mismo orden que top_scores y page: a igual puntaje, por email
+            return self._position(conn, game_id, player["score"], email), len(self._ranked(conn, game_id))
+
+    def players_around(self, game_id, email, radius=2):
+        with self._lock:
+            conn = self._connect()
+            player = self._get_player(conn, game_id, email)
+            if player is None:
+                return []
+            score = player["score"]
+            rank = self._position(conn, game_id, score, email)
+            above = conn.execute(
+                "SELECT name, email, score, date FROM scores WHERE game = ? "
+                "AND (score > ? OR (score = ? AND email < ?)) ORDER BY score ASC, email DESC LIMIT ?",
+                (game_id, score, score, email, radius)).fetchall()
+            below = conn.execute(
+                "SELECT name, email, score, date FROM scores WHERE game = ? "
+                "AND (score < ? OR (score = ? AND email > ?)) ORDER BY score DESC, email LIMIT ?",
+                (game_id, score, score, email, radius)).fetchall()
+            result = [(rank - i - 1, _row_to_dict(row)) for i, row in enumerate(above)][::-1]
+            result.append((rank, player))
+            result.extend((rank + i + 1, _row_to_dict(row)) for i, row in enumerate(below))
+            return result
+
+    def _position(self, conn, game_id, score, email):
+        # Puesto de la fila en el orden de las páginas (puntaje, y a igual puntaje por email):
+        # los mayores salen del SortedScores; en SQLite solo se cuentan los empatados
+        ties = conn.execute(
+            "SELECT COUNT(*) FROM scores WHERE game = ? AND score = ? AND email < ?",
+            (game_id, score, email)).fetchone()[0]
+        return self._ranked(conn, game_id).count_above(score) + ties + 1
+
+    def page(self, game_id, cursor=None, limit=TOP_LIMIT):
+        with self._lock:
+            conn = self._connect()
+            total = len(self._ranked(conn, game_id))
+            anchor = []
+
+            def anchor_rank(score, email):
+                player = self._get_player(conn, game_id, email)
+                if player is not None and player["score"] == score:
+                    anchor.append((score, email))
+                    return self._position(conn, game_id, score, email)
+                return self.rank_of_score(game_id, score)[0]
+
+            start = resolve_start(cursor, total, anchor_rank)
+
+            def rows_between(low, high):
+                if not anchor:
+                    # Sin ancla se salta con OFFSET (recorre el índice hasta start)
+                    result = conn.execute(
+                        "SELECT name, email, score, date FROM scores WHERE game = ? "
+                        "ORDER BY score DESC, email LIMIT ? OFFSET ?", (game_id, high - low, low))
+                    return [_row_to_dict(row) for row in result]
+                # Con ancla se lee desde ella hacia los dos lados sobre el índice (keyset)
+                score, email = anchor[0]
+                before = conn.execute(
+                    "SELECT name, email, score, date FROM scores WHERE game = ? "
+                    "AND (score > ? OR (score = ? AND email < ?)) ORDER BY score ASC, email DESC LIMIT ?",
+                    (game_id, score, score, email, start - low)).fetchall()
+                after = conn.execute(
+                    "SELECT name, email, score, date FROM scores WHERE game = ? "
+                    "AND (score < ? OR (score = ? AND email >= ?)) ORDER BY score DESC, email LIMIT ?",
+                    (game_id, score, score, email, high - start)).fetchall()
+                return [_row_to_dict(row) for row in before[::-1] + after]
+
+            return build_page(start, total, limit, rows_between)
+
+    def find_players(self, game_id, prefix, limit=TOP_LIMIT):
+        with self._lock:
+            conn = self._connect()
+            # Rango sobre el índice (game, name COLLATE NOCASE): todos los nombres que empiezan con prefix
+            cursor = conn.execute(
+                "SELECT name, email, score, date FROM scores WHERE game = ? "
+                "AND name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE "
+                "ORDER BY score DESC, email LIMIT ?", (game_id, prefix, prefix + "\uffff", limit))
+            rows = [_row_to_dict(row) for row in cursor]
+            return [(self._position(conn, game_id, row["score"], row["email"]), row) for row in rows]
+
+    def game_ids(self):
+        with self._lock:
+            return [row[0] for row in self._connect().execute("SELECT DISTINCT game FROM scores")]
+
+    def iter_rows(self, game_id, chunk_size=1000):
+        # Conexión propia para no bloquear al juego mientras se exporta
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(
+                "SELECT name, email, score, date FROM scores WHERE game = ? ORDER BY score DESC, email", (game_id,))
+            while True:
+                block = cursor.fetchmany(chunk_size)
+                if not block:
+                    return
+                for row in block:
+                    yield _row_to_dict(row)
+        finally:
+            conn.close()
+
+    def bulk_load(self, rows, batch_size=1000):
+        """Carga masiva con executemany de a tandas (memoria constante)."""
+        count = 0
+        batch = []
+        for game_id, row in rows:
+            batch.append((game_id, row["email"], row.get("name", ""), row["score"], row.get("date") or now_str()))
+            if len(batch) >= batch_size:
+                count += self._bulk_insert(batch)
+                batch = []
+        if batch:
+            count += self._bulk_insert(batch)
+        return count
+
+    def _bulk_insert(self, batch):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(UPSERT, batch)
+            self._ranks = {}
+            self.version += 1
+        return len(batch)
+
+    def all_data(self):
+        with self._lock:
+            data = {}
+            cursor = self._connect().execute(
+                "SELECT game, name, email, score, date FROM scores ORDER BY game, score DESC, email")
+            for row in cursor:
+                data.setdefault(row[0], []).append(_row_to_dict(row[1:]))
+            return data
+
+    def _get_player(self, conn, game_id, email):
+        row = conn.execute(
+            "SELECT name, email, score, date FROM scores WHERE game = ? AND email = ?",
+            (game_id, email)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def player_profile(self, email):
+        with self._lock:
+            self._connect()
+            return build_profile(self, email, self.profiles.get(email))
+
+    def score_stats(self, game_id):
+        with self._lock:
+            self._connect()
+            return self.stats.get(game_id).summary()
+
+    def fraction_below(self, game_id, score):
+        with self._lock:
+            self._connect()
+            return self.stats.get(game_id).fraction_below(score)
+
+    def submit(self, game_id, name, email, score, date=None):
+        """Retorna (actualizado, puntaje_anterior, top_previo, top_nuevo), igual que ScoreStore."""
+        with self._lock:
+            conn = self._connect()
+            top = self.top_scores(game_id, 1)
+            prev_top = top[0] if top else None
+
+            date = date or now_str()
+            self.windows.record(game_id, name, email, score, date)
+            self.stats.record(game_id, score)
+            self.profiles.record(game_id, email, score, date)
+            self.version += 1
+
+            player = self._get_player(conn, game_id, email)
+            old_score = player["score"] if player else 0
+            if player and score <= old_score:
+                return False, old_score, prev_top, prev_top
+
+            with conn:
+                conn.execute(UPSERT, (game_id, email, name, score, date))
+            self._rank_changed(game_id, old_score if player else None, score)
+            self.version += 1
+            top = self.top_scores(game_id, 1)
+            new_top = top[0] if top else None
+            return True, old_score, prev_top, new_top
+
+    def submit_many(self, game_id, entries):
+        """Varios puntajes de un juego en una sola transacción; mismo resultado que ScoreStore.submit_many."""
+        with self._lock:
+            conn = self._connect()
+            top = self.top_scores(game_id, 1)
+            prev_top = top[0] if top else None
+
+            results = []
+            changed = []  # (puntaje anterior o None, nuevo) para el SortedScores
+            with conn:
+                for name, email, score, date in entries:
+                    date = date or now_str()
+                    self.windows.record(game_id, name, email, score, date)
+                    self.stats.record(game_id, score)
+                    self.profiles.record(game_id, email, score, date)
+                    self.version += 1
+                    player = self._get_player(conn, game_id, email)
+                    old_score = player["score"] if player else 0
+                    if player and score <= old_score:
+                        results.append((False, old_score))
+                        continue
+                    conn.execute(UPSERT, (game_id, email, name, score, date))
+                    results.append((True, old_score))
+                    changed.append((old_score if player else None, score))
+            if not changed:
+                return results, prev_top, prev_top
+            for old, new in changed:
+                self._rank_changed(game_id, old, new)
+            self.version += 1
+            top = self.top_scores(game_id, 1)
+            return results, prev_top, top[0] if top else None
+
+    def clear_game(self, game_id):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM scores WHERE game = ?", (game_id,))
+            self._ranks.pop(game_id, None)
+            self.windows.clear_game(game_id)
+            self.stats.clear_game(game_id)
+            self.profiles.clear_game(game_id)
+            self.version += 1
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _json_rows(json_path):
+    # Store JSON compartido (get_store): no se abre una segunda copia con sus propios hilos escritores
+    source = get_store(json_path, backend="json")
+    for game_id in source.game_ids():
+        for row in source.iter_rows(game_id):
+            if row.get("email"):
+                yield game_id, row["email"], row.get("name", ""), row["score"], row.get("date") or now_str()
+
+
+def migrate_json_to_sqlite(json_path=GLOBAL_SCORES_PATH, db_path=None):
+    """
+    Copia los puntajes del JSON (snapshot + diario) a la base SQLite.
+
+    Si la base no existe se arma entera en un archivo temporal que recién
+    al terminar se renombra: nunca queda una base a medio migrar (si otro
+    proceso la creó mientras tanto, gana la suya). Si ya existe, todo entra
+    en una sola transacción. Se puede correr más de una
+    vez: por cada jugador queda el mejor puntaje. Retorna la cantidad de
+    filas leídas.
+    """
+    db_path = db_path or os.path.splitext(json_path)[0] + ".db"
+    exists = os.path.exists(db_path)
+    target = db_path if exists else f"{db_path}.{os.getpid()}.tmp"
+    if not exists and os.path.exists(target):
+        os.remove(target)  # Resto de una migración que no terminó
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in _json_rows(json_path):
+            count += 1
+            yield row
+
+    conn = sqlite3.connect(target)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.executemany(UPSERT, counted())
+    except BaseException:
+        conn.close()
+        if not exists:
+            os.remove(target)
+        raise
+    conn.close()
+    if not exists:
+        if os.path.exists(db_path):
+            os.remove(target)
+        else:
+            os.replace(target, db_path)
+    return count
+
+
+# Migración manual: python puntajes/sqlite_store.py [ruta_json]
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else GLOBAL_SCORES_PATH
+    count = migrate_json_to_sqlite(source)
+    print(f"Migración completa: {count} puntajes copiados a {os.path.splitext(source)[0] + '.db'}")
@@ -0,0 +1,317 @@
+import os
+import math
+import threading
+
+from puntajes.file_lock import FileLock
+from puntajes.writer import atomic_write_json, read_json_with_backup
+
+# Error relativo máximo de los percentiles aproximados (buckets logarítmicos del sketch)
+SKETCH_ACCURACY = 0.02
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# Percentiles que muestra el resumen
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _sketch_bucket(score):
+    # Los puntajes <= 0 van todos al bucket 0; el resto al bucket (γ^(i-2), γ^(i-1)]
+    if score <= 0:
+        return 0
+    return math.ceil(math.log(score) / _LOG_GAMMA) + 1
+
+
+def _sketch_value(bucket):
+    # Valor representativo del bucket: a menos de SKETCH_ACCURACY de cualquier puntaje que caiga ahí
+    if bucket <= 0:
+        return 0
+    return 2 * _GAMMA ** (bucket - 1) / (_GAMMA + 1)
+
+
+def _histogram_bin(score):
+    # Histograma grueso para mostrar: 0, 1, 2-3, 4-7, 8-15, ...
+    return int(score).bit_length() if score > 0 else 0
+
+
+def _bin_range(bin_index):
+    if bin_index == 0:
+        return 0, 0
+    return 1 << (bin_index - 1), (1 << bin_index) - 1
+
+
+class RunningStats:
+    """
+    Estadísticas de las partidas de un juego, actualizadas en O(1) por partida.
+
+    Cantidad, media y varianza (Welford), mínimo, máximo, un histograma por
+    potencias de 2 y un sketch de buckets logarítmicos para los percentiles
+    (error relativo de SKETCH_ACCURACY). Dos RunningStats se pueden sumar:
+    así se juntan las partidas de varios procesos.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = {}     # bucket -> partidas
+        self.histogram = {}  # bin -> partidas
+
+    def add(self, score):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        bucket = _sketch_bucket(score)
+        self.sketch[bucket] = self.sketch.get(bucket, 0) + 1
+        bin_index = _histogram_bin(score)
+        self.histogram[bin_index] = self.histogram.get(bin_index, 0) + 1
+
+    def merge(self, other):
+        """Suma las partidas de other (fórmula de Chan para media y varianza)."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for bucket, n in other.sketch.items():
+            self.sketch[bucket] = self.sketch.get(bucket, 0) + n
+        for bin_index, n in other.histogram.items():
+            self.histogram[bin_index] = self.histogram.get(bin_index, 0) + n
+
+    def copy(self):
+        result = RunningStats()
+        result.merge(self)
+        return result
+
+    # --- Consultas ---
+    def stdev(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def quantile(self, q):
+        """Puntaje aproximado por debajo del cual queda la fracción q de las partidas."""
+        if not self.count:
+            return None
+        target = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.sketch):
+            seen += self.sketch[bucket]
+            if seen > target:
+                value = round(_sketch_value(bucket))
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def fraction_below(self, score):
+        """Fracción (0 a 1) de las partidas con un puntaje menor (por bucket: aproximado)."""
+        if not self.count:
+            return 0.0
+        bucket = _sketch_bucket(score)
+        below = sum(n for other, n in self.sketch.items() if other < bucket)
+        return below / self.count
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "stdev": round(self.stdev(), 2),
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {f"p{round(q * 100)}": self.quantile(q) for q in SUMMARY_QUANTILES},
+            "histogram": [[*_bin_range(b), self.histogram[b]] for b in sorted(self.histogram)],
+        }
+
+    # --- Archivo ---
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max,
+                "sketch": {str(k): v for k, v in self.sketch.items()},
+                "histogram": {str(k): v for k, v in self.histogram.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = int(data["count"])
+        stats.mean = float(data["mean"])
+        stats.m2 = float(data["m2"])
+        stats.min = data.get("min")
+        stats.max = data.get("max")
+        stats.sketch = {int(k): int(v) for k, v in data.get("sketch", {}).items()}
+        stats.histogram = {int(k): int(v) for k, v in data.get("histogram", {}).items()}
+        return stats
+
+
+class ScoreStatistics:
+    """
+    RunningStats de cada juego, guardadas en global_scores.stats.json.
+
+    Cuentan todas las partidas enviadas (mejoren o no el récord del
+    jugador). Cada proceso junta sus partidas nuevas en un "delta" y el
+    BackgroundWriter las suma a lo que haya en el archivo, así dos procesos
+    no se pisan ni cuentan dos veces la misma partida.
+    """
+
+    def __init__(self, path, writer):
+        self.path = path
+        self.writer = writer
+        self.file_lock = FileLock(os.path.splitext(path)[0] + ".lock")
+        self._lock = threading.Lock()
+        self._base = None      # game_id -> RunningStats guardadas (o armadas con el historial)
+        self._delta = {}       # game_id -> RunningStats todavía no guardadas
+        self._saving = {}      # delta que se está escribiendo (sigue contando en las consultas)
+        self._bootstrap = None  # bootstrap() pendiente: lo corre el hilo escritor antes de guardar
+        self._cleared = set()  # juegos borrados que todavía no se guardaron
+        self._own_mtime = None
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self):
+        data, _ = read_json_with_backup(self.path)
+        if not isinstance(data, dict):
+            return None
+        stats = {}
+        for game_id, values in data.items():
+            try:
+                stats[game_id] = RunningStats.from_dict(values)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+        return stats
+
+    def exists(self):
+        return self._base is not None or os.path.exists(self.path)
+
+    def load(self, bootstrap=None):
+        """
+        Lee el archivo; si no existe las estadísticas se arman en el hilo
+        escritor con bootstrap(), pares (game_id, puntaje) del historial (un
+        puntaje por jugador), y se guardan enseguida aunque queden vacías.
+        Mientras tanto las partidas nuevas se anotan igual (van al delta).
+        """
+        with self._lock:
+            if self._base is not None:
+                return
+            stats = self._read()
+            self._base = stats if stats is not None else {}
+            if stats is not None:
+                self._own_mtime = self._mtime()
+                return
+            self._bootstrap = bootstrap or (lambda: ())
+        self.writer.submit_job(("stats", self.path), self._save)
+
+    def record(self, game_id, score):
+        """Anota una partida. O(1): solo se actualiza el delta en memoria."""
+        with self._lock:
+            if self._base is None:
+                return
+            delta = self._delta.get(game_id)
+            if delta is None:
+                delta = self._delta[game_id] = RunningStats()
+            delta.add(score)
+        self.writer.submit_job(("stats", self.path), self._save)
+
+    def record_many(self, game_id, scores):
+        """Anota varias partidas de un juego (importación masiva)."""
+        with self._lock:
+            if self._base is None:
+                return
+            delta = self._delta.get(game_id)
+            if delta is None:
+                delta = self._delta[game_id] = RunningStats()
+            for score in scores:
+                delta.add(score)
+        self.writer.submit_job(("stats", self.path), self._save)
+
+    def get(self, game_id):
+        """RunningStats del juego (guardadas + nuevas); una copia."""
+        with self._lock:
+            stats = RunningStats()
+            if self._base is None:
+                return stats
+            for source in (self._base, self._saving, self._delta):
+                if game_id in source:
+                    stats.merge(source[game_id])
+            return stats
+
+    def clear_game(self, game_id):
+        with self._lock:
+            if self._base is None:
+                return
+            for source in (self._base, self._saving, self._delta):
+                source.pop(game_id, None)
+            self._cleared.add(game_id)
+        self.writer.submit_job(("stats", self.path), self._save)
+
+    def reload_if_changed(self):
+        """Toma lo que haya guardado otro proceso. Retorna True si se leyó el archivo."""
+        with self._lock:
+            if self._base is None or self._mtime() == self._own_mtime:
+                return False
+        if not self.file_lock.acquire(blocking=False):
+            return False
+        try:
+            stats = self._read()
+            with self._lock:
+                if stats is not None:
+                    for game_id in self._cleared:
+                        stats.pop(game_id, None)
+                    self._base = stats
+                self._own_mtime = self._mtime()
+        finally:
+            self.file_lock.release()
+        return True
+
+    # --- Escritura (hilo del BackgroundWriter) ---
+    def _run_bootstrap(self):
+        # Fuera de los candados: bootstrap() toma el del store solo para copiar los puntajes
+        bootstrap = self._bootstrap
+        if bootstrap is None:
+            return
+        stats = {}
+        for game_id, score in bootstrap():
+            stats.setdefault(game_id, RunningStats()).add(score)
+        with self._lock:
+            self._bootstrap = None
+            # Si mientras tanto otro proceso creó el archivo, manda el suyo (ver _save)
+            if self._own_mtime is None:
+                for game_id, extra in stats.items():
+                    self._base.setdefault(game_id, RunningStats()).merge(extra)
+
+    def _save(self):
+        self._run_bootstrap()
+        with self.file_lock:
+            with self._lock:
+                delta = self._saving = self._delta
+                self._delta = {}
+                cleared = set(self._cleared)
+            try:
+                # Si el archivo ya existe (lo escribió otro proceso) manda él, no el historial armado acá
+                stats = self._read()
+                if stats is None:
+                    with self._lock:
+                        stats = {game_id: s.copy() for game_id, s in self._base.items()}
+                for game_id in cleared:
+                    stats.pop(game_id, None)
+                for game_id, extra in delta.items():
+                    stats.setdefault(game_id, RunningStats()).merge(extra)
+                atomic_write_json(self.path, {game_id: s.to_dict() for game_id, s in stats.items()}, indent=None)
+            except Exception:
+                # Las partidas sin guardar vuelven al delta para el próximo intento
+                with self._lock:
+                    for game_id, extra in self._saving.items():
+                        self._delta.setdefault(game_id, RunningStats()).merge(extra)
+                    self._saving = {}
+                raise
+            with self._lock:
+                self._base = stats
+                self._saving = {}
+                self._cleared -= cleared
+                self._own_mtime = self._mtime()
@@ -0,0 +1,208 @@
+import os
+import threading
+
+from datetime import date, timedelta
+
+from puntajes.file_lock import FileLock
+from puntajes.ranking import RankedScores
+from puntajes.writer import atomic_write_json, read_json_with_backup
+
+# Tablas disponibles: histórica (la del store) y las que se reinician solas
+ALL_TIME = "all"
+DAILY = "daily"
+WEEKLY = "weekly"
+WINDOWS = (DAILY, WEEKLY)
+
+
+def period_key(window, text=None):
+    """Período al que pertenece una fecha ("2025-11-06" o "2025-W45"). Sin fecha, el actual."""
+    # Se corta el texto en vez de usar strptime: se llama en cada puntaje
+    when = date(int(text[:4]), int(text[5:7]), int(text[8:10])) if text else date.today()
+    if window == DAILY:
+        return when.isoformat()
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class _Board:
+    """Tabla de un juego para un período: mejor puntaje por jugador, ordenada."""
+
+    def __init__(self, period):
+        self.period = period
+        self.by_email = {}
+        self.rows = RankedScores()
+
+    def record(self, row):
+        """Retorna True si el puntaje mejora lo que el jugador tenía en el período."""
+        current = self.by_email.get(row["email"])
+        if current is None:
+            self.by_email[row["email"]] = row
+            self.rows.insert(row)
+            return True
+        if row["score"] <= current["score"]:
+            return False
+        current.update(row)
+        self.rows.reposition(current)
+        return True
+
+
+class WindowedBoards:
+    """
+    Tablas diaria y semanal de cada juego, actualizadas en cada puntaje.
+
+    Se guarda aparte (global_scores.windows.json) porque incluyen puntajes
+    que no superan el récord histórico del jugador. Al cambiar el día o la
+    semana la tabla vieja se descarta entera: no se recorre el historial.
+    El archivo lo escribe el BackgroundWriter del store, mezclando lo que
+    haya guardado otro proceso en el mismo período.
+    """
+
+    def __init__(self, path, writer):
+        self.path = path
+        self.writer = writer
+        self.file_lock = FileLock(os.path.splitext(path)[0] + ".lock")
+        self._lock = threading.Lock()
+        self._boards = None  # (game_id, ventana) -> _Board
+        self._cleared = set()  # juegos borrados que todavía no se guardaron
+        self._own_mtime = None
+
+    # --- Carga ---
+    def load(self, bootstrap=None):
+        """
+        Lee el archivo; si no existe arma las tablas una sola vez con
+        bootstrap(), que devuelve pares (game_id, fila) del historial, y
+        las guarda enseguida para no volver a recorrerlo en el próximo inicio.
+        """
+        with self._lock:
+            if self._boards is not None:
+                return
+            self._boards = {}
+            data, _ = read_json_with_backup(self.path)
+            if data is not None:
+                self._merge_locked(data)
+                self._own_mtime = self._mtime()
+                return
+            if bootstrap is not None:
+                self._bootstrap_locked(bootstrap())
+        self.writer.submit_job(("windows", self.path), self._save)
+
+    def _bootstrap_locked(self, rows):
+        # Se compara el texto de la fecha con el lunes y el domingo de esta semana: no se arma un date por fila
+        today = date.today()
+        monday = (today - timedelta(days=today.weekday())).isoformat()
+        sunday = (today + timedelta(days=6 - today.weekday())).isoformat()
+        today = today.isoformat()
+        current = {window: period_key(window) for window in WINDOWS}
+        for game_id, row in rows:
+            day = row.get("date")
+            # Las filas viejas sin email o sin fecha no entran en ninguna tabla del período
+            if not row.get("email") or not isinstance(day, str) or not monday <= day[:10] <= sunday:
+                continue
+            try:
+                self._board(game_id, WEEKLY, current[WEEKLY]).record(dict(row))
+                if day[:10] == today:
+                    self._board(game_id, DAILY, current[DAILY]).record(dict(row))
+            except (KeyError, TypeError):
+                continue
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _merge_locked(self, data):
+        for game_id, windows in data.items():
+            # Un juego borrado acá no se rellena con lo que quedó en disco
+            if game_id in self._cleared or not isinstance(windows, dict):
+                continue
+            for window, board in windows.items():
+                if window not in WINDOWS or not isinstance(board, dict):
+                    continue
+                for row in board.get("rows", []):
+                    try:
+                        self._record_locked(game_id, dict(row), only=window)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+
+    def _board(self, game_id, window, current=None):
+        # Si cambió el día/semana la tabla se reemplaza por una vacía: expira en O(1)
+        current = current or period_key(window)
+        board = self._boards.get((game_id, window))
+        if board is None or board.period != current:
+            board = self._boards[(game_id, window)] = _Board(current)
+        return board
+
+    def _record_locked(self, game_id, row, only=None):
+        changed = False
+        for window in WINDOWS if only is None else (only,):
+            current = period_key(window)
+            if period_key(window, row["date"]) != current:
+                continue
+            changed |= self._board(game_id, window, current).record(dict(row))
+        return changed
+
+    # --- Uso desde el store ---
+    def record(self, game_id, name, email, score, date):
+        """Anota un puntaje (mejore o no el histórico) en las tablas del período actual."""
+        with self._lock:
+            if self._boards is None:
+                return False
+            changed = self._record_locked(game_id, {"name": name, "email": email, "score": score, "date": date})
+        if changed:
+            self.writer.submit_job(("windows", self.path), self._save)
+        return changed
+
+    def top(self, game_id, window, limit):
+        with self._lock:
+            if self._boards is None:
+                return []
+            return [dict(row) for row in self._board(game_id, window).rows.top(limit)]
+
+    def clear_game(self, game_id):
+        with self._lock:
+            if self._boards is None:
+                return
+            for window in WINDOWS:
+                self._boards.pop((game_id, window), None)
+            self._cleared.add(game_id)
+        self.writer.submit_job(("windows", self.path), self._save)
+
+    def reload_if_changed(self):
+        """Mezcla lo que haya escrito otro proceso. Retorna True si se leyó el archivo."""
+        with self._lock:
+            if self._boards is None or self._mtime() == self._own_mtime:
+                return False
+        if not self.file_lock.acquire(blocking=False):
+            return False
+        try:
+            data, _ = read_json_with_backup(self.path)
+            with self._lock:
+                if data:
+                    self._merge_locked(data)
+                self._own_mtime = self._mtime()
+        finally:
+            self.file_lock.release()
+        return True
+
+    # --- Escritura (hilo del BackgroundWriter) ---
+    def _snapshot(self):
+        with self._lock:
+            data = {}
+            for (game_id, window), board in self._boards.items():
+                if board.period == period_key(window):
+                    data.setdefault(game_id, {})[window] = {
+                        "period": board.period, "rows": [dict(row) for row in board.rows]}
+            return data
+
+    def _save(self):
+        with self.file_lock:
+            if self._mtime() != self._own_mtime:
+                disk, _ = read_json_with_backup(self.path)
+                if disk:
+                    with self._lock:
+                        self._merge_locked(disk)
+            atomic_write_json(self.path, self._snapshot(), indent=None)
+            with self._lock:
+                self._own_mtime = self._mtime()
+                self._cleared.clear()
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+# Segundos de espera antes de reintentar una escritura del diario que falló
+WRITE_RETRY_INTERVAL = 2.0
+
+
+def atomic_write_json(path, data, indent=4):
+    """
+    Escribe un JSON de forma atómica: archivo temporal + fsync + os.replace.
+
+    La versión anterior queda como <path>.bak, así un corte de luz a mitad
+    de la escritura nunca deja el archivo truncado.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=indent)
+        file.flush()
+        os.fsync(file.fileno())
+    if os.path.exists(path):
+        os.replace(path, path + ".bak")
+    os.replace(tmp_path, path)
+
+
+def read_json_with_backup(path):
+    """
+    Lee un JSON escrito con atomic_write_json.
+
+    Si el archivo falta o está dañado se usa la copia .bak. Un archivo dañado
+    se aparta como .corrupt en vez de pisarlo en la próxima escritura.
+    Retorna (datos, desde_backup); datos es None si no hay nada legible.
+    """
+    for candidate in (path, path + ".bak"):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'r', encoding='utf-8') as file:
+                return json.load(file), candidate != path
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            print(f"ERROR: {candidate} está dañado ({e}). Se intenta con la copia de respaldo.")
+            try:
+                os.replace(candidate, candidate + ".corrupt")
+            except OSError:
+                pass
+    return None, False
+
+
+class BackgroundWriter:
+    """
+    Hilo escritor de puntajes: el juego encola y nunca espera al disco.
+
+    Los registros pendientes se agrupan en una sola escritura por diario y
+    las compactaciones pedidas mientras hay otra pendiente se juntan en una.
+
+    Si el disco falla los registros y las tareas quedan en memoria y se
+    reintentan (una tarea que falla no frena a las demás); al salir, los
+    registros que todavía no se pudieron escribir se le pasan a
+    spill(registros) (el store los guarda en el spool) en vez de perderse.
+    """
+
+    def __init__(self, name="score-writer", spill=None):
+        self.name = name
+        self.spill = spill      # spill([(journal, record), ...]) con lo que no se escribió al salir
+        self._cond = threading.Condition()
+        self._records = []      # (journal, record) pendientes
+        self._jobs = {}         # clave -> función, se conserva solo la última por clave
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        atexit.register(self.close)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def append(self, journal, record):
+        self.append_many(journal, [record])
+
+    def append_many(self, journal, records):
+        # Todos juntos: el hilo los escribe en la misma tanda (un solo fsync)
+        with self._cond:
+            self._records.extend((journal, record) for record in records)
+            self._start()
+            self._cond.notify()
+
+    def submit_job(self, key, job):
+        """Encola una tarea; si ya hay una pendiente con la misma clave se reemplaza."""
+        with self._cond:
+            self._jobs[key] = job
+            self._start()
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return bool(self._records or self._jobs or self._busy)
+
+    def flush(self, timeout=5.0):
+        """Espera a que se escriba todo lo pendiente (se llama al salir del juego)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not (self._records or self._jobs or self._busy), timeout)
+
+    def close(self, timeout=5.0):
+        """Al salir: espera a que se escriba todo y, si no se pudo, pasa los registros a spill."""
+        if self.flush(timeout) or self.spill is None:
+            return
+        with self._cond:
+            records, self._records = self._records, []
+            self._closed = True
+        self._spill(records)
+
+    def _spill(self, records):
+        if not records:
+            return
+        try:
+            self.spill(records)
+        except Exception as e:
+            print(f"ERROR: se perdieron {len(records)} puntaje(s) sin guardar ({e}).")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._records or self._jobs)
+                records, self._records = self._records, []
+                jobs, self._jobs = self._jobs, {}
+                self._busy = True
+            try:
+                self._write_records(records)
+            except Exception as e:
+                # Disco lleno o sin permisos: los registros vuelven a la cola en vez de perderse
+                print(f"ERROR al guardar puntajes: {e}. Se reintenta en {WRITE_RETRY_INTERVAL:.0f}s.")
+                with self._cond:
+                    closed = self._closed
+                    if not closed:
+                        self._records[:0] = records
+                    self._jobs = {**jobs, **self._jobs}
+                    self._busy = False
+                    self._cond.notify_all()
+                if closed:
+                    # El proceso ya está saliendo: no queda nadie que reintente
+                    self._spill(records)
+                time.sleep(WRITE_RETRY_INTERVAL)
+                continue
+            # Cada tarea por separado: una que falla no se lleva a las demás de la tanda
+            failed = {}
+            for key, job in jobs.items():
+                try:
+                    job()
+                except Exception as e:
+                    print(f"ERROR al guardar puntajes ({key}): {e}. Se reintenta en {WRITE_RETRY_INTERVAL:.0f}s.")
+                    failed[key] = job
+            with self._cond:
+                # Si mientras tanto se encoló otra con la misma clave, queda la nueva
+                self._jobs = {**failed, **self._jobs}
+                self._busy = False
+                self._cond.notify_all()
+            if failed:
+                time.sleep(WRITE_RETRY_INTERVAL)
+
+    def _write_records(self, records):
+        grouped = {}
+        for journal, record in records:
+            grouped.setdefault(id(journal), (journal, []))[1].append(record)
+        for journal, batch in grouped.values():
+            journal.append_many(batch)
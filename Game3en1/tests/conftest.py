@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos se importan como en los juegos: desde la carpeta Game3en1
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
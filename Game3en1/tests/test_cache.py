@@ -0,0 +1,59 @@
+from datetime import date
+
+from puntajes import cache, windows
+from puntajes.cache import LeaderboardCache
+from puntajes.windows import ALL_TIME, DAILY
+
+
+class Today(date):
+    current = date(2025, 11, 5)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+class CountingStore:
+    """Store mínimo que cuenta cuántas veces se le pregunta."""
+
+    def __init__(self):
+        self.version = 0
+        self.calls = 0
+
+    def reload_if_changed(self):
+        return False
+
+    def top_scores(self, game_id, limit, window=ALL_TIME):
+        self.calls += 1
+        return [{"game": game_id, "window": window, "call": self.calls}]
+
+    def fraction_below(self, game_id, score):
+        self.calls += 1
+        return 0.5
+
+
+def test_entries_are_dropped_when_the_version_changes(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_SIZE", 4)
+    store = CountingStore()
+    leaderboard = LeaderboardCache(store)
+    for score in range(10):
+        leaderboard.fraction_below("SNAKE", score)
+    assert len(leaderboard._entries) == 4
+    leaderboard.fraction_below("SNAKE", 9)
+    assert store.calls == 10
+
+    store.version += 1
+    leaderboard.top_scores("SNAKE", 10)
+    assert list(leaderboard._entries) == [("top", "SNAKE", 10, ALL_TIME, None)]
+
+
+def test_daily_table_is_reloaded_after_midnight(monkeypatch):
+    monkeypatch.setattr(windows, "date", Today)
+    Today.current = date(2025, 11, 5)
+    store = CountingStore()
+    leaderboard = LeaderboardCache(store)
+    first = leaderboard.top_scores("SNAKE", 10, DAILY)
+    assert leaderboard.top_scores("SNAKE", 10, DAILY) is first
+    Today.current = date(2025, 11, 6)
+    assert leaderboard.top_scores("SNAKE", 10, DAILY) is not first
+    assert store.calls == 2
@@ -0,0 +1,119 @@
+import os
+import json
+
+import pytest
+
+from puntajes import sqlite_store
+from puntajes.score_store import ScoreStore, get_store, release_store
+from puntajes.sqlite_store import migrate_json_to_sqlite
+
+
+def legacy_rows():
+    # Como los dejaban las versiones viejas: el mismo email repetido y filas sin email
+    rows = [{"name": "ANA", "email": "ana@x.com", "score": score, "date": "2025-01-01 10:00:00"}
+            for score in (10, 90, 40, 90, 5, 60, 70, 80)]
+    rows += [{"name": "BETO", "email": "beto@x.com", "score": 50, "date": "2025-01-01 10:00:00"},
+             {"name": "BETO", "email": "beto@x.com", "score": 55, "date": "2025-01-02 10:00:00"},
+             {"name": "VIEJO", "score": 30}]
+    return rows
+
+
+def write_legacy(tmp_path):
+    path = tmp_path / "global_scores.json"
+    path.write_text(json.dumps({"SNAKE": legacy_rows(), "FLAPPY": []}), encoding="utf-8")
+    return str(path)
+
+
+def snapshot(store):
+    return {
+        # El snapshot binario completa email/fecha vacíos: se comparan los campos que importan
+        "top": [(row["name"], row.get("email"), row["score"]) for row in store.top_scores("SNAKE", 10)],
+        "rank": store.player_rank("SNAKE", "beto@x.com"),
+        "rank_of_score": store.rank_of_score("SNAKE", 52),
+    }
+
+
+def test_legacy_duplicates_are_merged_in_memory(tmp_path):
+    store = ScoreStore(write_legacy(tmp_path))
+    top = store.top_scores("SNAKE", 10)
+    assert [(row.get("email"), row["score"]) for row in top] == \
+        [("ana@x.com", 90), ("beto@x.com", 55), (None, 30)]
+    assert store.player_rank("SNAKE", "beto@x.com") == (2, 3)
+
+
+def test_migration_matches_memory(tmp_path):
+    path = write_legacy(tmp_path)
+    store = ScoreStore(path)
+    before = snapshot(store)
+    assert store.flush()
+
+    # La primera carga crea los archivos por juego; el JSON combinado no se toca
+    assert os.path.isdir(os.path.join(tmp_path, "global_scores"))
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file)["SNAKE"] == legacy_rows()
+
+    reopened = ScoreStore(path)
+    assert snapshot(reopened) == before
+    reopened.compact()
+    assert snapshot(ScoreStore(path)) == before
+
+
+def test_compaction_keeps_best_per_email(tmp_path):
+    path = str(tmp_path / "global_scores.json")
+    store = ScoreStore(path)
+    for score in (5, 50, 20):
+        store.submit("SNAKE", "ANA", "ana@x.com", score)
+    store.submit("SNAKE", "BETO", "beto@x.com", 30)
+    store.compact()
+
+    with open(store.shard_path("SNAKE"), encoding="utf-8") as file:
+        rows = json.load(file)
+    assert [(row["email"], row["score"]) for row in rows] == [("ana@x.com", 50), ("beto@x.com", 30)]
+    assert snapshot(ScoreStore(path)) == snapshot(store)
+
+
+def players(store):
+    # SQLite no guarda filas sin email (VIEJO): se comparan los jugadores
+    return [(row["name"], row["email"], row["score"], store.player_rank("SNAKE", row["email"])[0])
+            for row in store.top_scores("SNAKE", 10) if row.get("email")]
+
+
+def test_sqlite_migration_reuses_json_store(tmp_path):
+    path = write_legacy(tmp_path)
+    source = get_store(path, backend="json")
+    store = get_store(path, backend="sqlite")
+    try:
+        assert players(store) == players(source)
+        # La migración leyó el store compartido: no quedó otro ScoreStore para la misma ruta
+        assert get_store(path, backend="json") is source
+        assert not [name for name in os.listdir(tmp_path) if name.startswith("global_scores.db.")]
+    finally:
+        release_store(path, backend="sqlite")
+        release_store(path, backend="json")
+
+
+def test_failed_sqlite_migration_leaves_no_database(tmp_path, monkeypatch):
+    path = write_legacy(tmp_path)
+    db_path = str(tmp_path / "global_scores.db")
+    real_rows = sqlite_store._json_rows
+
+    def broken_rows(json_path):
+        rows = real_rows(json_path)
+        yield next(rows)
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(sqlite_store, "_json_rows", broken_rows)
+    try:
+        with pytest.raises(OSError):
+            migrate_json_to_sqlite(path, db_path)
+        assert not os.path.exists(db_path)
+        assert not [name for name in os.listdir(tmp_path) if name.startswith("global_scores.db.")]
+
+        # La próxima vez se migra entero
+        monkeypatch.setattr(sqlite_store, "_json_rows", real_rows)
+        assert migrate_json_to_sqlite(path, db_path) == 2
+        store = sqlite_store.SQLiteScoreStore(db_path)
+        assert players(store) == players(get_store(path, backend="json"))
+        store.close()
+    finally:
+        release_store(path, backend="json")
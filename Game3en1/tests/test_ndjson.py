@@ -0,0 +1,60 @@
+import io
+
+from puntajes.ndjson import read_ndjson, write_ndjson
+from puntajes.score_store import ScoreStore
+
+
+def make_store(tmp_path):
+    return ScoreStore(str(tmp_path / "global_scores.json"))
+
+
+def test_round_trip(tmp_path):
+    store = make_store(tmp_path)
+    store.bulk_load([
+        ("SNAKE", {"name": "ANA", "email": "ana@x.com", "score": 50, "date": "2025-01-01 10:00:00"}),
+        ("SNAKE", {"name": "BETO", "email": "beto@x.com", "score": 70, "date": "2025-01-02 10:00:00"}),
+        ("FLAPPY", {"name": "ANA", "email": "ana@x.com", "score": 5, "date": "2025-01-03 10:00:00"}),
+    ])
+    output = io.StringIO()
+    assert write_ndjson(store, output) == 3
+
+    other = make_store(tmp_path / "otro")
+    errors = []
+    assert other.bulk_load(read_ndjson(io.StringIO(output.getvalue()), errors)) == 3
+    assert errors == []
+    assert other.all_data() == store.all_data()
+
+
+def test_invalid_lines_are_reported():
+    text = "\n".join([
+        '{"game":"SNAKE","name":"ANA","email":"ana@x.com","score":10}',
+        '{"game":5,"name":"X","email":"x@x.com","score":1}',
+        '{"game":"","name":"X","email":"x@x.com","score":1}',
+        '{"game":"SNAKE","name":"X","email":"sin-arroba","score":1}',
+        '{"game":"SNAKE","name":"X","email":"x@x.com","score":"mucho"}',
+        '{"game":"SNAKE","name":"X","email":"x@x.com"}',
+        '[1, 2]',
+        '{roto',
+        '',
+        '{"game":"FLAPPY","name":"BETO","email":"beto@x.com","score":"7"}',
+    ])
+    errors = []
+    rows = list(read_ndjson(io.StringIO(text), errors))
+    assert [(game, row["email"], row["score"]) for game, row in rows] == \
+        [("SNAKE", "ana@x.com", 10), ("FLAPPY", "beto@x.com", 7)]
+    assert errors == [2, 3, 4, 5, 6, 7, 8]
+
+
+def test_invalid_game_does_not_lose_valid_rows(tmp_path):
+    text = ('{"game":5,"name":"X","email":"x@x.com","score":1}\n'
+            '{"game":"SNAKE","name":"ANA","email":"ana@x.com","score":10}\n')
+    store = make_store(tmp_path)
+    errors = []
+    assert store.bulk_load(read_ndjson(io.StringIO(text), errors)) == 1
+    assert store.flush()
+    assert errors == [1]
+
+    output = io.StringIO()
+    assert write_ndjson(make_store(tmp_path), output) == 1
+    assert '"ana@x.com"' in output.getvalue()
+
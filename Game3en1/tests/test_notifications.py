@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+
+from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from notificaciones.dispatcher import NotificationDispatcher, TokenBucket
+from notificaciones.email_notifier import resend_spooled
+from notificaciones.transports import SpoolTransport, TransportError, WebhookTransport
+
+
+class Webhook:
+    """Servicio local que anota cada POST; delay y close_after simulan un servicio lento o que corta."""
+
+    def __init__(self, delay=0.0, close_after=False):
+        self.requests = []
+        self.delay = delay
+        self.close_after = close_after
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                webhook.requests.append((self.headers.get("Idempotency-Key"), json.loads(body)))
+                time.sleep(webhook.delay)
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                # Cierra sin avisar (sin "Connection: close"): el cliente cree que sigue abierta
+                self.close_connection = webhook.close_after
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/notify"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def message(text="hola"):
+    msg = MIMEText(text, "plain")
+    msg["To"] = "ana@x.com"
+    msg["Subject"] = "récord"
+    return msg
+
+
+def test_webhook_does_not_resend_after_a_timeout():
+    webhook = Webhook(delay=0.5)
+    transport = WebhookTransport(webhook.url, timeout=0.1)
+    try:
+        with pytest.raises(TimeoutError):
+            transport.send(message())
+        time.sleep(0.6)
+        # El servicio recibió el mail una sola vez, aunque el cliente no vio la respuesta
+        assert len(webhook.requests) == 1
+    finally:
+        transport.close()
+        webhook.stop()
+
+
+def test_webhook_retries_a_closed_keep_alive_with_the_same_key():
+    webhook = Webhook(close_after=True)
+    transport = WebhookTransport(webhook.url)
+    try:
+        transport.send(message("uno"))
+        time.sleep(0.1)
+        transport.send(message("dos"))
+        transport.send(message("dos"))
+        keys = [key for key, _ in webhook.requests]
+        assert [payload["text"] for _, payload in webhook.requests] == ["uno", "dos", "dos"]
+        # El mismo mail lleva la misma clave: el servicio puede descartar el repetido
+        assert keys[1] == keys[2] != keys[0]
+    finally:
+        transport.close()
+        webhook.stop()
+
+
+def make_dispatcher(send, max_attempts):
+    return NotificationDispatcher(send, window=0.0, name="notifier-test", limiter=TokenBucket(0),
+                                  backoff=0.01, max_attempts=max_attempts)
+
+
+def test_failed_digest_is_retried_with_new_records():
+    calls = []
+
+    def send(recipient, events):
+        calls.append([(event["game_name"], event["score"], event["count"]) for event in events])
+        if len(calls) == 1:
+            # Mientras falla el primer envío llega otro récord del mismo jugador
+            dispatcher.submit("ana@x.com", "SNAKE", 70)
+        return len(calls) > 2
+
+    dispatcher = make_dispatcher(send, max_attempts=5)
+    dispatcher.submit("ana@x.com", "SNAKE", 50)
+    assert dispatcher.flush(timeout=2.0)
+    assert calls[0] == [("SNAKE", 50, 1)]
+    assert calls[-1] == [("SNAKE", 70, 2)]
+    assert (dispatcher.sent, dispatcher.failed, dispatcher.retried, dispatcher.gave_up) == (1, 2, 2, 0)
+
+
+def test_digest_goes_to_on_failed_after_the_last_attempt():
+    failed = []
+    dispatcher = make_dispatcher(lambda recipient, events: False, max_attempts=3)
+    dispatcher.on_failed = lambda recipient, events: failed.append((recipient, events))
+    dispatcher.submit("ana@x.com", "FLAPPY", 12, "ANA")
+    assert dispatcher.flush(timeout=2.0)
+    assert dispatcher.failed == 3 and dispatcher.gave_up == 1
+    assert failed == [("ana@x.com", [{"game_name": "FLAPPY", "score": 12, "player_name": "ANA", "count": 1}])]
+
+
+def test_close_hands_unsent_digests_to_on_failed():
+    failed = []
+    release = threading.Event()
+    dispatcher = make_dispatcher(lambda recipient, events: release.wait(2.0), max_attempts=3)
+    dispatcher.on_failed = lambda recipient, events: failed.append(recipient)
+    dispatcher.submit("ana@x.com", "SNAKE", 1)
+    dispatcher.submit("beto@x.com", "SNAKE", 2)
+    dispatcher.close(timeout=0.1)
+    release.set()
+    assert failed == ["beto@x.com"]
+
+
+class FlakyTransport:
+    """Anota los mails; falla a partir del mail número fail_from (empezando en 0)."""
+
+    name = "flaky"
+
+    def __init__(self, fail_from=None):
+        self.sent = []
+        self.fail_from = fail_from
+
+    def send(self, msg):
+        if self.fail_from is not None and len(self.sent) >= self.fail_from:
+            raise TransportError("servidor caído")
+        self.sent.append(msg.get_payload(decode=True).decode("utf-8"))
+
+
+def test_spooled_digests_are_resent_and_removed(tmp_path):
+    spool = SpoolTransport(str(tmp_path))
+    for text in ("uno", "dos", "tres"):
+        spool.send(message(text))
+
+    # Se corta en la primera falla: lo que no salió sigue en la carpeta como .eml
+    down = FlakyTransport(fail_from=1)
+    assert resend_spooled(down, str(tmp_path)) == 1
+    assert down.sent == ["uno"]
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".eml", ".eml"]
+
+    up = FlakyTransport()
+    assert resend_spooled(up, str(tmp_path)) == 2
+    assert up.sent == ["dos", "tres"]
+    assert list(tmp_path.iterdir()) == []
+    # Con el spool como salida no hay adónde reenviarlos
+    spool.send(message())
+    assert resend_spooled(spool, str(tmp_path)) == 0
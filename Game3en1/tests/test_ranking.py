@@ -0,0 +1,126 @@
+import random
+import sqlite3
+
+import pytest
+
+from puntajes import ranking
+from puntajes.ranking import RankedScores, SortedScores
+from puntajes.sqlite_store import SQLiteScoreStore
+
+
+def brute_order(rows):
+    # Referencia: mayor puntaje primero y, a igual puntaje, el que llegó antes
+    return sorted(rows, key=lambda row: (-row["score"], row["seq"]))
+
+
+def test_ranked_scores_matches_brute_force(monkeypatch):
+    # Bloques chicos para que la prueba parta y vacíe bloques muchas veces
+    monkeypatch.setattr(ranking, "BLOCK_SIZE", 4)
+    rnd = random.Random(7)
+    seq = iter(range(10 ** 9))
+    rows = [{"score": rnd.randint(0, 50), "seq": next(seq)} for _ in range(30)]
+    ranked = RankedScores(rows)
+    for _ in range(3000):
+        op = rnd.random()
+        if op < 0.4 or not rows:
+            row = {"score": rnd.randint(0, 50), "seq": next(seq)}
+            rows.append(row)
+            ranked.insert(row)
+        elif op < 0.7:
+            row = rnd.choice(rows)
+            row["score"] = rnd.randint(0, 50)
+            row["seq"] = next(seq)
+            ranked.reposition(row)
+        else:
+            row = rows.pop(rnd.randrange(len(rows)))
+            ranked.remove(row)
+
+        expected = brute_order(rows)
+        assert len(ranked) == len(expected)
+        assert list(ranked) == expected
+        if rows:
+            row = rnd.choice(rows)
+            assert ranked.rank_of(row) == expected.index(row) + 1
+        score = rnd.randint(-1, 51)
+        assert ranked.rank_of_score(score) == 1 + sum(1 for row in rows if row["score"] > score)
+        start, end = sorted((rnd.randint(-2, len(rows) + 2), rnd.randint(-2, len(rows) + 2)))
+        assert ranked.slice(start, end) == expected[max(0, start):max(0, end)]
+        limit = rnd.randint(0, 12)
+        assert ranked.top(limit) == expected[:limit]
+
+
+def test_sorted_scores_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(ranking, "BLOCK_SIZE", 4)
+    rnd = random.Random(11)
+    scores = [rnd.randint(0, 40) for _ in range(25)]
+    ranked = SortedScores(scores)
+    for _ in range(3000):
+        if rnd.random() < 0.55 or not scores:
+            score = rnd.randint(0, 40)
+            scores.append(score)
+            ranked.insert(score)
+        else:
+            score = scores.pop(rnd.randrange(len(scores)))
+            ranked.remove(score)
+        assert len(ranked) == len(scores)
+        probe = rnd.randint(-1, 41)
+        assert ranked.count_above(probe) == sum(1 for score in scores if score > probe)
+
+
+def test_sorted_scores_rejects_missing_score():
+    ranked = SortedScores([3, 5])
+    with pytest.raises(ValueError):
+        ranked.remove(4)
+
+
+def sql_rank(path, game_id, score):
+    conn = sqlite3.connect(path)
+    try:
+        better, total = conn.execute(
+            "SELECT SUM(score > ?), COUNT(*) FROM scores WHERE game = ?", (score, game_id)).fetchone()
+        return (better or 0) + 1, total
+    finally:
+        conn.close()
+
+
+def test_sqlite_ranks_follow_own_and_foreign_writes(tmp_path):
+    path = str(tmp_path / "global_scores.db")
+    store = SQLiteScoreStore(path)
+    rnd = random.Random(3)
+    for i in range(200):
+        store.submit("SNAKE", f"P{i}", f"p{i % 60}@x.com", rnd.randint(0, 300))
+    store.submit_many("SNAKE", [(f"Q{i}", f"q{i % 7}@x.com", rnd.randint(0, 300), None) for i in range(20)])
+    for score in (-1, 0, 150, 299, 400):
+        assert store.rank_of_score("SNAKE", score) == sql_rank(path, "SNAKE", score)
+
+    # Otro proceso (otra conexión) escribe la misma base: el índice en memoria se descarta
+    other = SQLiteScoreStore(path)
+    other.submit("SNAKE", "ZED", "zed@x.com", 1000)
+    other.clear_game("FLAPPY")
+    assert store.rank_of_score("SNAKE", 999) == sql_rank(path, "SNAKE", 999)
+    assert store.player_rank("SNAKE", "zed@x.com")[0] == 1
+
+    # Las páginas y la búsqueda por nombre numeran igual (puntaje y, a igual puntaje, email)
+    positions = {}
+    cursor = None
+    while True:
+        page = store.page("SNAKE", cursor, 25)
+        positions.update((row["email"], position) for position, row in page["rows"])
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert sorted(positions.values()) == list(range(1, page["total"] + 1))
+    assert page["total"] == sql_rank(path, "SNAKE", 0)[1]
+    for prefix in ("P1", "Q", "ZED"):
+        for position, row in store.find_players("SNAKE", prefix, 100):
+            assert position == positions[row["email"]]
+    # El top, el puesto del jugador y los vecinos usan el mismo orden
+    ordered = sorted(positions, key=positions.get)
+    assert [row["email"] for row in store.top_scores("SNAKE", 100)] == ordered[:100]
+    assert [row["email"] for row in store.all_data()["SNAKE"]] == ordered
+    for email in ordered:
+        assert store.player_rank("SNAKE", email) == (positions[email], page["total"])
+        for position, row in store.players_around("SNAKE", email):
+            assert position == positions[row["email"]]
+    store.close()
+    other.close()
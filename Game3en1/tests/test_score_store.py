@@ -0,0 +1,151 @@
+import json
+import threading
+
+from puntajes import writer
+from puntajes.score_store import ScoreStore
+
+
+def make_store(tmp_path):
+    return ScoreStore(str(tmp_path / "global_scores.json"))
+
+
+def read_shard(store, game_id):
+    with open(store.shard_path(game_id), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_clear_then_compact_does_not_bring_rows_back(tmp_path):
+    store = make_store(tmp_path)
+    store.submit("SNAKE", "ANA", "ana@x.com", 100)
+    assert store.flush()
+    store.clear_game("SNAKE")
+    store.compact()
+
+    assert store.top_scores("SNAKE") == []
+    assert read_shard(store, "SNAKE") == []
+    # Otro puntaje vuelve a marcar el juego: la fila borrada no reaparece en el archivo
+    store.submit("SNAKE", "BETO", "beto@x.com", 5)
+    store.compact()
+    assert [row["email"] for row in read_shard(store, "SNAKE")] == ["beto@x.com"]
+    assert [row["email"] for row in make_store(tmp_path).top_scores("SNAKE")] == ["beto@x.com"]
+
+
+def test_clear_from_another_process_is_not_undone(tmp_path):
+    store = make_store(tmp_path)
+    store.submit("SNAKE", "ANA", "ana@x.com", 100)
+    store.compact()
+
+    other = make_store(tmp_path)
+    other.clear_game("SNAKE")
+    other.submit("SNAKE", "BETO", "beto@x.com", 5)
+    assert other.flush()
+    store.reload_if_changed()
+    store.compact()
+    assert [row["email"] for row in read_shard(store, "SNAKE")] == ["beto@x.com"]
+
+
+def test_submit_with_binary_snapshot_does_not_load_on_the_caller(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    store.submit("SNAKE", "ANA", "ana@x.com", 100)
+    store.submit("SNAKE", "BETO", "beto@x.com", 50)
+    store.compact()
+
+    store = make_store(tmp_path)
+    release = threading.Event()
+    loaded_on = []
+    read_tables = store._read_tables
+
+    def slow_read_tables():
+        loaded_on.append(threading.current_thread().name)
+        assert release.wait(5.0)
+        return read_tables()
+
+    monkeypatch.setattr(store, "_read_tables", slow_read_tables)
+    store.load()
+    # Mientras el hilo escritor carga, el puntaje se encola y la respuesta sale del snapshot
+    updated, old_score, prev_top, new_top = store.submit("SNAKE", "BETO", "beto@x.com", 120)
+    assert (updated, old_score, prev_top["score"], new_top["email"]) == (True, 50, 100, "beto@x.com")
+    assert store.submit("SNAKE", "BETO", "beto@x.com", 110)[:2] == (False, 120)
+    assert [row["score"] for row in store.top_scores("SNAKE")] == [100, 50]
+    release.set()
+    assert store.flush()
+
+    assert loaded_on == ["score-writer"]
+    assert [row["score"] for row in store.top_scores("SNAKE")] == [120, 100]
+    assert store.score_stats("SNAKE")["count"] == 4
+    assert [row["score"] for row in make_store(tmp_path).top_scores("SNAKE")] == [120, 100]
+
+
+def test_binary_snapshot_keeps_the_memory_order_of_ties(tmp_path):
+    store = make_store(tmp_path)
+    store.submit("SNAKE", "ANA", "ana@x.com", 40)
+    store.submit("SNAKE", "BETO", "beto@x.com", 50)
+    store.compact()
+    # Ana empata después que Carla: en memoria va detrás, aunque en el archivo estaba antes
+    store.submit("SNAKE", "CARLA", "carla@x.com", 50)
+    store.submit("SNAKE", "ANA", "ana@x.com", 50)
+    store.compact()
+    expected = [row["email"] for row in store.top_scores("SNAKE")]
+    assert expected == ["beto@x.com", "carla@x.com", "ana@x.com"]
+
+    reopened = make_store(tmp_path)
+    assert [row["email"] for row in reopened.top_scores("SNAKE")] == expected
+    assert reopened._snapshot is not None
+    assert reopened.player_rank("SNAKE", "ana@x.com") == store.player_rank("SNAKE", "ana@x.com") == (3, 3)
+
+
+def test_non_integer_scores_are_not_truncated_in_the_binary_snapshot(tmp_path):
+    store = make_store(tmp_path)
+    store.bulk_load([("SNAKE", {"name": "ANA", "email": "ana@x.com", "score": 12.5})])
+    store.submit("FLAPPY", "BETO", "beto@x.com", 7)
+    store.compact()
+
+    reopened = make_store(tmp_path)
+    assert reopened.top_scores("SNAKE")[0]["score"] == 12.5
+    assert reopened.top_scores("FLAPPY")[0]["score"] == 7
+
+
+def test_failed_compaction_keeps_games_dirty(tmp_path, monkeypatch):
+    monkeypatch.setattr(writer, "WRITE_RETRY_INTERVAL", 0.01)
+    store = make_store(tmp_path)
+    store.ensure_file()
+    save_game = store._save_game
+    failures = []
+
+    def fail_once(game_id, rows):
+        if not failures:
+            failures.append(game_id)
+            raise OSError("disco lleno")
+        save_game(game_id, rows)
+
+    # La compactación que falla vuelve a la cola con el juego todavía marcado
+    monkeypatch.setattr(store, "_save_game", fail_once)
+    store.bulk_load([("SNAKE", {"name": "ANA", "email": "ana@x.com", "score": 10})])
+    assert failures == ["SNAKE"]
+    assert not store._dirty
+    assert make_store(tmp_path).top_scores("SNAKE")[0]["email"] == "ana@x.com"
+
+
+def test_bulk_load_keeps_best_per_email(tmp_path):
+    store = make_store(tmp_path)
+    store.bulk_load(("SNAKE", {"name": f"P{i}", "email": f"p{i}@x.com", "score": i}) for i in range(100))
+    store.submit("SNAKE", "ANA", "ana@x.com", 40)
+
+    # Pocas filas frente al juego (una por una) y muchas (un solo sort) dan lo mismo
+    for rows in ([("SNAKE", {"name": "ANA2", "email": "ana@x.com", "score": 40}),
+                  ("SNAKE", {"name": "P7", "email": "p7@x.com", "score": 3}),
+                  ("SNAKE", {"name": "P8", "email": "p8@x.com", "score": 95}),
+                  ("SNAKE", {"name": "P8", "email": "p8@x.com", "score": 90}),
+                  ("SNAKE", {"name": "SIN EMAIL", "score": 500})],
+                 [("SNAKE", {"name": f"N{i}", "email": f"n{i}@x.com", "score": 40}) for i in range(60)]):
+        store.bulk_load(rows)
+        by_email = {row["email"]: row for row in store.iter_rows("SNAKE")}
+        assert by_email["ana@x.com"]["name"] == "ANA"
+        assert by_email["p7@x.com"]["score"] == 7
+        assert by_email["p8@x.com"]["score"] == 95
+        assert None not in by_email
+
+    # A igual puntaje los que ya estaban quedan adelante de los importados
+    tied = [row["email"] for row in store.iter_rows("SNAKE") if row["score"] == 40]
+    assert tied[:2] == ["p40@x.com", "ana@x.com"]
+    assert make_store(tmp_path).top_scores("SNAKE", 200) == store.top_scores("SNAKE", 200)
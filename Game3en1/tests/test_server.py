@@ -0,0 +1,217 @@
+import json
+import time
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+from notificaciones.dispatcher import get_dispatcher
+from puntajes import data_manager
+from puntajes.remote_store import RemoteScoreStore
+from puntajes.score_store import release_store
+from puntajes.server import LeaderboardServer
+from puntajes.spool import SubmissionSpool
+
+
+class RunningServer:
+    """LeaderboardServer en un hilo, en un puerto libre de localhost."""
+
+    def __init__(self, scores_path, port=0):
+        self.service = LeaderboardServer(scores_path, "json", notify=lambda **kwargs: True)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(self.service.start("127.0.0.1", port))
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        ready.wait(5)
+        self.url = f"http://127.0.0.1:{self.service.port}"
+
+    def request(self, method, path, payload=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.service.port, timeout=5)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        conn.request(method, path, body=body, headers={"Connection": "close"})
+        response = conn.getresponse()
+        data = json.loads(response.read())
+        conn.close()
+        return response.status, data
+
+    def stop(self):
+        async def shutdown():
+            self.server.close()
+            # Las conexiones keep-alive de los clientes quedan abiertas: se cortan acá
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.service.close()
+
+
+@pytest.fixture
+def scores_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_manager, "notify_record", lambda **kwargs: True)
+    path = str(tmp_path / "global_scores.json")
+    yield path
+    release_store(path, "json")
+
+
+@pytest.fixture
+def server(scores_path):
+    running = RunningServer(scores_path)
+    yield running
+    running.stop()
+
+
+def make_client(url, tmp_path):
+    return RemoteScoreStore(url, timeout=2.0, spool=SubmissionSpool(str(tmp_path / "cliente.spool")))
+
+
+def fresh(client, method, *args):
+    # Las lecturas salen de la copia local: la primera la pide y refresh() espera a que llegue
+    getattr(client, method)(*args)
+    assert client.refresh()
+    return getattr(client, method)(*args)
+
+
+def test_client_round_trip(server, tmp_path):
+    client = make_client(server.url, tmp_path)
+    client.submit("SNAKE", "ANA", "ana@x.com", 30)
+    client.submit_many("SNAKE", [("BETO", "beto@x.com", 50, None), ("CARLA", "carla@x.com", 10, None)])
+    assert client.flush()
+
+    assert [row["email"] for row in fresh(client, "top_scores", "SNAKE")] == \
+        ["beto@x.com", "ana@x.com", "carla@x.com"]
+    assert fresh(client, "player_best", "SNAKE", "ana@x.com")["score"] == 30
+    assert fresh(client, "player_rank", "SNAKE", "ana@x.com") == (2, 3)
+    assert fresh(client, "rank_of_score", "SNAKE", 40) == (2, 3)
+    page = fresh(client, "page", "SNAKE", None, 2)
+    assert [rank for rank, _ in page["rows"]] == [1, 2] and page["next"]
+    assert [rank for rank, _ in fresh(client, "page", "SNAKE", page["next"], 2)["rows"]] == [3]
+    assert fresh(client, "find_players", "SNAKE", "ca") == [(3, fresh(client, "player_best", "SNAKE", "carla@x.com"))]
+    assert fresh(client, "game_ids") == ["SNAKE"]
+    assert fresh(client, "player_profile", "ana@x.com")["SNAKE"]["best"] == 30
+    client.close()
+
+
+def test_reads_never_wait_for_the_service(server, tmp_path, monkeypatch):
+    client = make_client(server.url, tmp_path)
+    client.submit("SNAKE", "ANA", "ana@x.com", 30)
+    assert client.flush()
+    # Un pedido desde el hilo del juego falla la prueba: todo lo trae el hilo de lectura
+    game_thread = threading.current_thread()
+    request = client._request
+
+    def checked_request(*args):
+        assert threading.current_thread() is not game_thread
+        return request(*args)
+
+    monkeypatch.setattr(client, "_request", checked_request)
+    version = client.version
+    assert fresh(client, "top_scores", "SNAKE")[0]["score"] == 30
+    assert client.version > version
+
+    # Otro cliente cambia el servicio: la copia se actualiza sola (GET /health en el hilo de lectura)
+    other = make_client(server.url, tmp_path)
+    other.submit("SNAKE", "BETO", "beto@x.com", 50)
+    assert other.flush()
+    deadline = time.monotonic() + 5
+    while client.top_scores("SNAKE")[0]["email"] != "beto@x.com" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.top_scores("SNAKE")[0]["email"] == "beto@x.com"
+    assert client.reload_if_changed() is False
+    client.close()
+    other.close()
+
+
+def test_invalid_rows_are_rejected_before_any_change(server):
+    status, payload = server.request("POST", "/scores", {"submissions": [
+        {"game": "SNAKE", "name": "ANA", "email": "ana@x.com", "score": 10},
+        {"game": "SNAKE", "name": "BETO", "email": "beto@x.com", "score": 20, "date": "ayer"},
+        {"game": 5, "name": "X", "email": "x@x.com", "score": 1},
+    ]})
+    assert status == 400
+    assert payload["invalid"] == [1, 2]
+    assert server.request("GET", "/games/SNAKE/top")[1] == []
+
+    status, _ = server.request("POST", "/scores", {"submissions": [
+        {"game": "SNAKE", "name": "ANA", "email": "ana@x.com", "score": 10, "date": "2025-01-01 10:00:00"}]})
+    assert status == 200
+    assert server.request("GET", "/games/SNAKE/player?email=ana%40x.com")[1]["score"] == 10
+
+
+def test_service_has_its_own_blocking_dispatcher(scores_path):
+    service = LeaderboardServer(scores_path, "json")
+    try:
+        assert service.notifier.policy == "block"
+        assert service.notifier is not get_dispatcher()
+        assert service._manager("SNAKE").notify == service.notifier.submit
+    finally:
+        service.close()
+
+
+def test_client_drops_rows_the_service_rejects(server, tmp_path):
+    client = make_client(server.url, tmp_path)
+    client.submit("SNAKE", "ANA", "ana@x.com", 10, date="no es una fecha")
+    client.submit("SNAKE", "BETO", "beto@x.com", 20)
+    assert client.flush()
+    assert [row["email"] for row in fresh(client, "top_scores", "SNAKE")] == ["beto@x.com"]
+
+
+def test_reads_do_not_wait_for_the_event_loop(server):
+    # Con el candado del store tomado (un lote o una compactación larga) el servicio sigue atendiendo
+    store = server.service.store
+    result = {}
+
+    def slow_read():
+        result["top"] = server.request("GET", "/games/SNAKE/top")
+
+    with store._lock:
+        reader = threading.Thread(target=slow_read)
+        reader.start()
+        time.sleep(0.1)
+        started = time.perf_counter()
+        status, health = server.request("GET", "/health")
+        assert status == 200 and time.perf_counter() - started < 1.0
+        assert "top" not in result
+    reader.join(5)
+    assert result["top"] == (200, [])
+
+
+def test_spooled_scores_stay_on_disk_until_acknowledged(scores_path, tmp_path):
+    # Servicio caído: el puntaje pasa al spool del cliente
+    placeholder = RunningServer(scores_path)
+    port = placeholder.service.port
+    placeholder.stop()
+    release_store(scores_path, "json")
+
+    client = make_client(f"http://127.0.0.1:{port}", tmp_path)
+    client.submit("SNAKE", "ANA", "ana@x.com", 77)
+    deadline = time.monotonic() + 5
+    while client.spool.pending() == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.spool.pending() == 1
+
+    # Mientras siga caído el reintento no lo saca del archivo ni lo vuelve a la memoria
+    assert client.spool.drain(client._resubmit) == 0
+    assert client.spool.pending() == 1
+    assert not client._queue
+
+    running = RunningServer(scores_path, port)
+    try:
+        assert client.spool.drain(client._resubmit) == 1
+        assert client.spool.pending() == 0
+        assert fresh(client, "player_best", "SNAKE", "ana@x.com")["score"] == 77
+    finally:
+        running.stop()
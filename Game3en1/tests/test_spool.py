@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from puntajes import data_manager
+from puntajes.data_manager import DataManager
+from puntajes.score_store import ScoreStore, release_store
+from puntajes.spool import get_spool
+
+
+@pytest.fixture
+def scores_path(tmp_path, monkeypatch):
+    # Los récords de las pruebas no mandan mails
+    monkeypatch.setattr(data_manager, "notify_record", lambda **kwargs: True)
+    path = str(tmp_path / "global_scores.json")
+    yield path
+    release_store(path, "json")
+
+
+def test_writer_spills_unwritten_records_at_exit(scores_path, monkeypatch):
+    store = ScoreStore(scores_path)
+    store.ensure_file()
+
+    def broken_disk(records):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(store.journal, "append_many", broken_disk)
+    store.submit("SNAKE", "ANA", "ana@x.com", 42)
+    # Como el atexit del juego: el diario no se pudo escribir a tiempo
+    store.writer.close(timeout=0.2)
+
+    spool = get_spool(scores_path)
+    assert spool.pending() == 1
+
+    # Próximo inicio: el reintento lo guarda y lo saca del spool
+    manager = DataManager("SNAKE", scores_path, "json")
+    assert spool.drain(manager._submit_spooled) == 1
+    assert manager.store.flush()
+    assert not os.path.exists(spool.path)
+    assert ScoreStore(scores_path).player_best("SNAKE", "ana@x.com")["score"] == 42
+
+
+def test_failed_submit_goes_to_spool(scores_path, monkeypatch):
+    manager = DataManager("SNAKE", scores_path, "json")
+
+    def broken_submit(*args, **kwargs):
+        raise OSError("base bloqueada")
+
+    monkeypatch.setattr(manager.store, "submit", broken_submit)
+    assert manager.update_score("ANA", "ana@x.com", 10) == (False, 0)
+    assert manager.update_scores([("BETO", "beto@x.com", 20), ("X", "no-es-email", 5)]) is not None
+    assert manager.spool.pending() == 1
+
+    monkeypatch.setattr(manager.store, "submit_many", broken_submit)
+    manager.update_scores([("BETO", "beto@x.com", 20)])
+    assert manager.spool.pending() == 2
+
+
+def test_drain_uses_one_submit_many_per_game_and_batch(scores_path, monkeypatch):
+    manager = DataManager("SNAKE", scores_path, "json")
+    spool = get_spool(scores_path)
+    spool.add_many([{"g": "SNAKE" if i % 2 else "FLAPPY", "n": "P", "e": f"p{i}@x.com", "s": i,
+                     "d": "2025-01-01 10:00:00"} for i in range(120)])
+
+    calls = []
+    submit_many = manager.store.submit_many
+
+    def counting(game_id, entries):
+        calls.append((game_id, len(entries)))
+        return submit_many(game_id, entries)
+
+    monkeypatch.setattr(manager.store, "submit_many", counting)
+    assert spool.drain(manager._submit_spooled, batch_size=50) == 120
+    assert calls == [("FLAPPY", 25), ("SNAKE", 25)] * 2 + [("FLAPPY", 10), ("SNAKE", 10)]
+    assert manager.store.rank_of_score("SNAKE", 1000)[1] == 60
+
+
+def test_drain_keeps_what_failed(scores_path, monkeypatch):
+    manager = DataManager("SNAKE", scores_path, "json")
+    spool = get_spool(scores_path)
+    spool.add_many([{"g": game, "n": "P", "e": "p@x.com", "s": 5, "d": "2025-01-01 10:00:00"}
+                    for game in ("SNAKE", "FLAPPY", "SNAKE")])
+
+    submit_many = manager.store.submit_many
+
+    def flappy_down(game_id, entries):
+        if game_id == "FLAPPY":
+            raise OSError("sin lugar")
+        return submit_many(game_id, entries)
+
+    monkeypatch.setattr(manager.store, "submit_many", flappy_down)
+    assert spool.drain(manager._submit_spooled) == 2
+    assert [record["g"] for record in spool._read()] == ["FLAPPY"]
+
+    monkeypatch.setattr(manager.store, "submit_many", submit_many)
+    assert spool.drain(manager._submit_spooled) == 1
+    assert spool.pending() == 0
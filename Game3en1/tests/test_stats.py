@@ -0,0 +1,68 @@
+import os
+import threading
+
+from puntajes.score_store import ScoreStore
+from puntajes.sqlite_store import SQLiteScoreStore
+from puntajes.stats import ScoreStatistics
+from puntajes.writer import BackgroundWriter
+
+
+def test_bootstrap_runs_on_the_writer_and_is_saved(tmp_path):
+    path = str(tmp_path / "global_scores.stats.json")
+    threads = []
+    gate = threading.Event()
+
+    def bootstrap():
+        gate.wait(2.0)
+        threads.append(threading.current_thread().name)
+        return [("SNAKE", 10), ("SNAKE", 30)]
+
+    stats = ScoreStatistics(path, BackgroundWriter("stats-test"))
+    stats.load(bootstrap)
+    # load() vuelve sin recorrer el historial; lo que se juega mientras tanto se cuenta igual
+    stats.record("SNAKE", 20)
+    gate.set()
+    assert stats.writer.flush()
+    assert threads == ["stats-test"]
+    assert stats.get("SNAKE").count == 3
+
+    again = ScoreStatistics(path, BackgroundWriter("stats-test"))
+    again.load(lambda: (_ for _ in ()).throw(AssertionError("se recorrió el historial")))
+    assert again.get("SNAKE").count == 3
+    assert again.get("SNAKE").mean == 20
+
+
+def test_empty_bootstrap_is_saved_and_imports_are_counted(tmp_path):
+    path = str(tmp_path / "global_scores.json")
+    store = ScoreStore(path)
+    store.ensure_file()
+    rows = [("SNAKE", {"name": f"P{i}", "email": f"p{i}@x.com", "score": i}) for i in range(50)]
+    store.bulk_load(rows)
+    # Reimportar lo mismo no suma partidas: nada entra al ranking
+    store.bulk_load(rows)
+    assert store.flush()
+
+    reopened = ScoreStore(path)
+    assert reopened.score_stats("SNAKE")["count"] == 50
+
+
+def test_games_played_before_the_bootstrap_runs_are_counted_once(tmp_path):
+    path = str(tmp_path / "global_scores.db")
+    store = SQLiteScoreStore(path)
+    store.submit("SNAKE", "ANA", "ana@x.com", 10)
+    store.submit("SNAKE", "ANA", "ana@x.com", 5)
+    assert store.flush()
+    store.close()
+
+    # Sin archivo de estadísticas: el historial se copia al abrir, no cuando el hilo escritor lo suma
+    for name in os.listdir(tmp_path):
+        if name.startswith("global_scores.stats.json"):
+            os.remove(str(tmp_path / name))
+    store = SQLiteScoreStore(path)
+    gate = threading.Event()
+    store.windows.writer.submit_job("gate", lambda: gate.wait(2.0))
+    store.submit("SNAKE", "BETO", "beto@x.com", 30)
+    gate.set()
+    assert store.flush()
+    store.close()
+    assert SQLiteScoreStore(path).score_stats("SNAKE")["count"] == 2
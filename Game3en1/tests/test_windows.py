@@ -0,0 +1,73 @@
+from datetime import date
+
+from puntajes import windows
+from puntajes.windows import DAILY, WEEKLY, WindowedBoards
+from puntajes.writer import BackgroundWriter
+
+
+class Today(date):
+    """date con un "hoy" que la prueba puede mover."""
+    current = date(2025, 11, 5)  # miércoles
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+def make_boards(tmp_path):
+    return WindowedBoards(str(tmp_path / "global_scores.windows.json"), BackgroundWriter("windows-test"))
+
+
+def row(email, score, day):
+    return {"name": email.split("@")[0].upper(), "email": email, "score": score, "date": f"{day} 10:00:00"}
+
+
+def emails(boards, window):
+    return [r["email"] for r in boards.top("SNAKE", window, 10)]
+
+
+def test_bootstrap_keeps_this_week_and_is_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(windows, "date", Today)
+    Today.current = date(2025, 11, 5)
+    history = [("SNAKE", row("ana@x.com", 50, "2025-11-05")),
+               ("SNAKE", row("beto@x.com", 70, "2025-11-03")),   # lunes de esta semana
+               ("SNAKE", row("caro@x.com", 90, "2025-11-02")),   # domingo anterior
+               ("SNAKE", {"name": "VIEJO", "score": 99}),
+               ("SNAKE", {"name": "X", "email": "x@x.com", "score": 80, "date": None})]
+    boards = make_boards(tmp_path)
+    boards.load(lambda: history)
+    assert emails(boards, DAILY) == ["ana@x.com"]
+    assert emails(boards, WEEKLY) == ["beto@x.com", "ana@x.com"]
+
+    # Se guardó enseguida: el próximo inicio no vuelve a recorrer el historial
+    assert boards.writer.flush()
+    again = make_boards(tmp_path)
+    again.load(lambda: (_ for _ in ()).throw(AssertionError("se recorrió el historial")))
+    assert emails(again, WEEKLY) == ["beto@x.com", "ana@x.com"]
+
+
+def test_boards_roll_over_with_the_day_and_the_week(tmp_path, monkeypatch):
+    monkeypatch.setattr(windows, "date", Today)
+    Today.current = date(2025, 11, 5)
+    boards = make_boards(tmp_path)
+    boards.load()
+    boards.record("SNAKE", "ANA", "ana@x.com", 50, "2025-11-05 10:00:00")
+    # Un puntaje que no mejora el del día no cambia la tabla
+    assert not boards.record("SNAKE", "ANA", "ana@x.com", 40, "2025-11-05 11:00:00")
+
+    Today.current = date(2025, 11, 6)
+    assert emails(boards, DAILY) == []
+    assert emails(boards, WEEKLY) == ["ana@x.com"]
+    assert boards.record("SNAKE", "ANA", "ana@x.com", 40, "2025-11-06 10:00:00")
+    assert boards.top("SNAKE", DAILY, 1)[0]["score"] == 40
+    assert boards.top("SNAKE", WEEKLY, 1)[0]["score"] == 50
+
+    Today.current = date(2025, 11, 10)  # lunes siguiente
+    assert emails(boards, DAILY) == []
+    assert emails(boards, WEEKLY) == []
+
+    # Lo guardado de la semana pasada no vuelve al leer el archivo
+    assert boards.writer.flush()
+    again = make_boards(tmp_path)
+    again.load()
+    assert emails(again, WEEKLY) == []
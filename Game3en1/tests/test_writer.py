@@ -0,0 +1,40 @@
+import threading
+
+from puntajes import writer
+from puntajes.writer import BackgroundWriter
+
+
+def test_failing_job_does_not_drop_the_rest_of_the_batch(monkeypatch):
+    monkeypatch.setattr(writer, "WRITE_RETRY_INTERVAL", 0.01)
+    background = BackgroundWriter("writer-test")
+    calls = []
+    gate = threading.Event()
+
+    def flaky():
+        calls.append("flaky")
+        if calls.count("flaky") == 1:
+            raise OSError("disco lleno")
+
+    # Las dos tareas entran en la misma tanda
+    background.submit_job("gate", gate.wait)
+    background.submit_job("flaky", flaky)
+    background.submit_job("other", lambda: calls.append("other"))
+    gate.set()
+    assert background.flush(timeout=2.0)
+    assert calls.count("other") == 1
+    assert calls.count("flaky") == 2
+
+
+def test_newer_job_replaces_the_failed_one(monkeypatch):
+    monkeypatch.setattr(writer, "WRITE_RETRY_INTERVAL", 0.05)
+    background = BackgroundWriter("writer-test")
+    calls = []
+
+    def old():
+        calls.append("old")
+        background.submit_job("save", lambda: calls.append("new"))
+        raise OSError("disco lleno")
+
+    background.submit_job("save", old)
+    assert background.flush(timeout=2.0)
+    assert calls == ["old", "new"]